@@ -0,0 +1,71 @@
+"""Benchmark del archivo de días cerrados.
+
+Uso:
+    python benchmarks/bench_archivo.py [cantidad] [repeticiones]
+
+Llena una base temporal con `cantidad` pedidos, mide las lecturas de un
+refresco de la ventana principal (sin caché), archiva todos los días
+menos dos y vuelve a medir. Muestra tiempos, el tamaño de la base antes y
+después del VACUUM y comprueba que la exportación histórica devuelve
+todos los pedidos.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador import DIAS, poblar_base
+from database.db_manager import DatabaseManager
+
+CANTIDAD_POR_DEFECTO = 200000
+REPETICIONES_POR_DEFECTO = 20
+# Días que siguen abiertos; el resto se archiva
+DIAS_ABIERTOS = 2
+
+
+def refrescar(db_manager):
+    """Las lecturas de un refresco de la lista y los resúmenes, con filtro de texto."""
+    db_manager.cargar_pagina_pedidos(limite=125)
+    db_manager.contar_pedidos()
+    db_manager.contar_pedidos({'texto': 'gomez'})
+    db_manager.cargar_pedidos_desde(0, 125, {'texto': 'gomez'})
+    db_manager.resumen_produccion()
+    db_manager.resumen_por_dia()
+    db_manager.total_recaudado()
+
+
+def medir(db_manager, repeticiones):
+    """Devuelve los ms por refresco."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        refrescar(db_manager)
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else CANTIDAD_POR_DEFECTO
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else REPETICIONES_POR_DEFECTO
+    with tempfile.TemporaryDirectory() as directorio:
+        db_manager = DatabaseManager(os.path.join(directorio, "bench_archivo.db"), cache=False, instrumentar=False)
+        try:
+            poblar_base(db_manager, cantidad)
+            antes = medir(db_manager, repeticiones)
+            resultado = db_manager.archivar_pedidos(DIAS[:-DIAS_ABIERTOS])
+            despues = medir(db_manager, repeticiones)
+            historicos = sum(1 for _ in db_manager.iterar_pedidos(historico=True))
+            assert historicos == cantidad, (historicos, cantidad)
+
+            print(f"\n{cantidad} pedidos; se archivan {resultado['archivados']} "
+                  f"({len(DIAS) - DIAS_ABIERTOS} de {len(DIAS)} días) en {resultado['segundos']:.2f} s")
+            print(f"  refresco antes:   {antes:8.2f} ms")
+            print(f"  refresco después: {despues:8.2f} ms ({antes / despues:.1f}x)")
+            print(f"  base: {resultado['bytes_antes'] / 1e6:.1f} MB -> {resultado['bytes_despues'] / 1e6:.1f} MB; "
+                  f"archivo: {os.path.getsize(db_manager.db_archivo) / 1e6:.1f} MB")
+        finally:
+            db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
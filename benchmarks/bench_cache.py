@@ -0,0 +1,90 @@
+"""Benchmark de la caché de lecturas de DatabaseManager.
+
+Uso:
+    python benchmarks/bench_cache.py [cantidad] [ciclos]
+
+Sobre una base temporal repite el uso típico de la ventana principal:
+abrir un pedido para editarlo, guardarlo y refrescar la página visible
+y los resúmenes, con muchas más lecturas que escrituras. Lo mide con y sin
+caché, y luego con otro terminal escribiendo cada tanto, para comprobar
+que los cambios externos se ven enseguida. Muestra tiempos y aciertos.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador import poblar_base
+from database.db_manager import DatabaseManager
+
+CANTIDAD_POR_DEFECTO = 100000
+CICLOS_POR_DEFECTO = 300
+# Pedidos que se abren: la mayoría de las ediciones son de pocos pedidos (los del día)
+PEDIDOS_FRECUENTES = 200
+# Refrescos de la lista por cada edición guardada
+REFRESCOS_POR_EDICION = 5
+SEMILLA = 7
+
+
+def ciclo(db_manager, rnd, cantidad, externo=None):
+    """Abre un pedido, refresca la lista varias veces y guarda una edición."""
+    pedido_id = rnd.randint(1, PEDIDOS_FRECUENTES) if rnd.random() < 0.8 else rnd.randint(1, cantidad)
+    pedido = db_manager.obtener_pedido(pedido_id)
+    for _ in range(REFRESCOS_POR_EDICION):
+        pagina = db_manager.cargar_pagina_pedidos(limite=125)
+        db_manager.contar_pedidos()
+        db_manager.resumen_produccion()
+        db_manager.resumen_por_dia()
+        db_manager.total_recaudado()
+        db_manager.obtener_pedido(pagina[rnd.randrange(len(pagina))].id)
+    if pedido is not None and rnd.random() < 0.5:
+        db_manager.toggle_pago_pedido(pedido_id)
+    if externo is not None and rnd.random() < 0.2:
+        # Otro terminal cambia un pedido frecuente; la próxima lectura debe verlo
+        cambiado = rnd.randint(1, PEDIDOS_FRECUENTES)
+        nuevo_estado = externo.toggle_pago_pedido(cambiado)
+        assert db_manager.obtener_pedido(cambiado).pago == nuevo_estado
+
+
+def medir(db_manager, cantidad, ciclos, externo=None):
+    """Ejecuta los ciclos y devuelve los ms por ciclo."""
+    rnd = random.Random(SEMILLA)
+    inicio = time.perf_counter()
+    for _ in range(ciclos):
+        ciclo(db_manager, rnd, cantidad, externo)
+    return (time.perf_counter() - inicio) * 1000 / ciclos
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else CANTIDAD_POR_DEFECTO
+    ciclos = int(sys.argv[2]) if len(sys.argv) > 2 else CICLOS_POR_DEFECTO
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "bench_cache.db")
+        sin_cache = DatabaseManager(db_name, cache=False, instrumentar=False)
+        con_cache = DatabaseManager(db_name, instrumentar=False)
+        externo = DatabaseManager(db_name, cache=False, instrumentar=False)
+        try:
+            poblar_base(sin_cache, cantidad)
+            t_sin = medir(sin_cache, cantidad, ciclos)
+            t_con = medir(con_cache, cantidad, ciclos)
+            print(f"\n{cantidad} pedidos, {ciclos} ciclos de edición con {REFRESCOS_POR_EDICION} refrescos")
+            print(f"  sin caché:          {t_sin:8.2f} ms por ciclo")
+            print(f"  con caché:          {t_con:8.2f} ms por ciclo ({t_sin / t_con:.1f}x)")
+            print("  " + con_cache.informe_cache().replace("\n", "\n  "))
+
+            con_cache.cache_pedidos.reiniciar()
+            con_cache.cache_consultas.reiniciar()
+            t_externo = medir(con_cache, cantidad, ciclos, externo)
+            print(f"  con otro terminal:  {t_externo:8.2f} ms por ciclo")
+            print("  " + con_cache.informe_cache().replace("\n", "\n  "))
+        finally:
+            externo.close()
+            con_cache.close()
+            sin_cache.close()
+
+
+if __name__ == "__main__":
+    main()
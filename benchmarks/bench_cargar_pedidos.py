@@ -0,0 +1,63 @@
+"""Benchmark de DatabaseManager.cargar_pedidos según la cantidad de pedidos.
+
+Uso:
+    python benchmarks/bench_cargar_pedidos.py [cantidades...]
+
+Compara la carga en dos consultas con la carga anterior (una consulta de
+items por pedido) sobre bases de datos temporales.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador import poblar_base
+from database.db_manager import DatabaseManager, ORDEN_PEDIDOS
+
+CANTIDADES_POR_DEFECTO = [100, 1000, 5000, 10000]
+REPETICIONES = 5
+
+
+def cargar_pedidos_n_mas_uno(db_manager):
+    """Carga anterior: una consulta de items por cada pedido."""
+    cursor = db_manager.conn.cursor()
+    cursor.execute(f"SELECT * FROM vista_pedidos ORDER BY {ORDEN_PEDIDOS}")
+    pedidos = []
+    for pedido_row in cursor.fetchall():
+        pedido_dict = dict(pedido_row)
+        cursor.execute("SELECT sabor, cantidad FROM vista_items WHERE pedido_id = ? ORDER BY item_id", (pedido_dict['id'],))
+        pedido_dict['items'] = [dict(item) for item in cursor.fetchall()]
+        pedidos.append(pedido_dict)
+    return pedidos
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    """Devuelve el mejor tiempo (en ms) de varias ejecuciones."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    cantidades = [int(c) for c in sys.argv[1:]] or CANTIDADES_POR_DEFECTO
+    print(f"{'pedidos':>10} {'2 consultas (ms)':>18} {'N+1 (ms)':>12} {'mejora':>8}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in cantidades:
+            db_manager = DatabaseManager(os.path.join(directorio, f"bench_{cantidad}.db"), cache=False)
+            try:
+                poblar_base(db_manager, cantidad)
+                assert cargar_pedidos_n_mas_uno(db_manager) == [p.como_dict() for p in db_manager.cargar_pedidos()]
+                t_nuevo = medir(db_manager.cargar_pedidos)
+                t_anterior = medir(lambda: cargar_pedidos_n_mas_uno(db_manager))
+                print(f"{cantidad:>10} {t_nuevo:>18.2f} {t_anterior:>12.2f} {t_anterior / t_nuevo:>7.1f}x")
+            finally:
+                db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark de la cola de escrituras agrupadas.
+
+Uso:
+    python benchmarks/bench_cola_escritura.py [hilos] [escrituras_por_hilo] [espera_ms]
+
+Sobre una base temporal, varios hilos marcan pagos y agregan pedidos uno
+por uno, como en la hora pico. Se mide con un commit por escritura y con
+ColaEscritura, con synchronous NORMAL y FULL, y se comprueba que cada
+escritura recibió su resultado. Muestra escrituras por segundo y cuántas
+entraron en cada commit.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador import generar_pedidos, poblar_base
+from config.settings import DB_COLA_ESPERA_MS
+from database.cola_escritura import ColaEscritura
+from database.servicio import ServicioBD
+
+HILOS_POR_DEFECTO = 8
+ESCRITURAS_POR_DEFECTO = 250
+CANTIDAD_INICIAL = 10000
+SEMILLA = 7
+
+
+def escribir(enviar, hilos, escrituras):
+    """Lanza las escrituras desde varios hilos; devuelve escrituras por segundo."""
+    errores = []
+
+    def trabajar(numero):
+        rnd = random.Random(SEMILLA + numero)
+        nuevos = generar_pedidos(escrituras, semilla=SEMILLA + numero)
+        for _ in range(escrituras):
+            try:
+                if rnd.random() < 0.7:
+                    estado = enviar('toggle_pago_pedido', rnd.randint(1, CANTIDAD_INICIAL)).result()
+                    assert estado in (0, 1)
+                else:
+                    pedido = next(nuevos)
+                    pedido_id = enviar('agregar_pedido', pedido['dia'], pedido['nombre'], pedido['precio_pedido'],
+                                       pedido['precio_envio'], pedido['direccion'], pedido['horario'],
+                                       pedido['items']).result()
+                    assert pedido_id > CANTIDAD_INICIAL
+            except Exception as e:
+                errores.append(e)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajar, args=(numero,)) for numero in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    if errores:
+        raise errores[0]
+    return hilos * escrituras / (time.perf_counter() - inicio)
+
+
+def main():
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else HILOS_POR_DEFECTO
+    escrituras = int(sys.argv[2]) if len(sys.argv) > 2 else ESCRITURAS_POR_DEFECTO
+    espera_ms = float(sys.argv[3]) if len(sys.argv) > 3 else DB_COLA_ESPERA_MS
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "bench_cola.db")
+        servicio = ServicioBD(db_name)
+        try:
+            servicio.enviar(poblar_base, CANTIDAD_INICIAL).result()
+            print(f"\n{hilos} hilos x {escrituras} escrituras (70% pagos, 30% pedidos nuevos), espera {espera_ms} ms")
+            for sincronizacion in ('NORMAL', 'FULL'):
+                servicio.enviar(lambda db: db.cursor.execute(f"PRAGMA synchronous = {sincronizacion}")).result()
+                individual = escribir(servicio.ejecutar, hilos, escrituras)
+                cola = ColaEscritura(servicio, espera_ms=espera_ms, sincronizacion=sincronizacion)
+                try:
+                    agrupada = escribir(cola.ejecutar, hilos, escrituras)
+                    estadisticas = cola.estadisticas()
+                finally:
+                    cola.close()
+                print(f"  synchronous={sincronizacion}")
+                print(f"    un commit por escritura: {individual:8.0f} escrituras/s")
+                print(f"    ColaEscritura:           {agrupada:8.0f} escrituras/s ({agrupada / individual:.1f}x, "
+                      f"{estadisticas['por_grupo']:.1f} por commit)")
+        finally:
+            servicio.close()
+
+
+if __name__ == "__main__":
+    main()
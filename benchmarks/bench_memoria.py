@@ -0,0 +1,124 @@
+"""Benchmark de memoria de los pedidos cargados por DatabaseManager.
+
+Uso:
+    python benchmarks/bench_memoria.py [cantidades...]
+
+Compara, sobre bases de datos temporales, la representación anterior (un
+dict por pedido y otro por item) con los objetos Pedido y PedidoItem de
+`database.modelos`: bytes por pedido medidos con tracemalloc, tiempo de
+carga y tiempo de armar el texto de las filas de la lista.
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador import poblar_base
+from database.db_manager import DatabaseManager, ORDEN_PEDIDOS
+from database.modelos import preparar_valores
+
+CANTIDADES_POR_DEFECTO = [1000, 10000, 100000]
+REPETICIONES = 3
+
+
+def cargar_como_dicts(db_manager):
+    """Carga anterior: los pedidos como dicts con una lista de dicts de items."""
+    cursor = db_manager.conn.cursor()
+    cursor.execute(f"SELECT * FROM vista_pedidos ORDER BY {ORDEN_PEDIDOS}")
+    pedidos = [dict(fila) for fila in cursor.fetchall()]
+    por_id = {}
+    for pedido in pedidos:
+        pedido['items'] = []
+        por_id[pedido['id']] = pedido
+    cursor.execute("SELECT pedido_id, sabor, cantidad FROM vista_items ORDER BY pedido_id, item_id")
+    for fila in cursor.fetchall():
+        por_id[fila['pedido_id']]['items'].append({'sabor': fila['sabor'], 'cantidad': fila['cantidad']})
+    return pedidos
+
+
+def valores_dict(pedido):
+    """Texto de las columnas de la lista para un pedido como dict (como lo hacía la ventana)."""
+    items = pedido.get('items', [])
+    sabor_display = '??'
+    cantidad_total = 0
+    if items:
+        if len(items) == 1:
+            sabor_display = items[0].get('sabor', '??')
+            cantidad_total = items[0].get('cantidad', 0)
+        else:
+            sabor_display = "Múltiple"
+            cantidad_total = sum(item.get('cantidad', 0) for item in items)
+    return tuple(str(valor) for valor in (
+        pedido.get('dia', ''),
+        pedido.get('nombre', ''),
+        sabor_display,
+        cantidad_total if cantidad_total > 0 else '??',
+        f"${pedido.get('precio_pedido', 0.0):.2f}",
+        f"${pedido.get('precio_envio', 0.0):.2f}",
+        pedido.get('direccion', ''),
+        pedido.get('horario', ''),
+        "Sí" if pedido.get('pago', 0) == 1 else "No",
+    ))
+
+
+def memoria(funcion):
+    """Devuelve (resultado, bytes que siguen ocupados al terminar `funcion`)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resultado = funcion()
+        actual, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, actual
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    """Devuelve el mejor tiempo (en ms) de varias ejecuciones."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    cantidades = [int(c) for c in sys.argv[1:]] or CANTIDADES_POR_DEFECTO
+    print(f"{'pedidos':>10} {'modelo':>8} {'bytes/pedido':>13} {'carga (ms)':>11} {'filas (ms)':>11}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in cantidades:
+            db_manager = DatabaseManager(os.path.join(directorio, f"bench_{cantidad}.db"), cache=False)
+            try:
+                poblar_base(db_manager, cantidad)
+                # Se mide con los valores de las filas ya armados, como quedan en la ventana
+                dicts, bytes_dicts = memoria(
+                    lambda: [(pedido, valores_dict(pedido)) for pedido in cargar_como_dicts(db_manager)])
+                del dicts
+                pedidos, bytes_pedidos = memoria(lambda: preparar_valores(db_manager.cargar_pedidos()))
+                assert [pedido.valores for pedido in pedidos] == [
+                    valores_dict(pedido) for pedido in cargar_como_dicts(db_manager)]
+                del pedidos
+
+                t_carga_dicts = medir(lambda: cargar_como_dicts(db_manager))
+                t_carga_pedidos = medir(db_manager.cargar_pedidos)
+                dicts = cargar_como_dicts(db_manager)
+                t_filas_dicts = medir(lambda: [valores_dict(pedido) for pedido in dicts])
+                pedidos = db_manager.cargar_pedidos()
+                t_filas_pedidos = medir(lambda: preparar_valores(pedidos), repeticiones=1)
+                del dicts, pedidos
+
+                print(f"{cantidad:>10} {'dict':>8} {bytes_dicts / cantidad:>13.0f} "
+                      f"{t_carga_dicts:>11.2f} {t_filas_dicts:>11.2f}")
+                print(f"{cantidad:>10} {'Pedido':>8} {bytes_pedidos / cantidad:>13.0f} "
+                      f"{t_carga_pedidos:>11.2f} {t_filas_pedidos:>11.2f}")
+            finally:
+                db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark de la planificación de la producción.
+
+Uso:
+    python benchmarks/bench_planificacion.py [cantidad] [repeticiones]
+
+Llena una base temporal con `cantidad` pedidos repartidos en un año de
+fechas de entrega y mide `planificar` sobre los 365 días, con NumPy (si
+está instalado) y con arrays de Python, contra agrupar los items de los
+pedidos con GROUP BY y dicts anidados. Comprueba que las dos formas de la
+planificación dan lo mismo.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generador import generar_pedidos
+from database.db_manager import DatabaseManager
+from database.planificacion import np, planificar
+
+CANTIDAD_POR_DEFECTO = 200000
+REPETICIONES_POR_DEFECTO = 20
+DIAS = 365
+SEMILLA = 11
+
+
+def poblar_anio(db_manager, cantidad, desde, tamano_lote=5000):
+    """Carga `cantidad` pedidos con fechas de entrega escritas como 'dd/mm/aaaa' en el año desde `desde`."""
+    rnd = random.Random(SEMILLA)
+    lote = []
+    for pedido in generar_pedidos(cantidad):
+        pedido['dia'] = (desde + timedelta(days=rnd.randrange(DIAS))).strftime('%d/%m/%Y')
+        lote.append(pedido)
+        if len(lote) >= tamano_lote:
+            db_manager.agregar_pedidos_lote(lote)
+            lote = []
+    if lote:
+        db_manager.agregar_pedidos_lote(lote)
+
+
+def agrupar_pedidos(db_manager, desde, hasta):
+    """Lo de antes: sumar los items de los pedidos del período en dicts anidados."""
+    por_fecha = defaultdict(lambda: defaultdict(int))
+    for fecha, sabor, cantidad in db_manager.conn.execute("""
+        SELECT p.fecha_entrega, s.nombre, SUM(i.cantidad)
+        FROM pedidos p JOIN pedido_items i ON i.pedido_id = p.id JOIN sabores s ON s.id = i.sabor_id
+        WHERE p.fecha_entrega BETWEEN ? AND ?
+        GROUP BY p.fecha_entrega, s.nombre
+    """, (desde, hasta)):
+        por_fecha[fecha][sabor] += cantidad
+    return por_fecha
+
+
+def medir(funcion, repeticiones):
+    """Devuelve (ms por llamada, último resultado)."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones, resultado
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else CANTIDAD_POR_DEFECTO
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else REPETICIONES_POR_DEFECTO
+    desde = date.today()
+    hasta = (desde + timedelta(days=DIAS - 1)).isoformat()
+    with tempfile.TemporaryDirectory() as directorio:
+        db_manager = DatabaseManager(os.path.join(directorio, "bench_planificacion.db"), cache=False,
+                                     instrumentar=False)
+        try:
+            poblar_anio(db_manager, cantidad, desde)
+            print(f"\n{cantidad} pedidos en {DIAS} días de entrega")
+            ms, _ = medir(lambda: agrupar_pedidos(db_manager, desde.isoformat(), hasta), max(1, repeticiones // 10))
+            print(f"  GROUP BY de los pedidos + dicts:  {ms:8.2f} ms")
+            planes = {}
+            for usar_numpy in ((True, False) if np is not None else (False,)):
+                ms, plan = medir(lambda: planificar(db_manager, desde, DIAS, usar_numpy=usar_numpy), repeticiones)
+                planes[usar_numpy] = plan
+                nombre = "NumPy" if usar_numpy else "arrays de Python"
+                print(f"  planificar ({nombre + '):':18} {ms:8.2f} ms "
+                      f"(lectura {plan['ms_bd']:.2f} ms, cálculo {plan['ms_calculo']:.2f} ms)")
+            if np is None:
+                print("  (NumPy no está instalado)")
+            else:
+                for nombre in ('cantidades', 'acumulado', 'tandas', 'horneado'):
+                    assert planes[True][nombre].filas() == planes[False][nombre].filas(), nombre
+            plan = planes[np is not None]
+            print(f"  {sum(plan['cantidades'].totales_por_fecha())} cookies, {sum(plan['uso'])} tandas en el horno")
+        finally:
+            db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Prueba de carga del servidor HTTP/JSON de pedidos.
+
+Uso:
+    python benchmarks/carga_servidor.py [cantidad] [clientes] [segundos] [proporcion_escrituras]
+
+Llena una base temporal, levanta `servidor.py` en otro proceso y lo carga
+durante unos segundos con clientes concurrentes que mantienen la conexión
+abierta: la mayoría lee la lista, un pedido o los resúmenes y el resto
+agrega pedidos o cambia pagos. Muestra las peticiones por segundo
+sostenidas, la latencia p50/p95 por tipo de petición y cuántas escrituras
+entraron en cada transacción del grupo.
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.generador import generar_pedidos, poblar_base
+from database.db_manager import DatabaseManager
+
+CANTIDAD_POR_DEFECTO = 20000
+CLIENTES_POR_DEFECTO = 32
+SEGUNDOS_POR_DEFECTO = 10
+ESCRITURAS_POR_DEFECTO = 0.2
+HOST = "127.0.0.1"
+SEMILLA = 7
+# La lista se lee por páginas, casi siempre las primeras
+TAMANO_PAGINA = 50
+PAGINAS_LEIDAS = 10
+
+
+def puerto_libre():
+    """Pide al sistema un puerto TCP libre."""
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+async def esperar_puerto(puerto, proceso, espera=30):
+    """Espera a que el servidor acepte conexiones."""
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor terminó antes de abrir el puerto.")
+        try:
+            _, escritor = await asyncio.open_connection(HOST, puerto)
+            escritor.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("El servidor no abrió el puerto a tiempo.")
+
+
+class Cliente:
+    """Conexión keep-alive con el servidor."""
+
+    def __init__(self, puerto):
+        self.puerto = puerto
+        self.lector = self.escritor = None
+
+    async def pedir(self, metodo, ruta, datos=None):
+        """Hace una petición y devuelve (estado, datos de la respuesta)."""
+        if self.escritor is None:
+            self.lector, self.escritor = await asyncio.open_connection(HOST, self.puerto)
+        cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else b''
+        self.escritor.write(
+            f"{metodo} {ruta} HTTP/1.1\r\nHost: {HOST}\r\nContent-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1')
+            + cuerpo)
+        await self.escritor.drain()
+        estado = int((await self.lector.readline()).split()[1])
+        largo = 0
+        while True:
+            linea = await self.lector.readline()
+            if linea in (b'\r\n', b''):
+                break
+            nombre, _, valor = linea.decode('latin-1').partition(':')
+            if nombre.lower() == 'content-length':
+                largo = int(valor)
+        return estado, json.loads(await self.lector.readexactly(largo))
+
+    def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+
+
+async def trabajar(puerto, numero, cantidad, hasta, proporcion_escrituras, latencias):
+    """Un cliente: hace peticiones al azar hasta el instante `hasta`."""
+    rnd = random.Random(SEMILLA + numero)
+    nuevos = generar_pedidos(cantidad, semilla=SEMILLA + numero)
+    cliente = Cliente(puerto)
+    try:
+        while time.perf_counter() < hasta:
+            sorteo = rnd.random()
+            if sorteo < proporcion_escrituras / 2:
+                tipo, peticion = 'agregar', ('POST', '/pedidos', next(nuevos))
+            elif sorteo < proporcion_escrituras:
+                tipo, peticion = 'pago', ('POST', f'/pedidos/{rnd.randint(1, cantidad)}/pago', None)
+            elif sorteo < 0.5 + proporcion_escrituras / 2:
+                desde = rnd.randrange(PAGINAS_LEIDAS) * TAMANO_PAGINA
+                tipo, peticion = 'lista', ('GET', f'/pedidos?desde={desde}&limite={TAMANO_PAGINA}', None)
+            elif sorteo < 0.8 + proporcion_escrituras / 5:
+                tipo, peticion = 'pedido', ('GET', f'/pedidos/{rnd.randint(1, cantidad)}', None)
+            else:
+                tipo, peticion = 'resumen', ('GET', '/resumen', None)
+            inicio = time.perf_counter()
+            estado, _ = await cliente.pedir(*peticion)
+            if estado >= 400:
+                raise RuntimeError(f"{peticion[0]} {peticion[1]} respondió {estado}")
+            latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+    finally:
+        cliente.cerrar()
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+async def cargar(puerto, proceso, cantidad, clientes, segundos, proporcion_escrituras):
+    """Carga el servidor y muestra los resultados."""
+    await esperar_puerto(puerto, proceso)
+    latencias = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        trabajar(puerto, numero, cantidad, inicio + segundos, proporcion_escrituras, latencias)
+        for numero in range(clientes)))
+    duracion = time.perf_counter() - inicio
+
+    estado_cliente = Cliente(puerto)
+    _, estado = await estado_cliente.pedir('GET', '/estado')
+    estado_cliente.cerrar()
+
+    total = sum(len(valores) for valores in latencias.values())
+    print(f"\n{cantidad} pedidos, {clientes} clientes, {segundos} s, {proporcion_escrituras:.0%} escrituras")
+    print(f"  {total} peticiones: {total / duracion:8.0f} por segundo")
+    for tipo, valores in sorted(latencias.items()):
+        print(f"  {tipo:8} {len(valores):7} peticiones   p50 {percentil(valores, 0.5) * 1000:7.2f} ms"
+              f"   p95 {percentil(valores, 0.95) * 1000:7.2f} ms")
+    cola = estado['cola']
+    if cola['grupos']:
+        print(f"  escrituras: {cola['escrituras']} en {cola['grupos']} transacciones "
+              f"({cola['por_grupo']:.1f} por transacción, máximo {cola['grupo_maximo']})")
+    consultas = estado['cache']['consultas']
+    print(f"  caché de consultas: {consultas['tasa_aciertos']:.0%} de aciertos")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else CANTIDAD_POR_DEFECTO
+    clientes = int(sys.argv[2]) if len(sys.argv) > 2 else CLIENTES_POR_DEFECTO
+    segundos = float(sys.argv[3]) if len(sys.argv) > 3 else SEGUNDOS_POR_DEFECTO
+    proporcion_escrituras = float(sys.argv[4]) if len(sys.argv) > 4 else ESCRITURAS_POR_DEFECTO
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "carga_servidor.db")
+        db_manager = DatabaseManager(db_name, instrumentar=False)
+        try:
+            poblar_base(db_manager, cantidad)
+        finally:
+            db_manager.close()
+
+        puerto = puerto_libre()
+        proceso = subprocess.Popen(
+            [sys.executable, os.path.join(RAIZ, "servidor.py"), "--host", HOST, "--puerto", str(puerto),
+             "--db", db_name],
+            stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(cargar(puerto, proceso, cantidad, clientes, segundos, proporcion_escrituras))
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
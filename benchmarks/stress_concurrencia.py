@@ -0,0 +1,79 @@
+"""Prueba de carga con varios procesos escribiendo en la misma base de datos.
+
+Uso:
+    python benchmarks/stress_concurrencia.py [procesos] [pedidos_por_proceso]
+
+Simula varios terminales de carga de pedidos sobre un mismo archivo: cada
+proceso abre su propio DatabaseManager (con el perfil DB_PRAGMAS) e inserta
+pedidos y cambia estados de pago. Informa el rendimiento, los reintentos por
+bloqueo y el tiempo esperado por bloqueos, y verifica las tablas de resumen.
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SABORES_VALIDOS
+from database.db_manager import DatabaseManager
+
+
+def terminal(db_name, numero, cantidad):
+    """Trabajo de un terminal: inserta `cantidad` pedidos y marca algunos como pagados."""
+    rnd = random.Random(numero)
+    db_manager = DatabaseManager(db_name)
+    inicio = time.perf_counter()
+    for i in range(cantidad):
+        items = [
+            {'sabor': rnd.choice(SABORES_VALIDOS), 'cantidad': rnd.randint(1, 12)}
+            for _ in range(rnd.randint(1, 3))
+        ]
+        pedido_id = db_manager.agregar_pedido(
+            f"Dia {rnd.randint(1, 7)}", f"Terminal {numero} cliente {i}", rnd.uniform(1000, 9000),
+            0.0, "", "", items
+        )
+        if rnd.random() < 0.3:
+            db_manager.toggle_pago_pedido(pedido_id)
+    duracion = time.perf_counter() - inicio
+    estadisticas = dict(db_manager.estadisticas_escritura)
+    db_manager.close()
+    return duracion, estadisticas
+
+
+def main():
+    procesos = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "stress.db")
+        DatabaseManager(db_name).close()  # crea el esquema antes de lanzar los terminales
+
+        inicio = time.perf_counter()
+        with multiprocessing.Pool(procesos) as pool:
+            resultados = pool.starmap(terminal, [(db_name, n, cantidad) for n in range(procesos)])
+        total = time.perf_counter() - inicio
+
+        transacciones = sum(r[1]['transacciones'] for r in resultados)
+        reintentos = sum(r[1]['reintentos'] for r in resultados)
+        espera = sum(r[1]['espera_bloqueo'] for r in resultados)
+
+        db_manager = DatabaseManager(db_name)
+        pedidos = db_manager.contar_pedidos()
+        diferencias = db_manager.verificar_resumenes()
+        db_manager.close()
+
+    print(f"Procesos: {procesos}, pedidos por proceso: {cantidad}")
+    print(f"Pedidos guardados: {pedidos} (esperados {procesos * cantidad})")
+    print(f"Transacciones: {transacciones} en {total:.2f} s -> {transacciones / total:.0f} tx/s")
+    print(f"Reintentos por bloqueo: {reintentos}")
+    print(f"Espera por bloqueos: {espera:.2f} s en total, {espera / procesos:.2f} s por proceso")
+    print(f"Diferencias en resúmenes: {len(diferencias)}")
+    if pedidos != procesos * cantidad or diferencias:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
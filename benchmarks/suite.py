@@ -0,0 +1,194 @@
+"""Suite de benchmarks de DatabaseManager y del refresco de MainWindow.
+
+Uso:
+    python benchmarks/suite.py [--tamanos 1000 10000 100000] [--salida resultados.json]
+                               [--comparar anterior.json] [--sin-tk]
+
+Para cada tamaño crea una base temporal con pedidos sintéticos (semilla
+fija) y mide las operaciones de DatabaseManager y los resúmenes. Si hay
+un display disponible también mide MainWindow.actualizar_todo. Los
+resultados se guardan en JSON para comparar versiones con --comparar.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.generador import generar_pedidos, poblar_base
+from database.db_manager import DatabaseManager
+
+TAMANOS_POR_DEFECTO = [1000, 10000, 100000]
+SEMILLA = 42
+# Filtros de la barra de búsqueda que se miden: texto, texto con error, combinado
+FILTROS = [{'texto': 'gomez'}, {'texto': 'gmez'}, {'texto': 'ana', 'sabor': 'Coco', 'pago': 0}]
+
+
+def medir(funcion, repeticiones):
+    """Ejecuta `funcion(i)` varias veces y devuelve estadísticas en ms."""
+    tiempos = []
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(i)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        'repeticiones': repeticiones,
+        'min_ms': tiempos[0],
+        'mediana_ms': statistics.median(tiempos),
+        'media_ms': statistics.fmean(tiempos),
+        'p95_ms': tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+    }
+
+
+def medir_base(db_manager, cantidad):
+    """Mide las operaciones de DatabaseManager sobre una base con `cantidad` pedidos."""
+    rnd = random.Random(SEMILLA)
+    ids = list(range(1, cantidad + 1))
+    rnd.shuffle(ids)
+    nuevos = list(generar_pedidos(200, semilla=SEMILLA + 1))
+    pesadas = 3 if cantidad > 100000 else 10
+
+    resultados = {
+        'cargar_pedidos': medir(lambda i: db_manager.cargar_pedidos(), pesadas),
+        'cargar_pagina_pedidos': medir(lambda i: db_manager.cargar_pagina_pedidos(limite=125), 50),
+        'contar_pedidos': medir(lambda i: db_manager.contar_pedidos(), 50),
+        'contar_pedidos_filtro': medir(lambda i: db_manager.contar_pedidos(FILTROS[i % len(FILTROS)]), 50),
+        'cargar_pagina_filtro': medir(
+            lambda i: db_manager.cargar_pagina_pedidos(limite=125, filtro=FILTROS[i % len(FILTROS)]), 50),
+        'resumen_produccion': medir(lambda i: db_manager.resumen_produccion(), 50),
+        'resumen_por_dia': medir(lambda i: db_manager.resumen_por_dia(), 50),
+        'total_recaudado': medir(lambda i: db_manager.total_recaudado(), 50),
+        'obtener_pedido': medir(lambda i: db_manager.obtener_pedido(ids[i]), 100),
+        'agregar_pedido': medir(lambda i: db_manager.agregar_pedido(
+            nuevos[i]['dia'], nuevos[i]['nombre'], nuevos[i]['precio_pedido'], nuevos[i]['precio_envio'],
+            nuevos[i]['direccion'], nuevos[i]['horario'], nuevos[i]['items']), 100),
+        'actualizar_pedido': medir(lambda i: db_manager.actualizar_pedido(
+            ids[i], nuevos[100 + i]['dia'], nuevos[100 + i]['nombre'], nuevos[100 + i]['precio_pedido'],
+            nuevos[100 + i]['precio_envio'], nuevos[100 + i]['direccion'], nuevos[100 + i]['horario'],
+            nuevos[100 + i]['items'], nuevos[100 + i]['pago']), 100),
+        'toggle_pago_pedido': medir(lambda i: db_manager.toggle_pago_pedido(ids[i]), 100),
+        'eliminar_pedido': medir(lambda i: db_manager.eliminar_pedido(ids[-1 - i]), 100),
+    }
+    return resultados
+
+
+def medir_interfaz(db_name):
+    """Mide MainWindow.actualizar_todo; devuelve None si no hay display para Tk."""
+    import tkinter as tk
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return None
+
+    from database.servicio import ServicioBD
+    from gui.main_window import MainWindow
+
+    servicio_bd = ServicioBD(db_name)
+    app = MainWindow(servicio_bd)
+    try:
+        def ciclo(_):
+            app.actualizar_todo()
+            while app._refrescando:
+                app.root.update()
+                time.sleep(0.001)
+
+        ciclo(0)  # primer ciclo: llena el Treeview
+        resultado = medir(ciclo, 10)
+        resultado['desglose_ultimo_ciclo_ms'] = dict(app.tiempos_refresco)
+        return resultado
+    finally:
+        app.root.destroy()
+        servicio_bd.close()
+
+
+def version_codigo():
+    """Commit de git del código medido, si está disponible."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, anterior):
+    """Imprime la relación entre las medianas de dos ejecuciones."""
+    print(f"\nComparación con {anterior['metadatos'].get('commit')} ({anterior['metadatos']['fecha']}):")
+    for tamano, operaciones in actual['resultados'].items():
+        previas = anterior['resultados'].get(tamano, {})
+        for operacion, datos in operaciones.items():
+            previo = previas.get(operacion)
+            if not datos or not previo:
+                continue
+            relacion = datos['mediana_ms'] / previo['mediana_ms'] if previo['mediana_ms'] else float('inf')
+            marca = "  <-- más lento" if relacion > 1.2 else ""
+            print(f"{tamano:>9} {operacion:<24} {previo['mediana_ms']:>10.3f} -> {datos['mediana_ms']:>10.3f} ms "
+                  f"({relacion:.2f}x){marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS_POR_DEFECTO)
+    parser.add_argument('--salida', default='bench_resultados.json')
+    parser.add_argument('--comparar', metavar='ANTERIOR')
+    parser.add_argument('--sin-tk', action='store_true', help="No medir la interfaz.")
+    args = parser.parse_args()
+
+    informe = {
+        'metadatos': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': version_codigo(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'semilla': SEMILLA,
+        },
+        'resultados': {},
+    }
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in args.tamanos:
+            db_name = os.path.join(directorio, f"bench_{cantidad}.db")
+            # Sin caché de lecturas: se mide el SQL de cada repetición
+            db_manager = DatabaseManager(db_name, cache=False)
+            inicio = time.perf_counter()
+            poblar_base(db_manager, cantidad, semilla=SEMILLA)
+            poblado = time.perf_counter() - inicio
+            try:
+                resultados = medir_base(db_manager, cantidad)
+            finally:
+                db_manager.close()
+            resultados['poblar_base'] = {'repeticiones': 1, 'min_ms': poblado * 1000, 'mediana_ms': poblado * 1000,
+                                         'media_ms': poblado * 1000, 'p95_ms': poblado * 1000}
+            if not args.sin_tk:
+                resultados['actualizar_todo'] = medir_interfaz(db_name)
+            informe['resultados'][str(cantidad)] = resultados
+
+            print(f"\n{cantidad} pedidos")
+            for operacion, datos in resultados.items():
+                if datos is None:
+                    print(f"  {operacion:<24} (sin display, omitido)")
+                else:
+                    print(f"  {operacion:<24} mediana {datos['mediana_ms']:>10.3f} ms   p95 {datos['p95_ms']:>10.3f} ms")
+
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar(informe, json.load(archivo))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,46 @@
 # Configuración de la base de datos
 DB_NAME = "cookies_pedidos.db"
 
+# Perfil de la conexión SQLite (PRAGMA nombre = valor al conectar)
+DB_PRAGMAS = {
+    'journal_mode': 'WAL',     # lectores y un escritor a la vez, también entre terminales
+    'synchronous': 'NORMAL',   # con WAL no pierde datos si se cierra la aplicación
+    'busy_timeout': 5000,      # ms que se espera a que otro terminal libere la base
+    'cache_size': -20000,      # negativo: en KiB (unos 20 MB)
+    'mmap_size': 268435456,    # 256 MB de lectura por memoria mapeada
+}
+
+# Reintentos de una escritura si la base sigue bloqueada tras busy_timeout
+DB_REINTENTOS_ESCRITURA = 5
+DB_ESPERA_REINTENTO = 0.05  # segundos; se duplica en cada reintento
+
+# Medición de latencias: histogramas por método y log de consultas lentas
+DB_INSTRUMENTACION = True
+DB_CONSULTA_LENTA_MS = 100
+DB_LOG_CONSULTAS_LENTAS = "consultas_lentas.log"  # junto al archivo de la base
+DB_LOG_MAX_BYTES = 1_000_000
+DB_LOG_COPIAS = 3
+DB_EXPLICAR_CONSULTAS_LENTAS = False  # agregar EXPLAIN QUERY PLAN al log
+
+# Caché de lecturas: pedidos por id y resultados de la lista y los resúmenes
+# (ver database/cache.py). Se invalida con cada escritura, propia o de otro terminal
+DB_CACHE = True
+DB_CACHE_PEDIDOS = 1000    # pedidos guardados por id
+DB_CACHE_CONSULTAS = 64    # resultados de lecturas de la lista y resúmenes
+DB_CACHE_MAX_FILAS = 5000  # las listas más largas no se guardan
+
+# Cola de escrituras agrupadas (ver database/cola_escritura.py): junta las
+# escrituras que llegan mientras se guarda el grupo anterior, más las de
+# DB_COLA_ESPERA_MS desde la primera (subirlo a unos ms rinde con discos
+# lentos), hasta un máximo, y las guarda con un solo commit.
+# DB_COLA_SINCRONIZACION es el PRAGMA synchronous de esos commits ('FULL'
+# espera el disco en cada grupo, 'OFF' no lo espera; None usa DB_PRAGMAS).
+# DB_AGRUPAR_ESCRITURAS la activa en ServicioBD
+DB_AGRUPAR_ESCRITURAS = False
+DB_COLA_ESPERA_MS = 0
+DB_COLA_LOTE_MAXIMO = 100
+DB_COLA_SINCRONIZACION = None
+
 # Sabores válidos de cookies
 SABORES_VALIDOS = [
     "Pistacho", "Rocher", "Sweet", "Velvet", "Kinder", "Rasta",
@@ -8,4 +48,47 @@
 ]
 
 # Configuración de la interfaz
-WINDOW_TITLE = "SweetCookies Gestion de Pedidos" 
\ No newline at end of file
+WINDOW_TITLE = "SweetCookies Gestion de Pedidos" 
+
+# Lista virtual: por encima de este número de pedidos la lista principal
+# carga solo las filas visibles más un margen a cada lado
+LISTA_VIRTUAL_UMBRAL = 5000
+LISTA_VIRTUAL_MARGEN = 50
+
+# Cambios de otros terminales: cada cuántos ms se revisan y con cuántos
+# pedidos cambiados conviene releer la lista entera
+CAMBIOS_INTERVALO_MS = 1000
+CAMBIOS_MAX_INCREMENTAL = 200
+
+# Barra de filtros: ms sin teclear antes de aplicar el filtro
+FILTRO_ESPERA_MS = 250
+
+# Importación masiva: pedidos por transacción
+IMPORTACION_TAMANO_LOTE = 5000
+
+# Exportación: filas leídas de la base por cada fetchmany
+EXPORTACION_TAMANO_LOTE = 1000
+
+# Archivo de días cerrados (ver database/archivo.py): base aparte, junto a
+# la principal, y pedidos que se pasan por transacción
+DB_ARCHIVO_NAME = "cookies_pedidos_archivo.db"
+ARCHIVO_TAMANO_LOTE = 5000
+
+# Servidor HTTP/JSON (servidor.py): dirección, escrituras por transacción,
+# tamaño máximo del cuerpo de una petición y pedidos por página
+SERVIDOR_HOST = "127.0.0.1"
+SERVIDOR_PUERTO = 8080
+SERVIDOR_LOTE_MAXIMO = 100
+SERVIDOR_MAX_CUERPO = 1_000_000
+SERVIDOR_LIMITE_PAGINA = 500
+
+# Planificación de la producción (ver database/planificacion.py): días que
+# se planifican, ventana de los totales móviles, cookies por tanda de horno
+# (por defecto y por sabor) y tandas que entran en el horno por día.
+# PLANIFICACION_NUMPY usa NumPy si está instalado; si no, arrays de Python
+PLANIFICACION_NUMPY = True
+PLANIFICACION_DIAS = 14
+PLANIFICACION_VENTANA = 3
+PLANIFICACION_COOKIES_POR_TANDA = 24
+PLANIFICACION_COOKIES_POR_SABOR = {}
+PLANIFICACION_TANDAS_POR_DIA = 40
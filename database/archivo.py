@@ -0,0 +1,118 @@
+# Archivo de pedidos de días cerrados, en una base aparte.
+#
+# Los pedidos ya entregados pasan de la base de trabajo a otra base (el
+# archivo, `DB_ARCHIVO_NAME` junto a la principal), que se adjunta con
+# ATTACH solo mientras se archiva o se consulta el histórico. Así `pedidos`
+# guarda solo los días abiertos y cada consulta y refresco recorre poco.
+#
+# El archivo es independiente del esquema principal: guarda el nombre del
+# cliente, la dirección y el sabor como texto, así no depende de los ids de
+# `clientes` ni de `sabores`. Se copia y recién después, en otra
+# transacción, se borra de la base principal; con WAL una transacción sobre
+# dos bases no es atómica entre ellas, y así un corte a mitad deja a lo sumo
+# un pedido repetido (que el próximo archivado reemplaza), nunca uno perdido.
+#
+# Un pedido del archivo con el mismo id pero otra fecha de registro es otro
+# pedido (la base principal se recreó o se restauró y los ids volvieron a
+# empezar): el archivado se detiene en lugar de pisarlo.
+
+ESQUEMA_ARCHIVO = 'archivo'
+
+TABLAS_ARCHIVO = [
+    f'''
+    CREATE TABLE IF NOT EXISTS {ESQUEMA_ARCHIVO}.pedidos (
+        id INTEGER PRIMARY KEY,
+        dia TEXT NOT NULL,
+        nombre TEXT NOT NULL,
+        precio_pedido REAL NOT NULL,
+        precio_envio REAL DEFAULT 0.0,
+        direccion TEXT NOT NULL DEFAULT '',
+        horario TEXT,
+        pago INTEGER DEFAULT 0,
+        fecha_registro TIMESTAMP,
+        fecha_archivo TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        fecha_entrega TEXT NOT NULL DEFAULT ''
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS {ESQUEMA_ARCHIVO}.pedido_items (
+        item_id INTEGER PRIMARY KEY,
+        pedido_id INTEGER NOT NULL,
+        sabor TEXT NOT NULL,
+        cantidad INTEGER NOT NULL
+    )
+    ''',
+    f'CREATE INDEX IF NOT EXISTS {ESQUEMA_ARCHIVO}.idx_archivo_items_pedido ON pedido_items (pedido_id)',
+    f'CREATE INDEX IF NOT EXISTS {ESQUEMA_ARCHIVO}.idx_archivo_orden ON pedidos (dia, fecha_registro, id)',
+    f'CREATE INDEX IF NOT EXISTS {ESQUEMA_ARCHIVO}.idx_archivo_fecha ON pedidos (fecha_registro)',
+    f'CREATE INDEX IF NOT EXISTS {ESQUEMA_ARCHIVO}.idx_archivo_entrega ON pedidos (fecha_entrega)',
+]
+
+# Archivos creados antes de la fecha de entrega: se agrega la columna y se
+# calcula en Python (ver DatabaseManager._adjuntar_archivo)
+AGREGAR_FECHA_ENTREGA_ARCHIVO = (
+    f"ALTER TABLE {ESQUEMA_ARCHIVO}.pedidos ADD COLUMN fecha_entrega TEXT NOT NULL DEFAULT ''"
+)
+
+# Ids de una tanda ({marcadores}: un ? por id) que en el archivo son otro pedido
+COLISIONES_ARCHIVO = f'''
+    SELECT a.id FROM {ESQUEMA_ARCHIVO}.pedidos a JOIN main.pedidos p ON p.id = a.id
+    WHERE a.id IN ({{marcadores}}) AND a.fecha_registro IS NOT p.fecha_registro
+    ORDER BY a.id
+'''
+
+# Copias de la tanda que dejó un archivado cortado; se vuelven a copiar
+DESCARTAR_COPIAS = [
+    f"DELETE FROM {ESQUEMA_ARCHIVO}.pedido_items WHERE pedido_id IN ({{marcadores}})",
+    f"DELETE FROM {ESQUEMA_ARCHIVO}.pedidos WHERE id IN ({{marcadores}})",
+]
+
+# Copia de una tanda de pedidos con sus items. Sin OR REPLACE: un id de item
+# que ya esté en el archivo hace fallar la tanda
+COPIAR_PEDIDOS = f'''
+    INSERT INTO {ESQUEMA_ARCHIVO}.pedidos
+        (id, dia, nombre, precio_pedido, precio_envio, direccion, horario, pago, fecha_registro, fecha_entrega)
+    SELECT id, dia, nombre, precio_pedido, precio_envio, direccion, horario, pago, fecha_registro, fecha_entrega
+    FROM main.vista_pedidos WHERE id IN ({{marcadores}})
+'''
+
+COPIAR_ITEMS = f'''
+    INSERT INTO {ESQUEMA_ARCHIVO}.pedido_items (item_id, pedido_id, sabor, cantidad)
+    SELECT item_id, pedido_id, sabor, cantidad
+    FROM main.vista_items WHERE pedido_id IN ({{marcadores}})
+'''
+
+# Solo se borran de la base principal los pedidos que ya están en el archivo
+BORRAR_ARCHIVADOS = f'''
+    DELETE FROM main.pedidos
+    WHERE id IN ({{marcadores}}) AND id IN (SELECT id FROM {ESQUEMA_ARCHIVO}.pedidos)
+'''
+
+# Clientes que quedaron sin pedidos (el archivo guarda su nombre y dirección)
+BORRAR_CLIENTES_SIN_PEDIDOS = '''
+    DELETE FROM clientes WHERE NOT EXISTS (SELECT 1 FROM pedidos WHERE cliente_id = clientes.id)
+'''
+
+# Vistas temporales (de esta conexión) con los pedidos de las dos bases. Un
+# pedido que por un corte quedó en las dos se toma de la principal.
+VISTAS_HISTORICO = [
+    f'''
+    CREATE TEMP VIEW IF NOT EXISTS historico_pedidos AS
+    SELECT id, dia, nombre, precio_pedido, precio_envio, direccion, horario, pago, fecha_registro,
+        fecha_entrega, 0 AS archivado
+    FROM main.vista_pedidos
+    UNION ALL
+    SELECT id, dia, nombre, precio_pedido, precio_envio, direccion, horario, pago, fecha_registro,
+        fecha_entrega, 1 AS archivado
+    FROM {ESQUEMA_ARCHIVO}.pedidos WHERE id NOT IN (SELECT id FROM main.pedidos)
+    ''',
+    f'''
+    CREATE TEMP VIEW IF NOT EXISTS historico_items AS
+    SELECT item_id, pedido_id, sabor, cantidad FROM main.vista_items
+    UNION ALL
+    SELECT item_id, pedido_id, sabor, cantidad
+    FROM {ESQUEMA_ARCHIVO}.pedido_items WHERE pedido_id NOT IN (SELECT id FROM main.pedidos)
+    ''',
+]
+
+BORRAR_VISTAS_HISTORICO = ['DROP VIEW IF EXISTS temp.historico_pedidos', 'DROP VIEW IF EXISTS temp.historico_items']
@@ -0,0 +1,88 @@
+import re
+import unicodedata
+
+# Índice de texto completo (FTS5) sobre el nombre y la dirección de los clientes.
+#
+# clientes_fts es una tabla de contenido externo: guarda solo el índice y
+# lee los textos de `clientes`. Los triggers la mantienen al día cuando se
+# modifica o borra un cliente; los clientes nuevos los indexa
+# DatabaseManager con INDEXAR_CLIENTES, una sentencia por alta o por lote,
+# porque un trigger por fila triplicaba el costo de indexar un lote. Como
+# los clientes no se repiten, el índice crece con los clientes y no con los
+# pedidos. Con remove_diacritics "Gomez" encuentra "Gómez", y prefix='2 3'
+# acelera las búsquedas por prefijo mientras se escribe. clientes_fts_vocab
+# expone los términos indexados para corregir errores de tipeo.
+
+TABLAS_BUSQUEDA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5(
+        nombre, direccion,
+        content='clientes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    ''',
+    "CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts_vocab USING fts5vocab(clientes_fts, 'row')",
+]
+
+TRIGGERS_BUSQUEDA = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_delete
+    AFTER DELETE ON clientes
+    BEGIN
+        INSERT INTO clientes_fts (clientes_fts, rowid, nombre, direccion)
+            VALUES ('delete', OLD.id, OLD.nombre, OLD.direccion);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_update
+    AFTER UPDATE OF nombre, direccion ON clientes
+    BEGIN
+        INSERT INTO clientes_fts (clientes_fts, rowid, nombre, direccion)
+            VALUES ('delete', OLD.id, OLD.nombre, OLD.direccion);
+        INSERT INTO clientes_fts (rowid, nombre, direccion) VALUES (NEW.id, NEW.nombre, NEW.direccion);
+    END
+    ''',
+]
+
+# Triggers de versiones anteriores: el de alta se reemplazó por INDEXAR_CLIENTES
+TRIGGERS_BUSQUEDA_OBSOLETOS = ['trg_clientes_fts_insert']
+
+RECONSTRUIR_BUSQUEDA = "INSERT INTO clientes_fts (clientes_fts) VALUES ('rebuild')"
+
+# Indexa los clientes agregados desde el id dado (los ids nuevos son mayores que los existentes)
+INDEXAR_CLIENTES = """
+    INSERT INTO clientes_fts (rowid, nombre, direccion)
+    SELECT id, nombre, direccion FROM clientes WHERE id >= ?
+"""
+
+# Similitud mínima (difflib) para tomar un término indexado como corrección
+SIMILITUD_MINIMA = 0.75
+# Correcciones que se prueban por cada palabra mal escrita
+MAX_CORRECCIONES = 5
+
+
+def terminos_busqueda(texto):
+    """Separa el texto buscado en términos como los indexa unicode61.
+
+    Pasa a minúsculas, quita los acentos y corta en todo lo que no sea
+    letra o número.
+    """
+    sin_acentos = ''.join(
+        caracter for caracter in unicodedata.normalize('NFKD', texto or '')
+        if not unicodedata.combining(caracter)
+    )
+    return re.findall(r'\w+', sin_acentos.lower())
+
+
+def expresion_match(grupos):
+    """Arma la consulta MATCH: cada grupo es una lista de alternativas.
+
+    Las alternativas de un grupo se unen con OR y los grupos con AND; cada
+    término va entre comillas (no se interpreta como sintaxis de FTS5) y
+    con * para buscar por prefijo.
+    """
+    partes = []
+    for alternativas in grupos:
+        terminos = " OR ".join(f'"{termino}"*' for termino in alternativas)
+        partes.append(f"({terminos})" if len(alternativas) > 1 else terminos)
+    return " AND ".join(partes)
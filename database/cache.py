@@ -0,0 +1,106 @@
+import functools
+from collections import OrderedDict
+
+# Caché de lecturas de DatabaseManager
+#
+# Hay dos cachés LRU acotadas: los pedidos por id (obtener_pedido y
+# obtener_pedidos) y los resultados de las lecturas de la lista y de los
+# resúmenes (métodos @cacheado). Cada escritura propia quita de la primera
+# solo los pedidos que tocó y vacía la segunda, y sube la generación. Las
+# escrituras de otras conexiones (otro terminal) se detectan con PRAGMA
+# data_version antes de cada lectura y vacían las dos.
+
+# Valor que devuelve CacheLRU.obtener cuando la clave no está
+FALTA = object()
+
+
+class CacheLRU:
+    """Diccionario acotado que descarta primero lo usado hace más tiempo.
+
+    Con capacidad 0 no guarda nada. Cuenta aciertos, fallos y descartes.
+    """
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def obtener(self, clave):
+        """Devuelve el valor guardado para `clave`, o FALTA."""
+        valor = self._datos.get(clave, FALTA)
+        if valor is FALTA:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+            self._datos.move_to_end(clave)
+        return valor
+
+    def guardar(self, clave, valor):
+        """Guarda un valor y descarta el más viejo si se pasa de la capacidad."""
+        if self.capacidad <= 0:
+            return
+        self._datos[clave] = valor
+        self._datos.move_to_end(clave)
+        if len(self._datos) > self.capacidad:
+            self._datos.popitem(last=False)
+            self.descartes += 1
+
+    def quitar(self, clave):
+        """Descarta una clave, si está."""
+        self._datos.pop(clave, None)
+
+    def vaciar(self):
+        """Descarta todo lo guardado (los contadores siguen)."""
+        self._datos.clear()
+
+    def estadisticas(self):
+        """Dict con tamaño, capacidad, aciertos, fallos, descartes y tasa de aciertos."""
+        consultas = self.aciertos + self.fallos
+        return {
+            'tamano': len(self._datos),
+            'capacidad': self.capacidad,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'descartes': self.descartes,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+        }
+
+    def reiniciar(self):
+        """Pone los contadores en cero."""
+        self.aciertos = self.fallos = self.descartes = 0
+
+
+def _congelar(valor):
+    """Convierte dicts y listas de los argumentos en tuplas, para usarlos de clave."""
+    if isinstance(valor, dict):
+        return tuple(sorted((clave, _congelar(v)) for clave, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def cacheado(metodo):
+    """Guarda el resultado del método en self.cache_consultas hasta la próxima escritura.
+
+    La clave es el nombre del método y sus argumentos. Las listas se
+    devuelven copiadas, así quien llama puede modificarlas; las de más de
+    `self.cache_max_filas` elementos no se guardan.
+    """
+    nombre = metodo.__name__
+
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        self._comprobar_cambios_externos()
+        clave = (nombre, _congelar(args), _congelar(kwargs))
+        resultado = self.cache_consultas.obtener(clave)
+        if resultado is FALTA:
+            resultado = metodo(self, *args, **kwargs)
+            if not isinstance(resultado, list) or len(resultado) <= self.cache_max_filas:
+                self.cache_consultas.guardar(clave, resultado)
+        return list(resultado) if isinstance(resultado, list) else resultado
+    return envoltura
@@ -0,0 +1,85 @@
+# Registro de cambios de los pedidos, para refrescar otros terminales.
+#
+# `cambios` tiene una fila por pedido que alguna vez se agregó, modificó o
+# eliminó, con el número (`seq`) del último cambio que lo tocó. Los números
+# crecen con cada cambio de un pedido, así que quien ya vio hasta el número
+# N lee solo los pedidos con seq > N; un pedido que ya no está en `pedidos`
+# fue eliminado. Al ser una fila por pedido, la tabla no crece más que la
+# cantidad de pedidos creados.
+#
+# Desde la versión 5 `seq` es el rowid AUTOINCREMENT de la tabla: cada
+# INSERT OR REPLACE borra la fila vieja del pedido y agrega otra con el
+# número siguiente, sin leer MAX(seq), y AUTOINCREMENT evita que se repita
+# el número de la fila borrada. Los triggers están solo en `pedidos`, así
+# que un pedido se registra una vez por sentencia y no una por item; quien
+# cambia solo los items registra el pedido con REGISTRAR_CAMBIO. Desde la
+# versión 7 las altas se registran con REGISTRAR_ALTAS, una vez por lote.
+
+# Versión 2 (ya migrada; ver CAMBIOS_POR_PEDIDO)
+TABLAS_CAMBIOS = [
+    '''
+    CREATE TABLE IF NOT EXISTS cambios (
+        pedido_id INTEGER PRIMARY KEY,
+        seq INTEGER NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_cambios_seq ON cambios (seq)',
+]
+
+# El siguiente número es MAX(seq) + 1, que se lee del índice; las
+# escrituras están serializadas por el bloqueo de SQLite
+_REGISTRAR = "INSERT OR REPLACE INTO cambios (pedido_id, seq) SELECT {pedido}, IFNULL(MAX(seq), 0) + 1 FROM cambios;"
+
+TRIGGERS_CAMBIOS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{tabla}_cambios_{evento.lower()}
+    AFTER {evento} ON {tabla}
+    BEGIN
+        {_REGISTRAR.format(pedido=pedido)}
+    END
+    '''
+    for tabla, evento, pedido in (
+        ('pedidos', 'INSERT', 'NEW.id'),
+        ('pedidos', 'UPDATE', 'NEW.id'),
+        ('pedidos', 'DELETE', 'OLD.id'),
+        ('pedido_items', 'INSERT', 'NEW.pedido_id'),
+        ('pedido_items', 'UPDATE', 'NEW.pedido_id'),
+        ('pedido_items', 'DELETE', 'OLD.pedido_id'),
+    )
+]
+
+# Versión 5: seq AUTOINCREMENT y triggers solo en `pedidos`
+TRIGGERS_CAMBIOS_OBSOLETOS = [f"trg_{tabla}_cambios_{evento}" for tabla in ('pedidos', 'pedido_items')
+                              for evento in ('insert', 'update', 'delete')]
+
+CAMBIOS_POR_PEDIDO = [
+    '''
+    CREATE TABLE cambios_nueva (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        pedido_id INTEGER NOT NULL UNIQUE
+    )
+    ''',
+    # Los números ya vistos por otros terminales se conservan
+    'INSERT INTO cambios_nueva (seq, pedido_id) SELECT seq, pedido_id FROM cambios ORDER BY seq',
+    'DROP TABLE cambios',
+    'ALTER TABLE cambios_nueva RENAME TO cambios',
+]
+
+REGISTRAR_CAMBIO = "INSERT OR REPLACE INTO cambios (pedido_id) VALUES (?)"
+
+TRIGGERS_CAMBIOS_PEDIDOS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_cambios_{evento.lower()}
+    AFTER {evento} ON pedidos
+    BEGIN
+        INSERT OR REPLACE INTO cambios (pedido_id) VALUES ({pedido});
+    END
+    '''
+    for evento, pedido in (('INSERT', 'NEW.id'), ('UPDATE', 'NEW.id'), ('DELETE', 'OLD.id'))
+]
+
+# Versión 7: las altas las registra DatabaseManager con una sentencia por
+# alta o por lote (los ids de un lote son consecutivos)
+TRIGGERS_CAMBIOS_ALTAS = ['trg_pedidos_cambios_insert']
+
+REGISTRAR_ALTAS = "INSERT OR REPLACE INTO cambios (pedido_id) SELECT id FROM pedidos WHERE id BETWEEN ? AND ?"
@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import Future
+from config.settings import DB_COLA_ESPERA_MS, DB_COLA_LOTE_MAXIMO, DB_COLA_SINCRONIZACION
+
+# Cola de escrituras agrupadas (group commit)
+#
+# Cada commit espera al disco, así que muchas escrituras chicas seguidas se
+# juntan y se guardan con un solo commit (DatabaseManager.escribir_grupo),
+# cada una en su SAVEPOINT. El Future de cada escritura se resuelve después
+# del commit, con su resultado o su error.
+
+
+class ColaEscritura:
+    """Agrupa las escrituras enviadas a un ServicioBD en transacciones compartidas.
+
+    Un hilo propio junta las escrituras y manda cada grupo al hilo de la
+    BD del servicio. `sincronizacion` es el PRAGMA synchronous de los
+    commits de la cola (None: el de la conexión).
+    """
+
+    def __init__(self, servicio, espera_ms=DB_COLA_ESPERA_MS, lote_maximo=DB_COLA_LOTE_MAXIMO,
+                 sincronizacion=DB_COLA_SINCRONIZACION):
+        self.servicio = servicio
+        self.espera = espera_ms / 1000
+        self.lote_maximo = max(1, lote_maximo)
+        self.sincronizacion = sincronizacion
+        self._pendientes = []
+        # Instante en que llegó la escritura más vieja que espera
+        self._primera = None
+        self._condicion = threading.Condition()
+        self._cerrada = False
+        self.escrituras = 0
+        self.grupos = 0
+        self.grupo_maximo = 0
+        self._hilo = threading.Thread(target=self._guardar_grupos, name="cola_escritura", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, funcion, *args, **kwargs):
+        """Encola funcion(db_manager, *args, **kwargs); devuelve un Future que se resuelve tras el commit."""
+        future = Future()
+        with self._condicion:
+            if self._cerrada:
+                raise Exception("No se pudo encolar la escritura: la cola está cerrada")
+            if not self._pendientes:
+                self._primera = time.monotonic()
+            self._pendientes.append((funcion, args, kwargs, future))
+            self._condicion.notify()
+        return future
+
+    def ejecutar(self, metodo, *args, **kwargs):
+        """Encola una llamada a un método de escritura de DatabaseManager."""
+        return self.enviar(lambda db_manager, *a, **k: getattr(db_manager, metodo)(*a, **k), *args, **kwargs)
+
+    def _tomar_grupo(self):
+        """Espera el próximo grupo: hasta lote_maximo escrituras o espera_ms desde la primera."""
+        with self._condicion:
+            while True:
+                if self._pendientes:
+                    restante = self._primera + self.espera - time.monotonic()
+                    if len(self._pendientes) >= self.lote_maximo or restante <= 0 or self._cerrada:
+                        break
+                    self._condicion.wait(restante)
+                elif self._cerrada:
+                    return None
+                else:
+                    self._condicion.wait()
+            grupo = self._pendientes[:self.lote_maximo]
+            del self._pendientes[:self.lote_maximo]
+            # Las que quedaron ya esperaron: salen en el grupo siguiente sin más espera
+            return grupo
+
+    def _guardar_grupos(self):
+        """Bucle del hilo de la cola."""
+        while True:
+            grupo = self._tomar_grupo()
+            if grupo is None:
+                return
+            # Las canceladas antes de empezar no se escriben
+            grupo = [escritura for escritura in grupo if escritura[3].set_running_or_notify_cancel()]
+            if not grupo:
+                continue
+            operaciones = [(funcion, args, kwargs) for funcion, args, kwargs, _ in grupo]
+            try:
+                resultados = self.servicio.enviar(
+                    lambda db_manager: db_manager.escribir_grupo(operaciones, self.sincronizacion)).result()
+            except Exception as e:
+                # No se pudo guardar el grupo: falla cada una de sus escrituras
+                resultados = [(False, e)] * len(grupo)
+            self.escrituras += len(grupo)
+            self.grupos += 1
+            self.grupo_maximo = max(self.grupo_maximo, len(grupo))
+            for (_, _, _, future), (correcto, valor) in zip(grupo, resultados):
+                if correcto:
+                    future.set_result(valor)
+                else:
+                    future.set_exception(valor)
+
+    def pendientes(self):
+        """Cantidad de escrituras que esperan su grupo."""
+        with self._condicion:
+            return len(self._pendientes)
+
+    def estadisticas(self):
+        """Dict con escrituras, grupos, el grupo más grande, el promedio por grupo y las pendientes."""
+        return {
+            'escrituras': self.escrituras,
+            'grupos': self.grupos,
+            'grupo_maximo': self.grupo_maximo,
+            'por_grupo': self.escrituras / self.grupos if self.grupos else 0.0,
+            'pendientes': self.pendientes(),
+        }
+
+    def close(self):
+        """Guarda las escrituras pendientes y detiene el hilo."""
+        with self._condicion:
+            self._cerrada = True
+            self._condicion.notify()
+        self._hilo.join()
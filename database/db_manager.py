@@ -1,85 +1,374 @@
 import sqlite3
 import os
-from config.settings import DB_NAME
+import time
+from contextlib import contextmanager
+from difflib import SequenceMatcher, get_close_matches
+from config.settings import (
+    DB_NAME, DB_PRAGMAS, DB_REINTENTOS_ESCRITURA, DB_ESPERA_REINTENTO, EXPORTACION_TAMANO_LOTE,
+    DB_INSTRUMENTACION, DB_CONSULTA_LENTA_MS, DB_LOG_CONSULTAS_LENTAS, DB_LOG_MAX_BYTES, DB_LOG_COPIAS,
+    DB_EXPLICAR_CONSULTAS_LENTAS, DB_CACHE, DB_CACHE_PEDIDOS, DB_CACHE_CONSULTAS, DB_CACHE_MAX_FILAS,
+    CAMBIOS_MAX_INCREMENTAL, DB_ARCHIVO_NAME, ARCHIVO_TAMANO_LOTE,
+)
+from database.archivo import (
+    ESQUEMA_ARCHIVO, TABLAS_ARCHIVO, AGREGAR_FECHA_ENTREGA_ARCHIVO, COLISIONES_ARCHIVO, DESCARTAR_COPIAS,
+    COPIAR_PEDIDOS, COPIAR_ITEMS, BORRAR_ARCHIVADOS, BORRAR_CLIENTES_SIN_PEDIDOS, VISTAS_HISTORICO,
+    BORRAR_VISTAS_HISTORICO,
+)
+from database.cache import CacheLRU, FALTA, cacheado
+from database.cambios import REGISTRAR_CAMBIO, REGISTRAR_ALTAS
+from database.instrumentacion import Instrumentacion, ConexionMedida, medido
+from database.migraciones import MIGRACIONES, VERSION_ESQUEMA
+from database.modelos import Pedido
+from database.busqueda import (
+    TABLAS_BUSQUEDA, TRIGGERS_BUSQUEDA, TRIGGERS_BUSQUEDA_OBSOLETOS, RECONSTRUIR_BUSQUEDA, INDEXAR_CLIENTES,
+    SIMILITUD_MINIMA, MAX_CORRECCIONES, terminos_busqueda, expresion_match,
+)
+from database.resumenes import (
+    RECALCULO_PRODUCCION, RECALCULO_RECAUDACION, RECALCULO_PRODUCCION_FECHA, TOLERANCIA_IMPORTES,
+    SENTENCIAS_PRODUCCION, CREAR_RECAUDACION, SUMAR_RECAUDACION,
+)
+from utils.fechas import fecha_entrega
+
+# Ids por consulta `IN (...)`, por debajo del límite de parámetros de SQLite
+TAMANO_TANDA_IN = 500
+
+# Columnas que se leen para armar un Pedido
+COLUMNAS_PEDIDO = ", ".join(Pedido.COLUMNAS)
+
+# Orden de la lista de pedidos (cronológico por fecha de entrega); es Pedido.clave
+ORDEN_PEDIDOS = "fecha_entrega, dia, fecha_registro, id"
+ORDEN_PEDIDOS_DESC = "fecha_entrega DESC, dia DESC, fecha_registro DESC, id DESC"
+CLAVE_PEDIDO = "(fecha_entrega, dia, fecha_registro, id)"
+MARCADORES_CLAVE = "(?, ?, ?, ?)"
+# Orden cronológico de las filas por día de los resúmenes (alias `p` con la columna `dia`)
+ORDEN_DIA_RESUMEN = "(SELECT MIN(fecha_entrega) FROM pedidos WHERE dia = p.dia), p.dia"
+
+# Columnas editables de un pedido y las que afectan a las tablas de resumen
+CAMPOS_PEDIDO = ('dia', 'nombre', 'precio_pedido', 'precio_envio', 'direccion', 'horario', 'pago')
+CAMPOS_RESUMEN = ('dia', 'precio_pedido', 'precio_envio', 'pago')
+# Columnas que viven en la tabla de clientes
+CAMPOS_CLIENTE = ('nombre', 'direccion')
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, db_name=DB_NAME, pragmas=None, instrumentar=DB_INSTRUMENTACION, cache=DB_CACHE):
+        self.db_name = db_name
+        self.pragmas = dict(DB_PRAGMAS if pragmas is None else pragmas)
         self.conn = None
         self.cursor = None
+        # Si SQLite tiene FTS5; sin él la búsqueda de texto usa LIKE
+        self.busqueda_fts = False
+        # Ids de sabores por nombre (los sabores nunca se borran); se vacía en cada ROLLBACK
+        self._sabores = {}
+        # Contadores de las transacciones de escritura y de la espera por bloqueos
+        self.estadisticas_escritura = {'transacciones': 0, 'reintentos': 0, 'espera_bloqueo': 0.0,
+                                       'operaciones_agrupadas': 0}
+        # Si hay una transacción de grupo_escritura abierta
+        self._grupo_abierto = False
+        # Base de archivo de los días cerrados y si está adjunta
+        self.db_archivo = os.path.join(os.path.dirname(os.path.abspath(db_name)), DB_ARCHIVO_NAME)
+        self._archivo_adjunto = False
+        # Latencias por método y log de consultas lentas (None si no se mide)
+        self.instrumentacion = None
+        if instrumentar:
+            self.instrumentacion = Instrumentacion(
+                DB_CONSULTA_LENTA_MS,
+                ruta_log=os.path.join(os.path.dirname(os.path.abspath(db_name)), DB_LOG_CONSULTAS_LENTAS),
+                max_bytes=DB_LOG_MAX_BYTES, copias=DB_LOG_COPIAS, explicar=DB_EXPLICAR_CONSULTAS_LENTAS,
+            )
+        # Pedidos por id y resultados de lecturas (ver database/cache.py); capacidad 0 si no se usa
+        self.cache_pedidos = CacheLRU(DB_CACHE_PEDIDOS if cache else 0)
+        self.cache_consultas = CacheLRU(DB_CACHE_CONSULTAS if cache else 0)
+        self.cache_max_filas = DB_CACHE_MAX_FILAS
+        # Sube con cada escritura, propia o de otra conexión
+        self.generacion = 0
+        self.cambios_externos = 0
+        # Último PRAGMA data_version leído: cambia cuando escribe otra conexión
+        self._data_version = None
         self.init_db()
 
     def init_db(self):
-        """Inicializa la conexión a la BD y crea las tablas si no existen."""
-        db_exists = os.path.exists(DB_NAME)
-        self.conn = sqlite3.connect(DB_NAME)
+        """Inicializa la conexión a la BD y lleva el esquema a la última versión."""
+        # isolation_level=None: las transacciones se abren explícitamente con BEGIN
+        timeout = self.pragmas.get('busy_timeout', 5000) / 1000
+        if self.instrumentacion is not None:
+            self.conn = sqlite3.connect(self.db_name, timeout=timeout, isolation_level=None, factory=ConexionMedida)
+            self.conn.instrumentacion = self.instrumentacion
+        else:
+            self.conn = sqlite3.connect(self.db_name, timeout=timeout, isolation_level=None)
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        for nombre, valor in self.pragmas.items():
+            self.conn.execute(f"PRAGMA {nombre} = {valor}")
         print("Conectado a la base de datos.")
+        self._migrar()
+        self.busqueda_fts = self._preparar_busqueda()
 
-        if not db_exists:
-            print("Creando tablas...")
-            self._create_tables()
-            print("Tablas creadas.")
-        else:
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            print("Tablas existentes cargadas.")
-            self._check_and_update_tables()
-
-    def _check_and_update_tables(self):
-        """Verifica y actualiza la estructura de las tablas si es necesario."""
-        if not self._column_exists('pedidos', 'pago'):
-            print("Añadiendo columna 'pago' a la tabla 'pedidos'...")
+    def _version_esquema(self):
+        """Devuelve la versión del esquema guardada en PRAGMA user_version."""
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _migrar(self):
+        """Aplica en orden las migraciones posteriores a la versión de la base.
+
+        Con la base al día solo cuesta leer PRAGMA user_version. Cada
+        migración y su número de versión se guardan en la misma transacción;
+        si otro terminal la aplicó mientras se esperaba el bloqueo, se salta.
+        """
+        version = self._version_esquema()
+        if version == VERSION_ESQUEMA:
+            return
+        if version > VERSION_ESQUEMA:
+            raise Exception(f"La base de datos tiene el esquema {version}, más nuevo que el de esta versión "
+                            f"del programa ({VERSION_ESQUEMA}).")
+
+        for numero, descripcion, migracion in MIGRACIONES:
+            if numero <= version:
+                continue
+            print(f"Aplicando migración {numero}: {descripcion}...")
+
+            def operacion(cursor, numero=numero, migracion=migracion):
+                if self._version_esquema() >= numero:
+                    return
+                migracion(cursor)
+                cursor.execute("PRAGMA foreign_key_check")
+                if cursor.fetchone() is not None:
+                    raise Exception(f"No se pudo aplicar la migración {numero}: quedaron referencias inválidas.")
+                cursor.execute(f"PRAGMA user_version = {numero}")
+
+            # Como en el procedimiento de ALTER TABLE de SQLite, las claves
+            # foráneas se desactivan (fuera de la transacción) durante la migración
+            self.conn.execute("PRAGMA foreign_keys = OFF")
             try:
-                self.cursor.execute('ALTER TABLE pedidos ADD COLUMN pago INTEGER DEFAULT 0')
+                self._escribir(operacion, f"No se pudo aplicar la migración {numero}")
+            finally:
+                self.conn.execute("PRAGMA foreign_keys = ON")
+        print("Esquema de la base de datos actualizado.")
+
+    def _preparar_busqueda(self):
+        """Indica si se puede usar el índice FTS5, creándolo si falta.
+
+        El índice no es parte de las migraciones porque depende de que la
+        biblioteca SQLite incluya FTS5; sin él la búsqueda de texto usa LIKE.
+        """
+        try:
+            self.conn.execute("SELECT 1 FROM clientes_fts LIMIT 0")
+            marcadores = ", ".join("?" * len(TRIGGERS_BUSQUEDA_OBSOLETOS))
+            if self.conn.execute(f"SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name IN ({marcadores})",
+                                 TRIGGERS_BUSQUEDA_OBSOLETOS).fetchone():
+                def quitar(cursor):
+                    for trigger in TRIGGERS_BUSQUEDA_OBSOLETOS:
+                        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                self._escribir(quitar, "No se pudo actualizar el índice de búsqueda")
+            return True
+        except sqlite3.OperationalError as e:
+            if 'no such table' not in str(e):
+                print("SQLite sin FTS5: la búsqueda de texto usará LIKE.")
+                return False
+
+        def operacion(cursor):
+            for sql in TABLAS_BUSQUEDA + TRIGGERS_BUSQUEDA:
+                cursor.execute(sql)
+            cursor.execute(RECONSTRUIR_BUSQUEDA)
+
+        try:
+            self._escribir(operacion, "No se pudo crear el índice de búsqueda")
+            print("Índice de búsqueda creado.")
+            return True
+        except Exception as e:
+            if 'fts5' not in str(e):
+                raise
+            print("SQLite sin FTS5: la búsqueda de texto usará LIKE.")
+            return False
+
+    def _escribir(self, operacion, mensaje_error):
+        """Ejecuta operacion(cursor) en una transacción de escritura.
+
+        BEGIN IMMEDIATE toma el bloqueo de escritura al empezar, así otro
+        terminal no puede dejar la transacción a medias. Si la base sigue
+        bloqueada tras busy_timeout se reintenta con espera creciente.
+        Dentro de `grupo_escritura` la operación corre en un SAVEPOINT de la
+        transacción del grupo.
+        """
+        if self._grupo_abierto:
+            return self._escribir_en_grupo(operacion, mensaje_error)
+        espera = DB_ESPERA_REINTENTO
+        for intento in range(DB_REINTENTOS_ESCRITURA + 1):
+            inicio = time.perf_counter()
+            try:
+                self.cursor.execute("BEGIN IMMEDIATE")
+                self.estadisticas_escritura['espera_bloqueo'] += time.perf_counter() - inicio
+                resultado = operacion(self.cursor)
                 self.conn.commit()
-                print("Columna 'pago' añadida correctamente.")
+                self.estadisticas_escritura['transacciones'] += 1
+                return resultado
+            except sqlite3.OperationalError as e:
+                self.estadisticas_escritura['espera_bloqueo'] += time.perf_counter() - inicio
+                self._deshacer()
+                if not self._es_bloqueo(e) or intento == DB_REINTENTOS_ESCRITURA:
+                    raise Exception(f"{mensaje_error}: {e}")
+                self.estadisticas_escritura['reintentos'] += 1
+                time.sleep(espera)
+                self.estadisticas_escritura['espera_bloqueo'] += espera
+                espera *= 2
             except sqlite3.Error as e:
-                print(f"Error al añadir columna 'pago': {e}")
-                raise Exception(f"No se pudo actualizar la tabla 'pedidos': {e}")
-        else:
-            print("Columna 'pago' ya existe.")
+                self._deshacer()
+                raise Exception(f"{mensaje_error}: {e}")
+            except Exception:
+                self._deshacer()
+                raise
 
-    def _column_exists(self, table_name, column_name):
-        """Verifica si una columna existe en una tabla."""
-        if not self.cursor:
-            return False
+    def _deshacer(self):
+        """ROLLBACK de la transacción; los ids de sabores leídos o agregados en ella pueden no quedar."""
+        self.conn.rollback()
+        self._sabores.clear()
+
+    def _escribir_en_grupo(self, operacion, mensaje_error):
+        """Ejecuta operacion(cursor) en un SAVEPOINT: si falla se deshace solo ella."""
+        self.cursor.execute("SAVEPOINT operacion")
         try:
-            self.cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = [info[1] for info in self.cursor.fetchall()]
-            return column_name in columns
-        except sqlite3.Error as e:
-            print(f"Error al verificar columna {column_name} en {table_name}: {e}")
-            return False
+            resultado = operacion(self.cursor)
+        except Exception as e:
+            self.cursor.execute("ROLLBACK TO operacion")
+            self.cursor.execute("RELEASE operacion")
+            # Los sabores que agregó la operación ya no existen
+            self._sabores.clear()
+            if isinstance(e, sqlite3.Error):
+                raise Exception(f"{mensaje_error}: {e}")
+            raise
+        self.cursor.execute("RELEASE operacion")
+        self.estadisticas_escritura['operaciones_agrupadas'] += 1
+        return resultado
 
-    def _create_tables(self):
-        """Crea las tablas necesarias en la base de datos."""
-        # Tabla de Pedidos principales
-        self.cursor.execute('''
-            CREATE TABLE pedidos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                dia TEXT NOT NULL,
-                nombre TEXT NOT NULL,
-                precio_pedido REAL NOT NULL,
-                precio_envio REAL DEFAULT 0.0,
-                direccion TEXT,
-                horario TEXT,
-                pago INTEGER DEFAULT 0,
-                fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        # Tabla de Items de cada Pedido
-        self.cursor.execute('''
-            CREATE TABLE pedido_items (
-                item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                pedido_id INTEGER NOT NULL,
-                sabor TEXT NOT NULL,
-                cantidad INTEGER NOT NULL,
-                FOREIGN KEY (pedido_id) REFERENCES pedidos (id) ON DELETE CASCADE
-            )
-        ''')
-        # Índice para búsquedas rápidas
-        self.cursor.execute('CREATE INDEX idx_pedido_id ON pedido_items (pedido_id)')
-        self.conn.commit()
+    @contextmanager
+    def grupo_escritura(self, sincronizacion=None):
+        """Agrupa las escrituras del bloque en una sola transacción y un solo commit.
+
+        Cada escritura devuelve su resultado o lanza su error como siempre,
+        pero se guarda al salir del bloque; si el bloque termina con una
+        excepción no se guarda ninguna. Un grupo dentro de otro se suma al
+        de afuera. `sincronizacion` ('OFF', 'NORMAL' o 'FULL') cambia el
+        PRAGMA synchronous solo para este commit; None usa el de la conexión.
+        """
+        if self._grupo_abierto:
+            yield
+            return
+        anterior = None
+        if sincronizacion is not None:
+            if str(sincronizacion).upper() not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+                raise Exception(f"Nivel de sincronización inválido: {sincronizacion}")
+            anterior = self.cursor.execute("PRAGMA synchronous").fetchone()[0]
+            self.cursor.execute(f"PRAGMA synchronous = {sincronizacion}")
+        try:
+            with self._transaccion_grupo():
+                yield
+        finally:
+            if anterior is not None:
+                self.cursor.execute(f"PRAGMA synchronous = {anterior}")
+
+    @contextmanager
+    def _transaccion_grupo(self):
+        """La transacción de grupo_escritura, con los reintentos de BEGIN IMMEDIATE."""
+        espera = DB_ESPERA_REINTENTO
+        for intento in range(DB_REINTENTOS_ESCRITURA + 1):
+            inicio = time.perf_counter()
+            try:
+                self.cursor.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if not self._es_bloqueo(e) or intento == DB_REINTENTOS_ESCRITURA:
+                    raise Exception(f"No se pudo empezar el grupo de escrituras: {e}")
+                self.estadisticas_escritura['reintentos'] += 1
+                time.sleep(espera)
+                espera *= 2
+            finally:
+                self.estadisticas_escritura['espera_bloqueo'] += time.perf_counter() - inicio
+
+        self._grupo_abierto = True
+        try:
+            yield
+            self.conn.commit()
+            self.estadisticas_escritura['transacciones'] += 1
+        except BaseException as e:
+            # Las escrituras y lecturas del grupo pudieron guardar en las cachés
+            # (pedidos, consultas, ids de sabores) datos que no quedaron
+            self._deshacer()
+            self.cache_pedidos.vaciar()
+            self._invalidar()
+            if isinstance(e, sqlite3.Error):
+                raise Exception(f"No se pudo guardar el grupo de escrituras: {e}")
+            raise
+        finally:
+            self._grupo_abierto = False
+
+    def escribir_grupo(self, operaciones, sincronizacion=None):
+        """Ejecuta varias escrituras en una sola transacción (ver grupo_escritura).
+
+        `operaciones` es una lista de (funcion, args, kwargs) que se llaman
+        como funcion(self, *args, **kwargs). Devuelve, en el mismo orden,
+        (True, resultado) o (False, excepción) por operación: un error
+        deshace solo su operación y las demás se guardan igual.
+        """
+        resultados = []
+        with self.grupo_escritura(sincronizacion):
+            for funcion, args, kwargs in operaciones:
+                try:
+                    resultados.append((True, funcion(self, *args, **kwargs)))
+                except Exception as e:
+                    resultados.append((False, e))
+        return resultados
+
+    def _invalidar(self, pedido_ids=()):
+        """Quita de la caché los pedidos dados y las lecturas guardadas, tras una escritura propia."""
+        for pedido_id in pedido_ids:
+            self.cache_pedidos.quitar(pedido_id)
+        self.cache_consultas.vaciar()
+        self.generacion += 1
+
+    def _comprobar_cambios_externos(self):
+        """Vacía la caché si otra conexión escribió en la base desde la última comprobación.
+
+        PRAGMA data_version no cambia con las escrituras de esta conexión, que
+        ya invalidan lo suyo, y leerlo no toca el archivo de la base.
+        """
+        version = self.version_datos()
+        if version == self._data_version:
+            return
+        if self._data_version is not None:
+            self.cambios_externos += 1
+            self.cache_pedidos.vaciar()
+            self.cache_consultas.vaciar()
+            self.generacion += 1
+        self._data_version = version
+
+    def version_datos(self):
+        """PRAGMA data_version: cambia cada vez que otra conexión confirma una escritura."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def estadisticas_cache(self):
+        """Dict con las estadísticas de las dos cachés, la generación y los cambios de otras conexiones."""
+        return {
+            'pedidos': self.cache_pedidos.estadisticas(),
+            'consultas': self.cache_consultas.estadisticas(),
+            'generacion': self.generacion,
+            'cambios_externos': self.cambios_externos,
+        }
+
+    def informe_cache(self):
+        """Texto con aciertos y fallos de cada caché."""
+        lineas = []
+        for nombre, cache in (("pedidos por id", self.cache_pedidos), ("lecturas", self.cache_consultas)):
+            datos = cache.estadisticas()
+            lineas.append(f"Caché de {nombre}: {datos['aciertos']} aciertos, {datos['fallos']} fallos "
+                          f"({datos['tasa_aciertos']:.0%}), {datos['tamano']}/{datos['capacidad']} guardados")
+        lineas.append(f"Escrituras de otras conexiones detectadas: {self.cambios_externos}")
+        return "\n".join(lineas)
+
+    @staticmethod
+    def _es_bloqueo(error):
+        """Indica si un error de SQLite se debe a que otra conexión tiene el bloqueo."""
+        mensaje = str(error).lower()
+        return 'locked' in mensaje or 'busy' in mensaje
 
     def close(self):
         """Cierra la conexión a la base de datos."""
@@ -87,119 +376,1037 @@ def close(self):
             self.conn.close()
             print("Conexión a la base de datos cerrada.")
 
-    def cargar_pedidos(self):
-        """Carga todos los pedidos y sus items de la base de datos."""
+    def _consultar(self, sql, parametros=(), fabrica=None):
+        """Ejecuta una consulta en un cursor propio y devuelve sus filas.
+
+        `fabrica` es el row_factory del cursor: `Pedido.desde_fila` para
+        leer pedidos, o None para leer tuplas.
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = fabrica
+        try:
+            cursor.execute(sql, parametros)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    @medido
+    @cacheado
+    def cargar_pedidos(self, filtro=None):
+        """Carga todos los pedidos y sus items de la base de datos.
+
+        Usa dos consultas (pedidos e items) y agrupa los items en Python,
+        en lugar de una consulta de items por cada pedido. Con `filtro`
+        (ver `_condicion_filtro`) solo se cargan los pedidos que lo cumplen.
+        Devuelve objetos `Pedido`.
+        """
         if not self.cursor:
             return []
         try:
-            self.cursor.execute("SELECT * FROM pedidos ORDER BY dia, fecha_registro")
-            pedidos_db = self.cursor.fetchall()
-            pedidos_completos = []
-            for pedido_row in pedidos_db:
-                pedido_dict = dict(pedido_row)
-                self.cursor.execute("SELECT sabor, cantidad FROM pedido_items WHERE pedido_id = ?", (pedido_dict['id'],))
-                items_db = self.cursor.fetchall()
-                pedido_dict['items'] = [dict(item) for item in items_db]
-                pedidos_completos.append(pedido_dict)
-            return pedidos_completos
+            if filtro:
+                condicion, parametros = self._condicion_filtro(filtro)
+                return self._adjuntar_items(self._consultar(
+                    f"SELECT {COLUMNAS_PEDIDO} FROM vista_pedidos {condicion} ORDER BY {ORDEN_PEDIDOS}",
+                    parametros, Pedido.desde_fila))
+
+            pedidos = self._consultar(
+                f"SELECT {COLUMNAS_PEDIDO} FROM vista_pedidos ORDER BY {ORDEN_PEDIDOS}",
+                fabrica=Pedido.desde_fila)
+            pedidos_por_id = {pedido.id: pedido for pedido in pedidos}
+            for pedido_id, sabor, cantidad in self._consultar(
+                    "SELECT pedido_id, sabor, cantidad FROM vista_items ORDER BY item_id"):
+                pedido = pedidos_por_id.get(pedido_id)
+                if pedido is not None:
+                    pedido.agregar_item(sabor, cantidad)
+            return pedidos
         except sqlite3.Error as e:
             raise Exception(f"No se pudieron cargar los pedidos: {e}")
 
-    def agregar_pedido(self, dia, nombre, precio_pedido, precio_envio, direccion, horario, items):
-        """Agrega un nuevo pedido a la base de datos."""
+    def _condicion_filtro(self, filtro, condiciones=(), parametros=()):
+        """Arma el WHERE de un filtro de la lista de pedidos.
+
+        `filtro` es un dict con claves opcionales 'texto' (nombre o
+        dirección), 'dia', 'sabor', 'pago' (0 o 1) y 'fecha_desde' y
+        'fecha_hasta' ('AAAA-MM-DD', inclusivas, sobre la fecha de entrega;
+        con alguna de las dos quedan fuera los días que no se entendieron).
+        Se agregan a las `condiciones` dadas. Solo usa columnas comunes a `pedidos` y
+        `vista_pedidos`. Devuelve (texto del WHERE o "", parámetros).
+        """
+        condiciones, parametros = list(condiciones), list(parametros)
+        filtro = filtro or {}
+        if filtro.get('dia'):
+            condiciones.append("dia = ?")
+            parametros.append(filtro['dia'])
+        if filtro.get('pago') is not None:
+            condiciones.append("pago = ?")
+            parametros.append(filtro['pago'])
+        if filtro.get('fecha_desde') or filtro.get('fecha_hasta'):
+            # '' (día sin fecha) queda antes que cualquier fecha
+            condiciones.append("fecha_entrega BETWEEN ? AND ?")
+            parametros.extend([filtro.get('fecha_desde') or '0000-01-01', filtro.get('fecha_hasta') or '9999-12-31'])
+        if filtro.get('sabor'):
+            condiciones.append("id IN (SELECT pedido_id FROM pedido_items WHERE sabor_id = "
+                               "(SELECT id FROM sabores WHERE nombre = ?))")
+            parametros.append(filtro['sabor'])
+        if filtro.get('texto'):
+            # El texto se busca entre los clientes y de ahí se pasa a sus pedidos
+            clientes = None
+            if self.busqueda_fts:
+                expresion = self._expresion_busqueda(filtro['texto'])
+                if expresion:
+                    clientes = "SELECT rowid FROM clientes_fts WHERE clientes_fts MATCH ?"
+                    parametros.append(expresion)
+            else:
+                palabras = filtro['texto'].split()
+                if palabras:
+                    clientes = "SELECT id FROM clientes WHERE " + " AND ".join(
+                        ["(nombre LIKE ? OR direccion LIKE ?)"] * len(palabras))
+                    parametros.extend(f"%{palabra}%" for palabra in palabras for _ in range(2))
+            if clientes:
+                condiciones.append(f"id IN (SELECT id FROM pedidos WHERE cliente_id IN ({clientes}))")
+        if not condiciones:
+            return "", parametros
+        return "WHERE " + " AND ".join(condiciones), parametros
+
+    def _expresion_busqueda(self, texto):
+        """Convierte el texto buscado en una consulta MATCH de FTS5.
+
+        Cada palabra se busca por prefijo. Si ningún término indexado
+        empieza así (un error de tipeo), se buscan los términos parecidos
+        que empiezan con la misma letra.
+        """
+        grupos = []
+        for termino in terminos_busqueda(texto):
+            self.cursor.execute("SELECT 1 FROM clientes_fts_vocab WHERE term >= ? AND term < ? LIMIT 1",
+                                (termino, termino + '\uffff'))
+            if self.cursor.fetchone() is not None:
+                grupos.append([termino])
+                continue
+            self.cursor.execute("SELECT term FROM clientes_fts_vocab WHERE term >= ? AND term < ?",
+                                (termino[0], termino[0] + '\uffff'))
+            candidatos = [fila[0] for fila in self.cursor.fetchall()]
+            parecidos = get_close_matches(termino, candidatos, n=MAX_CORRECCIONES, cutoff=SIMILITUD_MINIMA)
+            grupos.append(parecidos or [termino])
+        return expresion_match(grupos)
+
+    def _adjuntar_items(self, pedidos):
+        """Carga con una consulta por tanda los items de los pedidos dados."""
+        pedidos_por_id = {pedido.id: pedido for pedido in pedidos}
+        for tanda, marcadores in self._tandas(list(pedidos_por_id)):
+            for pedido_id, sabor, cantidad in self._consultar(
+                    f"SELECT pedido_id, sabor, cantidad FROM vista_items WHERE pedido_id IN ({marcadores}) "
+                    f"ORDER BY item_id", tanda):
+                pedidos_por_id[pedido_id].agregar_item(sabor, cantidad)
+        return pedidos
+
+    @staticmethod
+    def _tandas(ids, tamano=TAMANO_TANDA_IN):
+        """Genera (tanda, marcadores) para consultas `IN (...)` sin pasar el límite de parámetros de SQLite."""
+        for inicio in range(0, len(ids), tamano):
+            tanda = ids[inicio:inicio + tamano]
+            yield tanda, ", ".join("?" * len(tanda))
+
+    @medido
+    def obtener_pedidos(self, pedido_ids):
+        """Obtiene varios pedidos con sus items, en el orden de la lista.
+
+        Los que están en la caché no se vuelven a leer.
+        """
+        try:
+            self._comprobar_cambios_externos()
+            pedidos, faltan = [], []
+            for pedido_id in dict.fromkeys(pedido_ids):
+                pedido = self.cache_pedidos.obtener(pedido_id)
+                if pedido is FALTA:
+                    faltan.append(pedido_id)
+                else:
+                    pedidos.append(pedido)
+            leidos = []
+            for tanda, marcadores in self._tandas(faltan):
+                leidos.extend(self._consultar(f"SELECT {COLUMNAS_PEDIDO} FROM vista_pedidos WHERE id IN ({marcadores})",
+                                              tanda, Pedido.desde_fila))
+            for pedido in self._adjuntar_items(leidos):
+                self.cache_pedidos.guardar(pedido.id, pedido)
+            pedidos.extend(leidos)
+            pedidos.sort(key=lambda pedido: pedido.clave)
+            return pedidos
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudieron obtener los pedidos: {e}")
+
+    @medido
+    def ultimo_cambio(self):
+        """Número del último cambio registrado en `cambios` (0 si no hay)."""
+        try:
+            self.cursor.execute("SELECT IFNULL(MAX(seq), 0) FROM cambios")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo leer el registro de cambios: {e}")
+
+    @medido
+    def cambios_desde(self, desde, version=None, limite=CAMBIOS_MAX_INCREMENTAL):
+        """Ids de los pedidos agregados, modificados o eliminados después del cambio `desde`.
+
+        Si `version` (un `version_datos()` anterior) no cambió, ninguna otra
+        conexión escribió y se devuelve None sin leer la tabla; los cambios
+        propios ya los conoce quien los hizo. Si no, devuelve un dict con
+        'version', 'ultimo' (número del último cambio), 'pedido_ids' en orden
+        de cambio y 'completo': True si cambiaron más de `limite` pedidos y
+        conviene releer todo (entonces 'pedido_ids' va vacío).
+        """
+        try:
+            version_actual = self.version_datos()
+            if version is not None and version == version_actual:
+                return None
+            self.cursor.execute("SELECT pedido_id, seq FROM cambios WHERE seq > ? ORDER BY seq LIMIT ?",
+                                (desde, limite + 1))
+            filas = self.cursor.fetchall()
+            completo = len(filas) > limite
+            return {
+                'version': version_actual,
+                'ultimo': self.ultimo_cambio() if completo or not filas else filas[-1]['seq'],
+                'pedido_ids': [] if completo else [fila['pedido_id'] for fila in filas],
+                'completo': completo,
+            }
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo leer el registro de cambios: {e}")
+
+    @medido
+    @cacheado
+    def contar_pedidos(self, filtro=None):
+        """Devuelve el número de pedidos, o de los que cumplen `filtro`.
+
+        Sin filtro se lee de la tabla de recaudación por día.
+        """
+        try:
+            if filtro:
+                condicion, parametros = self._condicion_filtro(filtro)
+                self.cursor.execute(f"SELECT COUNT(*) FROM pedidos {condicion}", parametros)
+            else:
+                self.cursor.execute("SELECT COALESCE(SUM(pedidos), 0) FROM recaudacion_dia")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudieron contar los pedidos: {e}")
+
+    @medido
+    @cacheado
+    def cargar_pagina_pedidos(self, despues_de=None, antes_de=None, limite=100, incluir=False, filtro=None):
+        """Carga una página de pedidos en el orden (fecha_entrega, dia, fecha_registro, id).
+
+        `despues_de` y `antes_de` son claves (`Pedido.clave`) de la
+        página vecina; con `antes_de` se devuelven los `limite` pedidos
+        anteriores, también en orden ascendente. `incluir` hace inclusivo el
+        límite. Sin clave se devuelve la primera página. Con `filtro` se
+        pagina solo entre los pedidos que lo cumplen.
+        """
+        try:
+            if antes_de is not None:
+                operador = "<=" if incluir else "<"
+                condicion, parametros = self._condicion_filtro(
+                    filtro, [f"{CLAVE_PEDIDO} {operador} {MARCADORES_CLAVE}"], antes_de)
+                pedidos = self._consultar(f"""
+                    SELECT {COLUMNAS_PEDIDO} FROM vista_pedidos {condicion}
+                    ORDER BY {ORDEN_PEDIDOS_DESC} LIMIT ?
+                """, (*parametros, limite), Pedido.desde_fila)
+                pedidos.reverse()
+            else:
+                if despues_de is not None:
+                    operador = ">=" if incluir else ">"
+                    condicion, parametros = self._condicion_filtro(
+                        filtro, [f"{CLAVE_PEDIDO} {operador} {MARCADORES_CLAVE}"], despues_de)
+                else:
+                    condicion, parametros = self._condicion_filtro(filtro)
+                pedidos = self._consultar(f"""
+                    SELECT {COLUMNAS_PEDIDO} FROM vista_pedidos {condicion}
+                    ORDER BY {ORDEN_PEDIDOS} LIMIT ?
+                """, (*parametros, limite), Pedido.desde_fila)
+            return self._adjuntar_items(pedidos)
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudieron cargar los pedidos: {e}")
+
+    @medido
+    @cacheado
+    def cargar_pedidos_desde(self, posicion, limite=100, filtro=None):
+        """Carga `limite` pedidos a partir de una posición absoluta de la lista.
+
+        Usa OFFSET sobre el índice de orden; sirve para saltos de la barra
+        de desplazamiento, el recorrido normal usa `cargar_pagina_pedidos`.
+        """
+        try:
+            condicion, parametros = self._condicion_filtro(filtro)
+            return self._adjuntar_items(self._consultar(
+                f"SELECT {COLUMNAS_PEDIDO} FROM vista_pedidos {condicion} "
+                f"ORDER BY {ORDEN_PEDIDOS} LIMIT ? OFFSET ?",
+                (*parametros, limite, max(0, posicion)), Pedido.desde_fila))
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudieron cargar los pedidos: {e}")
+
+    @medido
+    @cacheado
+    def posicion_pedido(self, clave, filtro=None):
+        """Devuelve cuántos pedidos (que cumplen `filtro`) hay antes de la clave (`Pedido.clave`)."""
+        try:
+            condicion, parametros = self._condicion_filtro(filtro, [f"{CLAVE_PEDIDO} < {MARCADORES_CLAVE}"], clave)
+            self.cursor.execute(f"SELECT COUNT(*) FROM pedidos {condicion}", parametros)
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo calcular la posición del pedido: {e}")
+
+    @medido
+    def iterar_pedidos(self, dia=None, tamano_lote=EXPORTACION_TAMANO_LOTE, historico=False):
+        """Genera los pedidos con sus items sin cargarlos todos en memoria.
+
+        Recorre un join pedidos-items con un cursor propio y fetchmany, y
+        agrupa las filas consecutivas de cada pedido. Con `dia` solo se
+        recorren los pedidos de ese día; con `historico`, también los del
+        archivo.
+        """
+        if historico:
+            with self.con_archivo():
+                yield from self._iterar_pedidos(
+                    dia, tamano_lote, "historico_pedidos p LEFT JOIN historico_items i ON i.pedido_id = p.id",
+                    "i.sabor")
+            return
+        yield from self._iterar_pedidos(dia, tamano_lote, """vista_pedidos p
+                LEFT JOIN pedido_items i ON i.pedido_id = p.id
+                LEFT JOIN sabores s ON s.id = i.sabor_id""", "s.nombre")
+
+    def _iterar_pedidos(self, dia, tamano_lote, origen, sabor):
+        """Cuerpo de iterar_pedidos: `origen` es el FROM y `sabor` la columna del nombre del sabor."""
+        filtro, parametros = ("WHERE p.dia = ?", (dia,)) if dia is not None else ("", ())
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT p.*, {sabor} AS item_sabor, i.cantidad AS item_cantidad
+                FROM {origen}
+                {filtro}
+                ORDER BY p.fecha_entrega, p.dia, p.fecha_registro, p.id, i.item_id
+            """, parametros)
+            pedido_dict = None
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                for fila in filas:
+                    if pedido_dict is None or pedido_dict['id'] != fila['id']:
+                        if pedido_dict is not None:
+                            yield pedido_dict
+                        pedido_dict = {clave: fila[clave] for clave in fila.keys()
+                                       if clave not in ('item_sabor', 'item_cantidad')}
+                        pedido_dict['items'] = []
+                    if fila['item_sabor'] is not None:
+                        pedido_dict['items'].append({'sabor': fila['item_sabor'], 'cantidad': fila['item_cantidad']})
+            if pedido_dict is not None:
+                yield pedido_dict
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudieron leer los pedidos: {e}")
+        finally:
+            cursor.close()
+
+    @medido
+    def iterar_produccion_dia(self, dia=None, historico=False):
+        """Genera (dia, sabor, cantidad) de la hoja de producción, de uno o de todos los días.
+
+        Con `historico` la calcula de los pedidos de las dos bases, porque
+        las tablas de resumen cuentan solo los de la principal.
+        """
+        if historico:
+            with self.con_archivo():
+                yield from self._iterar_produccion_historica(dia)
+            return
+        filtro, parametros = ("AND p.dia = ?", (dia,)) if dia is not None else ("", ())
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT p.dia, s.nombre, p.cantidad
+                FROM produccion_dia_sabor p JOIN sabores s ON s.id = p.sabor_id
+                WHERE p.cantidad > 0 {filtro} ORDER BY {ORDEN_DIA_RESUMEN}, s.nombre
+            """, parametros)
+            for fila in cursor:
+                yield tuple(fila)
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo leer la producción: {e}")
+        finally:
+            cursor.close()
+
+    def _iterar_produccion_historica(self, dia=None):
+        """Genera (dia, sabor, cantidad) sumando los items de `historico_items`."""
+        filtro, parametros = ("WHERE p.dia = ?", (dia,)) if dia is not None else ("", ())
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT p.dia, i.sabor, SUM(i.cantidad) AS cantidad
+                FROM historico_pedidos p JOIN historico_items i ON i.pedido_id = p.id
+                {filtro}
+                GROUP BY p.dia, i.sabor HAVING SUM(i.cantidad) > 0
+                ORDER BY MIN(MIN(p.fecha_entrega)) OVER (PARTITION BY p.dia), p.dia, i.sabor
+            """, parametros)
+            for fila in cursor:
+                yield tuple(fila)
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo leer la producción histórica: {e}")
+        finally:
+            cursor.close()
+
+    @medido
+    def iterar_entregas(self, dia, tamano_lote=EXPORTACION_TAMANO_LOTE, historico=False):
+        """Genera los pedidos con dirección de un día, en orden de horario (con `historico`, también archivados)."""
+        if historico:
+            with self.con_archivo():
+                yield from self._iterar_entregas(dia, tamano_lote, 'historico_pedidos', 'historico_items')
+            return
+        yield from self._iterar_entregas(dia, tamano_lote, 'vista_pedidos', 'vista_items')
+
+    def _iterar_entregas(self, dia, tamano_lote, vista_pedidos, vista_items):
+        """Cuerpo de iterar_entregas sobre las vistas dadas."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT p.id, p.nombre, p.direccion, p.horario,
+                    p.precio_pedido + IFNULL(p.precio_envio, 0) AS total, p.pago,
+                    (SELECT group_concat(sabor || ':' || cantidad, ';') FROM (
+                        SELECT sabor, cantidad FROM {vista_items} WHERE pedido_id = p.id ORDER BY item_id
+                     )) AS items
+                FROM {vista_pedidos} p
+                WHERE p.dia = ? AND TRIM(IFNULL(p.direccion, '')) <> ''
+                ORDER BY p.horario, p.id
+            """, (dia,))
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                for fila in filas:
+                    yield dict(fila)
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudieron leer las entregas: {e}")
+        finally:
+            cursor.close()
+
+    @medido
+    @cacheado
+    def resumen_produccion(self):
+        """Devuelve [(sabor, cantidad)] con el total a producir por sabor."""
+        try:
+            self.cursor.execute("""
+                SELECT s.nombre, SUM(p.cantidad)
+                FROM produccion_dia_sabor p JOIN sabores s ON s.id = p.sabor_id
+                GROUP BY s.nombre HAVING SUM(p.cantidad) > 0 ORDER BY s.nombre
+            """)
+            return [tuple(fila) for fila in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo calcular el resumen de producción: {e}")
+
+    @medido
+    @cacheado
+    def resumen_por_dia(self):
+        """Devuelve [(dia, sabor, cantidad)] ordenado por fecha de entrega, día y sabor."""
+        try:
+            self.cursor.execute(f"""
+                SELECT p.dia, s.nombre, p.cantidad
+                FROM produccion_dia_sabor p JOIN sabores s ON s.id = p.sabor_id
+                WHERE p.cantidad > 0 ORDER BY {ORDEN_DIA_RESUMEN}, s.nombre
+            """)
+            return [tuple(fila) for fila in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo calcular el resumen por día: {e}")
+
+    @medido
+    @cacheado
+    def produccion_por_fecha(self, desde, hasta):
+        """Devuelve [(fecha_entrega, sabor, cantidad)] entre dos fechas ISO inclusive.
+
+        Lee la tabla de resumen por fecha, así que cuesta O(días x sabores).
+        Con desde = hasta = '' da lo de los pedidos cuyo día no se entendió.
+        """
+        try:
+            self.cursor.execute("""
+                SELECT p.fecha_entrega, s.nombre, p.cantidad
+                FROM produccion_fecha_sabor p JOIN sabores s ON s.id = p.sabor_id
+                WHERE p.fecha_entrega BETWEEN ? AND ? AND p.cantidad > 0
+                ORDER BY p.fecha_entrega, s.nombre
+            """, (desde, hasta))
+            return [tuple(fila) for fila in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo leer la producción por fecha: {e}")
+
+    @medido
+    @cacheado
+    def total_recaudado(self):
+        """Devuelve la suma de precio de pedido y envío de todos los pedidos."""
+        try:
+            self.cursor.execute("SELECT COALESCE(SUM(total), 0.0) FROM recaudacion_dia")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo calcular el total recaudado: {e}")
+
+    @medido
+    def reconstruir_resumenes(self):
+        """Recalcula desde cero las tablas de resumen materializadas."""
+        def operacion(cursor):
+            cursor.execute("DELETE FROM produccion_dia_sabor")
+            cursor.execute("DELETE FROM produccion_fecha_sabor")
+            cursor.execute("DELETE FROM recaudacion_dia")
+            cursor.execute(f"INSERT INTO produccion_dia_sabor (dia, sabor_id, cantidad) {RECALCULO_PRODUCCION}")
+            cursor.execute(f"INSERT INTO produccion_fecha_sabor (fecha_entrega, sabor_id, cantidad) "
+                           f"{RECALCULO_PRODUCCION_FECHA}")
+            cursor.execute(f"INSERT INTO recaudacion_dia (dia, pedidos, total, pagado) {RECALCULO_RECAUDACION}")
+
+        self._escribir(operacion, "No se pudieron reconstruir los resúmenes")
+        self._invalidar()
+
+    @medido
+    def verificar_resumenes(self):
+        """Compara las tablas de resumen con un recálculo completo.
+
+        Devuelve una lista de diferencias legibles; vacía si todo coincide.
+        """
+        try:
+            self.cursor.execute("SELECT id, nombre FROM sabores")
+            sabores = dict(self.cursor.fetchall())
+
+            diferencias = []
+            for nombre, tabla, recalculo in (
+                    ('produccion', "SELECT dia, sabor_id, cantidad FROM produccion_dia_sabor", RECALCULO_PRODUCCION),
+                    ('produccion por fecha', "SELECT fecha_entrega, sabor_id, cantidad FROM produccion_fecha_sabor",
+                     RECALCULO_PRODUCCION_FECHA)):
+                self.cursor.execute(tabla)
+                materializado = {(dia, sabor_id): cantidad for dia, sabor_id, cantidad in self.cursor.fetchall()}
+                self.cursor.execute(recalculo)
+                recalculado = {(dia, sabor_id): cantidad for dia, sabor_id, cantidad in self.cursor.fetchall()}
+                for clave in sorted(materializado.keys() | recalculado.keys()):
+                    if materializado.get(clave, 0) != recalculado.get(clave, 0):
+                        diferencias.append(
+                            f"{nombre} {clave[0]}/{sabores.get(clave[1], clave[1])}: "
+                            f"tabla={materializado.get(clave, 0)} recalculo={recalculado.get(clave, 0)}"
+                        )
+
+            self.cursor.execute("SELECT dia, pedidos, total, pagado FROM recaudacion_dia")
+            materializado = {fila[0]: tuple(fila[1:]) for fila in self.cursor.fetchall()}
+            self.cursor.execute(RECALCULO_RECAUDACION)
+            recalculado = {fila[0]: tuple(fila[1:]) for fila in self.cursor.fetchall()}
+
+            for dia in sorted(materializado.keys() | recalculado.keys()):
+                tabla = materializado.get(dia, (0, 0.0, 0.0))
+                recalculo = recalculado.get(dia, (0, 0.0, 0.0))
+                if (tabla[0] != recalculo[0]
+                        or abs(tabla[1] - recalculo[1]) > TOLERANCIA_IMPORTES
+                        or abs(tabla[2] - recalculo[2]) > TOLERANCIA_IMPORTES):
+                    diferencias.append(f"recaudacion {dia}: tabla={tabla} recalculo={recalculo}")
+            return diferencias
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudieron verificar los resúmenes: {e}")
+
+    # --- Archivo de días cerrados (ver database/archivo.py) ---
+
+    def _adjuntar_archivo(self, ruta=None):
+        """Adjunta la base de archivo como `archivo`, creando sus tablas si faltan."""
+        if self.conn.in_transaction:
+            raise Exception("No se pudo abrir el archivo de pedidos: hay una transacción abierta.")
         try:
-            self.cursor.execute("BEGIN TRANSACTION")
+            self.conn.execute(f"ATTACH DATABASE ? AS {ESQUEMA_ARCHIVO}", (ruta or self.db_archivo,))
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo abrir el archivo de pedidos: {e}")
+        try:
+            def operacion(cursor):
+                cursor.execute(f"PRAGMA {ESQUEMA_ARCHIVO}.table_info(pedidos)")
+                columnas = {fila['name'] for fila in cursor.fetchall()}
+                if columnas and 'fecha_entrega' not in columnas:
+                    # Archivo anterior a la fecha de entrega
+                    cursor.execute(AGREGAR_FECHA_ENTREGA_ARCHIVO)
+                    cursor.execute(f"SELECT id, dia, fecha_registro FROM {ESQUEMA_ARCHIVO}.pedidos")
+                    cursor.executemany(f"UPDATE {ESQUEMA_ARCHIVO}.pedidos SET fecha_entrega = ? WHERE id = ?",
+                                       [(fecha_entrega(dia, fecha_registro), pedido_id)
+                                        for pedido_id, dia, fecha_registro in cursor.fetchall()])
+                for sql in TABLAS_ARCHIVO:
+                    cursor.execute(sql)
+            self._escribir(operacion, "No se pudo preparar el archivo de pedidos")
+        except Exception:
+            self.conn.execute(f"DETACH DATABASE {ESQUEMA_ARCHIVO}")
+            raise
+        self._archivo_adjunto = True
+
+    def _separar_archivo(self):
+        """Quita la base de archivo de la conexión."""
+        self._archivo_adjunto = False
+        self.conn.execute(f"DETACH DATABASE {ESQUEMA_ARCHIVO}")
+
+    @contextmanager
+    def con_archivo(self, ruta=None):
+        """Adjunta el archivo durante el bloque, con las vistas `historico_pedidos` e `historico_items`.
+
+        Las vistas tienen las columnas de `vista_pedidos` y `vista_items`
+        con los pedidos de las dos bases (`archivado` indica de cuál
+        viene). Si el archivo ya está adjunto, el bloque lo usa tal cual.
+        """
+        if self._archivo_adjunto:
+            yield self
+            return
+        self._adjuntar_archivo(ruta)
+        try:
+            for sql in VISTAS_HISTORICO:
+                self.conn.execute(sql)
+            yield self
+        finally:
+            for sql in BORRAR_VISTAS_HISTORICO:
+                self.conn.execute(sql)
+            self._separar_archivo()
+
+    def tamano_base(self):
+        """Bytes que ocupa la base principal (páginas en uso y libres)."""
+        return (self.conn.execute("PRAGMA main.page_count").fetchone()[0]
+                * self.conn.execute("PRAGMA main.page_size").fetchone()[0])
+
+    @medido
+    def archivar_pedidos(self, dias=(), antes_de=None, tamano_lote=ARCHIVO_TAMANO_LOTE, compactar=True, ruta=None):
+        """Pasa al archivo los pedidos de días cerrados y compacta la base principal.
+
+        Archiva los pedidos de los `dias` de entrega dados, los registrados
+        antes de `antes_de` ('AAAA-MM-DD'), o los que cumplen las dos cosas
+        si se dan ambas (los días se repiten cada semana). Va de a
+        `tamano_lote` pedidos: cada tanda se copia al archivo en una
+        transacción y se borra de la principal en otra; los resúmenes y el
+        registro de cambios siguen a los triggers de siempre. Con
+        `compactar` termina con VACUUM. Si un id ya es otro pedido en el
+        archivo, falla sin tocar esa tanda. Devuelve un dict con
+        'archivados', 'tandas', 'clientes_borrados', 'bytes_antes',
+        'bytes_despues' y 'segundos'.
+        """
+        condiciones, parametros = [], []
+        dias = [dia for dia in dias if dia]
+        if dias:
+            condiciones.append(f"dia IN ({', '.join('?' * len(dias))})")
+            parametros.extend(dias)
+        if antes_de:
+            condiciones.append("fecha_registro < ?")
+            parametros.append(antes_de)
+        if not condiciones:
+            raise Exception("No se pudo archivar: indique los días o la fecha límite.")
+        seleccion = f"SELECT id FROM pedidos WHERE {' AND '.join(condiciones)} ORDER BY id LIMIT ?"
+
+        inicio = time.perf_counter()
+        resultado = {'archivados': 0, 'tandas': 0, 'clientes_borrados': 0, 'bytes_antes': self.tamano_base()}
+
+        def copiar(cursor):
+            cursor.execute(seleccion, [*parametros, tamano_lote])
+            ids = [fila[0] for fila in cursor.fetchall()]
+            for tanda, marcadores in self._tandas(ids):
+                cursor.execute(COLISIONES_ARCHIVO.format(marcadores=marcadores), tanda)
+                colisiones = [fila[0] for fila in cursor.fetchall()]
+                if colisiones:
+                    raise Exception(
+                        f"No se pudieron copiar los pedidos al archivo: los ids {colisiones[:10]} ya son otros "
+                        f"pedidos en el archivo (¿se recreó o restauró la base?).")
+                for sql in DESCARTAR_COPIAS:
+                    cursor.execute(sql.format(marcadores=marcadores), tanda)
+                cursor.execute(COPIAR_PEDIDOS.format(marcadores=marcadores), tanda)
+                cursor.execute(COPIAR_ITEMS.format(marcadores=marcadores), tanda)
+            return ids
+
+        def borrar(cursor, ids):
+            borrados = 0
+            for tanda, marcadores in self._tandas(ids):
+                cursor.execute(BORRAR_ARCHIVADOS.format(marcadores=marcadores), tanda)
+                borrados += cursor.rowcount
+            return borrados
+
+        self._adjuntar_archivo(ruta)
+        try:
+            while True:
+                ids = self._escribir(copiar, "No se pudieron copiar los pedidos al archivo")
+                if not ids:
+                    break
+                borrados = self._escribir(lambda cursor: borrar(cursor, ids),
+                                          "No se pudieron borrar los pedidos archivados")
+                self._invalidar(ids)
+                resultado['archivados'] += borrados
+                resultado['tandas'] += 1
+                if borrados < len(ids):
+                    # No debería pasar: lo copiado no quedó en el archivo
+                    raise Exception("No se pudieron archivar los pedidos: la copia no quedó en el archivo.")
+            if resultado['archivados']:
+                resultado['clientes_borrados'] = self._escribir(
+                    lambda cursor: cursor.execute(BORRAR_CLIENTES_SIN_PEDIDOS).rowcount,
+                    "No se pudieron borrar los clientes sin pedidos")
+        finally:
+            self._separar_archivo()
+
+        if compactar and resultado['archivados']:
+            self.compactar()
+        resultado['bytes_despues'] = self.tamano_base()
+        resultado['segundos'] = time.perf_counter() - inicio
+        return resultado
+
+    @medido
+    def compactar(self):
+        """VACUUM de la base principal y vaciado del WAL, para devolver al disco el espacio libre."""
+        if self.conn.in_transaction:
+            raise Exception("No se pudo compactar la base de datos: hay una transacción abierta.")
+        try:
+            self.conn.execute("VACUUM main")
+            self.conn.execute("PRAGMA main.wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            raise Exception(f"No se pudo compactar la base de datos: {e}")
+
+    def _id_sabor(self, cursor, sabor):
+        """Devuelve el id de un sabor, agregándolo al catálogo si no está."""
+        sabor_id = self._sabores.get(sabor)
+        if sabor_id is not None:
+            return sabor_id
+        cursor.execute("SELECT id FROM sabores WHERE nombre = ?", (sabor,))
+        fila = cursor.fetchone()
+        if fila is None:
+            cursor.execute("INSERT INTO sabores (nombre) VALUES (?)", (sabor,))
+            sabor_id = cursor.lastrowid
+        else:
+            sabor_id = fila[0]
+        # Si la transacción se deshace, _deshacer vacía la caché
+        self._sabores[sabor] = sabor_id
+        return sabor_id
+
+    def _id_cliente(self, cursor, nombre, direccion, indexar=True):
+        """Devuelve (id, nuevo) del cliente (nombre, direccion), creándolo si no existe.
 
+        Un cliente nuevo se agrega al índice de búsqueda salvo con
+        `indexar=False`; entonces lo indexa quien llama con _indexar_clientes.
+        """
+        direccion = direccion or ''
+        cursor.execute("SELECT id FROM clientes WHERE nombre = ? AND direccion = ?", (nombre, direccion))
+        fila = cursor.fetchone()
+        if fila is not None:
+            return fila[0], False
+        cursor.execute("INSERT INTO clientes (nombre, direccion) VALUES (?, ?)", (nombre, direccion))
+        cliente_id = cursor.lastrowid
+        if indexar:
+            self._indexar_clientes(cursor, cliente_id)
+        return cliente_id, True
+
+    def _indexar_clientes(self, cursor, desde_id):
+        """Agrega al índice de búsqueda, en una sentencia, los clientes con id >= desde_id."""
+        if self.busqueda_fts:
+            cursor.execute(INDEXAR_CLIENTES, (desde_id,))
+
+    @staticmethod
+    def _sumar_produccion(cursor, filas, pedidos):
+        """Suma items (pedido_id, sabor_id, cantidad) a los resúmenes de producción por día y por fecha.
+
+        `pedidos` da (dia, fecha_entrega) de cada pedido_id. Las cantidades
+        se agrupan antes por (día o fecha, sabor), así van unas pocas
+        sentencias por grupo que cambia y no por item; las filas que quedan
+        en cero se borran.
+        """
+        for posicion, (crear, sumar, limpiar) in enumerate(SENTENCIAS_PRODUCCION):
+            cantidades = {}
+            for pedido_id, sabor_id, cantidad in filas:
+                clave = (pedidos[pedido_id][posicion], sabor_id)
+                cantidades[clave] = cantidades.get(clave, 0) + cantidad
+            claves = [clave for clave, cantidad in cantidades.items() if cantidad]
+            if claves:
+                cursor.executemany(crear, claves)
+                cursor.executemany(sumar, [(cantidades[clave], *clave) for clave in claves])
+                cursor.executemany(limpiar, claves)
+
+    def _sumar_altas(self, cursor, altas, filas):
+        """Suma pedidos recién insertados a los resúmenes y los registra en `cambios`.
+
+        `altas` son tuplas (pedido_id, dia, fecha_entrega, total, pago) con
+        ids consecutivos y `filas` sus items (pedido_id, sabor_id, cantidad).
+        Desde la versión 7 del esquema las altas no tienen triggers.
+        """
+        recaudacion = {}
+        for _, dia, _, total, pago in altas:
+            suma = recaudacion.setdefault(dia, [0, 0.0, 0.0])
+            suma[0] += 1
+            suma[1] += total
+            if pago == 1:
+                suma[2] += total
+        cursor.executemany(CREAR_RECAUDACION, [(dia,) for dia in recaudacion])
+        cursor.executemany(SUMAR_RECAUDACION, [(*suma, dia) for dia, suma in recaudacion.items()])
+        self._sumar_produccion(cursor, filas, {pedido_id: (dia, fecha) for pedido_id, dia, fecha, _, _ in altas})
+        cursor.execute(REGISTRAR_ALTAS, (altas[0][0], altas[-1][0]))
+
+    @medido
+    def agregar_pedido(self, dia, nombre, precio_pedido, precio_envio, direccion, horario, items):
+        """Agrega un nuevo pedido a la base de datos.
+
+        La fecha de entrega se calcula del texto del día, tomando hoy como
+        referencia (ver utils/fechas.py).
+        """
+        def operacion(cursor):
             # Insertar en tabla pedidos
             sql_pedido = """
-                INSERT INTO pedidos (dia, nombre, precio_pedido, precio_envio, direccion, horario)
+                INSERT INTO pedidos (dia, cliente_id, precio_pedido, precio_envio, horario, fecha_entrega)
                 VALUES (?, ?, ?, ?, ?, ?)
             """
-            self.cursor.execute(sql_pedido, (dia, nombre, precio_pedido, precio_envio, direccion, horario))
-            pedido_id = self.cursor.lastrowid
+            cliente_id, _ = self._id_cliente(cursor, nombre, direccion)
+            fecha = fecha_entrega(dia)
+            cursor.execute(sql_pedido, (dia, cliente_id, precio_pedido, precio_envio, horario, fecha))
+            pedido_id = cursor.lastrowid
 
             # Insertar items
-            sql_item = "INSERT INTO pedido_items (pedido_id, sabor, cantidad) VALUES (?, ?, ?)"
-            for item in items:
-                self.cursor.execute(sql_item, (pedido_id, item['sabor'], item['cantidad']))
-
-            self.conn.commit()
+            sql_item = "INSERT INTO pedido_items (pedido_id, sabor_id, cantidad) VALUES (?, ?, ?)"
+            filas = [(pedido_id, self._id_sabor(cursor, item['sabor']), item['cantidad']) for item in items]
+            cursor.executemany(sql_item, filas)
+            self._sumar_altas(cursor, [(pedido_id, dia, fecha, precio_pedido + (precio_envio or 0), 0)], filas)
             return pedido_id
-        except sqlite3.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo guardar el pedido: {e}")
 
+        pedido_id = self._escribir(operacion, "No se pudo guardar el pedido")
+        self._invalidar()
+        return pedido_id
+
+    @medido
+    def agregar_pedidos_lote(self, pedidos):
+        """Agrega muchos pedidos en una sola transacción y devuelve sus ids.
+
+        Cada pedido es un dict con las claves de `agregar_pedido` más `pago`
+        opcional. Pedidos e items se insertan con executemany; cada cliente
+        distinto del lote se busca una sola vez, y cada día distinto se
+        pasa a fecha de entrega una sola vez.
+        """
+        if not pedidos:
+            return []
+
+        def operacion(cursor):
+            clientes = {}
+            primer_nuevo = None
+            for p in pedidos:
+                clave = (p['nombre'], p.get('direccion') or '')
+                if clave not in clientes:
+                    clientes[clave], nuevo = self._id_cliente(cursor, *clave, indexar=False)
+                    if nuevo and primer_nuevo is None:
+                        primer_nuevo = clientes[clave]
+            # Los clientes nuevos del lote se indexan juntos
+            if primer_nuevo is not None:
+                self._indexar_clientes(cursor, primer_nuevo)
+            fechas = {dia: fecha_entrega(dia) for dia in {p['dia'] for p in pedidos}}
+            cursor.executemany(
+                """
+                INSERT INTO pedidos (dia, cliente_id, precio_pedido, precio_envio, horario, pago, fecha_entrega)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(p['dia'], clientes[(p['nombre'], p.get('direccion') or '')], p['precio_pedido'],
+                  p['precio_envio'], p.get('horario', ''), p.get('pago', 0), fechas[p['dia']]) for p in pedidos]
+            )
+            # Con AUTOINCREMENT y el bloqueo de escritura tomado, los ids del lote son consecutivos
+            cursor.execute("SELECT last_insert_rowid()")
+            ultimo_id = cursor.fetchone()[0]
+            ids = list(range(ultimo_id - len(pedidos) + 1, ultimo_id + 1))
+
+            filas = [(pedido_id, self._id_sabor(cursor, item['sabor']), item['cantidad'])
+                     for pedido_id, pedido in zip(ids, pedidos) for item in pedido['items']]
+            cursor.executemany("INSERT INTO pedido_items (pedido_id, sabor_id, cantidad) VALUES (?, ?, ?)", filas)
+            altas = [(pedido_id, p['dia'], fechas[p['dia']], p['precio_pedido'] + (p['precio_envio'] or 0),
+                      p.get('pago', 0)) for pedido_id, p in zip(ids, pedidos)]
+            self._sumar_altas(cursor, altas, filas)
+            return ids
+
+        ids = self._escribir(operacion, "No se pudo guardar el lote de pedidos")
+        self._invalidar()
+        return ids
+
+    @medido
     def eliminar_pedido(self, pedido_id):
         """Elimina un pedido y sus items de la base de datos."""
-        try:
-            self.cursor.execute("DELETE FROM pedidos WHERE id = ?", (pedido_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
-        except sqlite3.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo eliminar el pedido: {e}")
+        def operacion(cursor):
+            cursor.execute("DELETE FROM pedidos WHERE id = ?", (pedido_id,))
+            return cursor.rowcount > 0
+
+        eliminado = self._escribir(operacion, "No se pudo eliminar el pedido")
+        if eliminado:
+            self._invalidar([pedido_id])
+        return eliminado
+
+    def _modificar_en_tandas(self, cursor, pedido_ids, sentencia, parametros=(), filtro="", parametros_filtro=()):
+        """Ejecuta `sentencia WHERE filtro id IN (...)` por tandas de ids.
+
+        `filtro` (p. ej. "pago IS NOT ? AND") deja fuera los pedidos que no
+        cambiarían. Devuelve los ids afectados, leídos antes de modificarlos.
+        """
+        afectados = []
+        for tanda, marcadores in self._tandas(list(dict.fromkeys(pedido_ids))):
+            condicion = f"WHERE {filtro} id IN ({marcadores})"
+            cursor.execute(f"SELECT id FROM pedidos {condicion}", [*parametros_filtro, *tanda])
+            afectados.extend(fila[0] for fila in cursor.fetchall())
+            cursor.execute(f"{sentencia} {condicion}", [*parametros, *parametros_filtro, *tanda])
+        return afectados
 
+    def _invalidar_afectados(self, afectados):
+        """Invalida la caché de los pedidos que cambió una acción sobre varios y los devuelve."""
+        if afectados:
+            self._invalidar(afectados)
+        return afectados
+
+    @medido
+    def eliminar_pedidos(self, pedido_ids):
+        """Elimina varios pedidos en una sola transacción y devuelve los ids que existían."""
+        def operacion(cursor):
+            return self._modificar_en_tandas(cursor, pedido_ids, "DELETE FROM pedidos")
+
+        return self._invalidar_afectados(self._escribir(operacion, "No se pudieron eliminar los pedidos"))
+
+    @medido
+    def marcar_pagados(self, pedido_ids, estado=1):
+        """Pone el estado de pago de varios pedidos y devuelve los ids que cambiaron."""
+        def operacion(cursor):
+            return self._modificar_en_tandas(cursor, pedido_ids, "UPDATE pedidos SET pago = ?", (estado,),
+                                             "pago IS NOT ? AND", (estado,))
+
+        return self._invalidar_afectados(self._escribir(operacion, "No se pudo actualizar el estado de pago"))
+
+    @medido
+    def mover_dia(self, pedido_ids, nuevo_dia):
+        """Pasa varios pedidos a otro día de entrega y devuelve los ids que cambiaron."""
+        def operacion(cursor):
+            return self._modificar_en_tandas(cursor, pedido_ids, "UPDATE pedidos SET dia = ?, fecha_entrega = ?",
+                                             (nuevo_dia, fecha_entrega(nuevo_dia)), "dia IS NOT ? AND", (nuevo_dia,))
+
+        return self._invalidar_afectados(self._escribir(operacion, "No se pudieron mover los pedidos de día"))
+
+    @medido
     def actualizar_pedido(self, pedido_id, dia, nombre, precio_pedido, precio_envio, direccion, horario, items, pago=0):
-        """Actualiza un pedido existente y sus items."""
-        try:
-            self.cursor.execute("BEGIN TRANSACTION")
+        """Actualiza un pedido existente y sus items tocando solo lo que cambió.
 
-            # Actualizar datos generales
-            sql_update_pedido = """
-                UPDATE pedidos
-                SET dia = ?, nombre = ?, precio_pedido = ?, precio_envio = ?,
-                    direccion = ?, horario = ?, pago = ?
-                WHERE id = ?
-            """
-            self.cursor.execute(sql_update_pedido, (
-                dia, nombre, precio_pedido, precio_envio, direccion, horario,
-                pago, pedido_id
-            ))
+        La cabecera se actualiza solo en las columnas distintas (o nada) y
+        los items con los UPDATE, INSERT y DELETE justos, en el orden de la
+        lista nueva. Devuelve un resumen de cambios: 'campos' cambiados,
+        'items_insertados', 'items_actualizados', 'items_eliminados',
+        'resumenes' (si cambian producción o recaudación) y 'modificado'.
+        Si cambia el día, la fecha de entrega se recalcula desde hoy.
+        """
+        nuevos = dict(zip(CAMPOS_PEDIDO, (dia, nombre, precio_pedido, precio_envio, direccion or '', horario, pago)))
 
-            # Eliminar items antiguos
-            self.cursor.execute("DELETE FROM pedido_items WHERE pedido_id = ?", (pedido_id,))
+        def operacion(cursor):
+            cursor.execute(f"SELECT {', '.join(CAMPOS_PEDIDO)}, fecha_entrega FROM vista_pedidos WHERE id = ?",
+                           (pedido_id,))
+            actual = cursor.fetchone()
+            if not actual:
+                raise Exception("Pedido no encontrado.")
 
-            # Insertar nuevos items
-            sql_insert_item = "INSERT INTO pedido_items (pedido_id, sabor, cantidad) VALUES (?, ?, ?)"
-            for item in items:
-                self.cursor.execute(sql_insert_item, (pedido_id, item['sabor'], item['cantidad']))
+            # Solo las columnas distintas: así no se disparan los triggers de las demás
+            campos = [campo for campo in CAMPOS_PEDIDO if actual[campo] != nuevos[campo]]
+            columnas = {campo: nuevos[campo] for campo in campos if campo not in CAMPOS_CLIENTE}
+            if any(campo in CAMPOS_CLIENTE for campo in campos):
+                # Otro nombre o dirección es otro cliente; los demás pedidos del cliente no cambian
+                columnas['cliente_id'], _ = self._id_cliente(cursor, nombre, direccion)
+            if 'dia' in columnas:
+                columnas['fecha_entrega'] = fecha_entrega(dia)
+            if columnas:
+                asignaciones = ", ".join(f"{columna} = ?" for columna in columnas)
+                cursor.execute(f"UPDATE pedidos SET {asignaciones} WHERE id = ?", [*columnas.values(), pedido_id])
 
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo actualizar el pedido: {e}")
+            cursor.execute("SELECT item_id, sabor, cantidad FROM vista_items WHERE pedido_id = ? ORDER BY item_id",
+                           (pedido_id,))
+            guardados = cursor.fetchall()
+            actualizar, insertar, eliminar = self._diferencia_items(guardados, items)
+            if eliminar:
+                cursor.executemany("DELETE FROM pedido_items WHERE item_id = ?", [(item_id,) for item_id in eliminar])
+            if actualizar:
+                cursor.executemany("UPDATE pedido_items SET sabor_id = ?, cantidad = ? WHERE item_id = ?",
+                                   [(self._id_sabor(cursor, sabor), cantidad, item_id)
+                                    for sabor, cantidad, item_id in actualizar])
+            if insertar:
+                cursor.executemany("INSERT INTO pedido_items (pedido_id, sabor_id, cantidad) VALUES (?, ?, ?)",
+                                   [(pedido_id, self._id_sabor(cursor, item['sabor']), item['cantidad'])
+                                    for item in insertar])
+
+            cambia_items = bool(actualizar or insertar or eliminar)
+            if cambia_items:
+                # Producción: se restan los items viejos y se suman los nuevos,
+                # en el día y la fecha que ya quedaron en el pedido
+                self._sumar_produccion(
+                    cursor,
+                    [(pedido_id, self._id_sabor(cursor, fila['sabor']), -fila['cantidad']) for fila in guardados]
+                    + [(pedido_id, self._id_sabor(cursor, item['sabor']), item['cantidad']) for item in items],
+                    {pedido_id: (nuevos['dia'], columnas.get('fecha_entrega', actual['fecha_entrega']))})
+            if cambia_items and not columnas:
+                # Los triggers de `cambios` están en `pedidos`; los items no lo registran solos
+                cursor.execute(REGISTRAR_CAMBIO, (pedido_id,))
+            return {
+                'campos': campos,
+                'items_insertados': len(insertar),
+                'items_actualizados': len(actualizar),
+                'items_eliminados': len(eliminar),
+                'resumenes': cambia_items or any(campo in CAMPOS_RESUMEN for campo in campos),
+                'modificado': cambia_items or bool(campos),
+            }
+
+        cambios = self._escribir(operacion, "No se pudo actualizar el pedido")
+        if cambios['modificado']:
+            self._invalidar([pedido_id])
+        return cambios
+
+    @staticmethod
+    def _diferencia_items(guardados, items):
+        """Compara los items guardados (item_id, sabor, cantidad) con la lista nueva.
+
+        Empareja los sabores en orden con SequenceMatcher y devuelve
+        (actualizar, insertar, eliminar): tuplas (sabor, cantidad, item_id),
+        items nuevos e item_ids a borrar. Los items se leen por item_id, así
+        que un item nuevo solo se inserta al final; si va antes de items
+        guardados, desde ahí se reusan las filas en orden, y el pedido queda
+        con los items en el orden de la lista.
+        """
+        actualizar, insertar, eliminar = [], [], []
+
+        def emparejar(viejos, nuevos):
+            for fila, item in zip(viejos, nuevos):
+                if fila['sabor'] != item['sabor'] or fila['cantidad'] != item['cantidad']:
+                    actualizar.append((item['sabor'], item['cantidad'], fila['item_id']))
+            return viejos[len(nuevos):], nuevos[len(viejos):]
 
+        coincidencias = SequenceMatcher(None, [fila['sabor'] for fila in guardados],
+                                        [item['sabor'] for item in items], autojunk=False)
+        for codigo, i1, i2, j1, j2 in coincidencias.get_opcodes():
+            viejos, nuevos = guardados[i1:i2], items[j1:j2]
+            if codigo in ('equal', 'replace'):
+                viejos, nuevos = emparejar(viejos, nuevos)
+            if nuevos and i2 < len(guardados):
+                viejos, nuevos = emparejar(guardados[i2:], list(nuevos) + list(items[j2:]))
+                eliminar.extend(fila['item_id'] for fila in viejos)
+                insertar.extend(nuevos)
+                break
+            eliminar.extend(fila['item_id'] for fila in viejos)
+            insertar.extend(nuevos)
+        return actualizar, insertar, eliminar
+
+    @medido
     def obtener_pedido(self, pedido_id):
-        """Obtiene un pedido específico y sus items."""
+        """Obtiene un pedido específico y sus items, o None.
+
+        Lee de la caché si el pedido no cambió desde la última vez.
+        """
         try:
-            self.cursor.execute("SELECT * FROM pedidos WHERE id = ?", (pedido_id,))
-            pedido_row = self.cursor.fetchone()
-            if not pedido_row:
+            self._comprobar_cambios_externos()
+            pedido = self.cache_pedidos.obtener(pedido_id)
+            if pedido is not FALTA:
+                return pedido
+            filas = self._consultar(f"SELECT {COLUMNAS_PEDIDO} FROM vista_pedidos WHERE id = ?", (pedido_id,),
+                                    Pedido.desde_fila)
+            if not filas:
                 return None
 
-            pedido_dict = dict(pedido_row)
-            self.cursor.execute("SELECT sabor, cantidad FROM pedido_items WHERE pedido_id = ?", (pedido_id,))
-            items_db = self.cursor.fetchall()
-            pedido_dict['items'] = [dict(item) for item in items_db]
-            return pedido_dict
+            pedido = filas[0]
+            for sabor, cantidad in self._consultar(
+                    "SELECT sabor, cantidad FROM vista_items WHERE pedido_id = ? ORDER BY item_id", (pedido_id,)):
+                pedido.agregar_item(sabor, cantidad)
+            self.cache_pedidos.guardar(pedido_id, pedido)
+            return pedido
         except sqlite3.Error as e:
             raise Exception(f"No se pudo obtener el pedido: {e}")
 
+    @medido
     def toggle_pago_pedido(self, pedido_id):
         """Cambia el estado de pago de un pedido."""
-        try:
-            self.cursor.execute("SELECT pago FROM pedidos WHERE id = ?", (pedido_id,))
-            result = self.cursor.fetchone()
+        def operacion(cursor):
+            cursor.execute("SELECT pago FROM pedidos WHERE id = ?", (pedido_id,))
+            result = cursor.fetchone()
             if not result:
                 raise Exception("Pedido no encontrado.")
 
             estado_actual = result['pago']
             nuevo_estado = 1 if estado_actual == 0 else 0
 
-            self.cursor.execute("UPDATE pedidos SET pago = ? WHERE id = ?", (nuevo_estado, pedido_id))
-            self.conn.commit()
+            cursor.execute("UPDATE pedidos SET pago = ? WHERE id = ?", (nuevo_estado, pedido_id))
             return nuevo_estado
-        except sqlite3.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo actualizar el estado de pago: {e}") 
\ No newline at end of file
+
+        nuevo_estado = self._escribir(operacion, "No se pudo actualizar el estado de pago")
+        self._invalidar([pedido_id])
+        return nuevo_estado
\ No newline at end of file
@@ -0,0 +1,120 @@
+# Tablas principales de la base de datos.
+#
+# Los sabores y los clientes están en tablas propias y los pedidos y sus
+# items los referencian por id entero, en lugar de repetir el nombre del
+# sabor en cada item y el nombre y la dirección en cada pedido. Un cliente
+# es un par (nombre, dirección) único.
+#
+# Las vistas devuelven las columnas con los nombres de siempre (`sabor`,
+# `nombre`, `direccion`), así las consultas de lectura arman los mismos
+# dicts que antes. CROSS JOIN fija el orden del join: se recorre la tabla
+# de pedidos (o de items) por sus índices y se busca el cliente o el sabor
+# por clave primaria.
+
+TABLAS_CATALOGO = [
+    '''
+    CREATE TABLE IF NOT EXISTS sabores (
+        id INTEGER PRIMARY KEY,
+        nombre TEXT NOT NULL UNIQUE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS clientes (
+        id INTEGER PRIMARY KEY,
+        nombre TEXT NOT NULL,
+        direccion TEXT NOT NULL DEFAULT '',
+        UNIQUE (nombre, direccion)
+    )
+    ''',
+]
+
+TABLAS_PEDIDOS = [
+    '''
+    CREATE TABLE IF NOT EXISTS pedidos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dia TEXT NOT NULL,
+        cliente_id INTEGER NOT NULL REFERENCES clientes (id),
+        precio_pedido REAL NOT NULL,
+        precio_envio REAL DEFAULT 0.0,
+        horario TEXT,
+        pago INTEGER DEFAULT 0,
+        fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS pedido_items (
+        item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pedido_id INTEGER NOT NULL,
+        sabor_id INTEGER NOT NULL REFERENCES sabores (id),
+        cantidad INTEGER NOT NULL,
+        FOREIGN KEY (pedido_id) REFERENCES pedidos (id) ON DELETE CASCADE
+    )
+    ''',
+]
+
+VISTAS = [
+    '''
+    CREATE VIEW IF NOT EXISTS vista_pedidos AS
+    SELECT p.id, p.dia, c.nombre, p.precio_pedido, p.precio_envio, c.direccion,
+        p.horario, p.pago, p.fecha_registro
+    FROM pedidos p CROSS JOIN clientes c ON c.id = p.cliente_id
+    ''',
+    '''
+    CREATE VIEW IF NOT EXISTS vista_items AS
+    SELECT i.item_id, i.pedido_id, s.nombre AS sabor, i.cantidad
+    FROM pedido_items i CROSS JOIN sabores s ON s.id = i.sabor_id
+    ''',
+]
+
+SEMBRAR_SABORES = "INSERT OR IGNORE INTO sabores (nombre) VALUES (?)"
+
+# Migración de las tablas con texto repetido. Los sabores que no están en
+# SABORES_VALIDOS (cargados antes de validar) se agregan al catálogo, y las
+# direcciones NULL pasan a ''. Se conservan los ids de pedidos e items.
+MIGRAR_SABORES = "INSERT OR IGNORE INTO sabores (nombre) SELECT DISTINCT sabor FROM pedido_items_viejo"
+
+MIGRAR_CLIENTES = '''
+    INSERT OR IGNORE INTO clientes (nombre, direccion)
+    SELECT nombre, IFNULL(direccion, '') FROM pedidos_viejo ORDER BY id
+'''
+
+MIGRAR_PEDIDOS = '''
+    INSERT INTO pedidos (id, dia, cliente_id, precio_pedido, precio_envio, horario, pago, fecha_registro)
+    SELECT p.id, p.dia, c.id, p.precio_pedido, p.precio_envio, p.horario, p.pago, p.fecha_registro
+    FROM pedidos_viejo p
+    JOIN clientes c ON c.nombre = p.nombre AND c.direccion = IFNULL(p.direccion, '')
+'''
+
+MIGRAR_ITEMS = '''
+    INSERT INTO pedido_items (item_id, pedido_id, sabor_id, cantidad)
+    SELECT i.item_id, i.pedido_id, s.id, i.cantidad
+    FROM pedido_items_viejo i
+    JOIN sabores s ON s.nombre = i.sabor
+    WHERE i.pedido_id IN (SELECT id FROM pedidos)
+'''
+
+# Versión 3: fecha de entrega ISO ('' si el texto del día no se entiende),
+# calculada de `dia` con utils/fechas.py. La lista se ordena por
+# (fecha_entrega, dia, fecha_registro, id); el índice con `dia` primero
+# sirve al filtro por día y a los resúmenes por día.
+AGREGAR_FECHA_ENTREGA = "ALTER TABLE pedidos ADD COLUMN fecha_entrega TEXT NOT NULL DEFAULT ''"
+
+# fecha_entrega(dia, referencia) es una función de la conexión (ver
+# registrar_fecha_entrega en migraciones.py)
+CALCULAR_FECHA_ENTREGA = "UPDATE pedidos SET fecha_entrega = fecha_entrega(dia, fecha_registro)"
+
+INDICES_FECHA_ENTREGA = [
+    'CREATE INDEX IF NOT EXISTS idx_pedidos_entrega ON pedidos (fecha_entrega, dia, fecha_registro, id)',
+    'CREATE INDEX IF NOT EXISTS idx_pedidos_pago_entrega ON pedidos (pago, fecha_entrega, dia, fecha_registro, id)',
+    'CREATE INDEX IF NOT EXISTS idx_pedidos_dia_entrega ON pedidos (dia, fecha_entrega, fecha_registro, id)',
+]
+
+# Reemplazados por los de fecha de entrega
+INDICES_ORDEN_POR_DIA = ['idx_pedidos_orden', 'idx_pedidos_pago_orden']
+
+VISTA_PEDIDOS_ENTREGA = '''
+    CREATE VIEW vista_pedidos AS
+    SELECT p.id, p.dia, c.nombre, p.precio_pedido, p.precio_envio, c.direccion,
+        p.horario, p.pago, p.fecha_registro, p.fecha_entrega
+    FROM pedidos p CROSS JOIN clientes c ON c.id = p.cliente_id
+'''
@@ -0,0 +1,87 @@
+import csv
+import json
+import os
+
+# Exportaciones disponibles: nombre -> columnas del CSV
+COLUMNAS_EXPORTACION = {
+    'pedidos': ['id', 'dia', 'nombre', 'precio_pedido', 'precio_envio', 'direccion', 'horario', 'pago',
+                'fecha_registro', 'fecha_entrega', 'items'],
+    'produccion': ['dia', 'sabor', 'cantidad'],
+    'entregas': ['id', 'nombre', 'direccion', 'horario', 'total', 'pago', 'items'],
+}
+
+
+def _items_como_texto(items):
+    """Convierte una lista de items al texto 'Sabor:cantidad;...' que acepta el importador."""
+    return ';'.join(f"{item['sabor']}:{item['cantidad']}" for item in items)
+
+
+def _filas_exportacion(db_manager, tipo, dia=None, historico=False):
+    """Genera los dicts a exportar para cada tipo, sin materializar la lista."""
+    if tipo == 'pedidos':
+        for pedido in db_manager.iterar_pedidos(dia, historico=historico):
+            yield pedido
+    elif tipo == 'produccion':
+        for dia_fila, sabor, cantidad in db_manager.iterar_produccion_dia(dia, historico=historico):
+            yield {'dia': dia_fila, 'sabor': sabor, 'cantidad': cantidad}
+    elif tipo == 'entregas':
+        yield from db_manager.iterar_entregas(dia, historico=historico)
+    else:
+        raise Exception(f"Tipo de exportación desconocido: '{tipo}'.")
+
+
+def escribir_csv(filas, ruta, columnas):
+    """Escribe dicts en un CSV fila por fila y devuelve cuántas escribió."""
+    total = 0
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=columnas, extrasaction='ignore')
+        escritor.writeheader()
+        for fila in filas:
+            if isinstance(fila.get('items'), list):
+                fila = dict(fila, items=_items_como_texto(fila['items']))
+            escritor.writerow(fila)
+            total += 1
+    return total
+
+
+def escribir_jsonl(filas, ruta):
+    """Escribe dicts como JSON lines, uno por línea, y devuelve cuántos escribió."""
+    total = 0
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        for fila in filas:
+            archivo.write(json.dumps(fila, ensure_ascii=False))
+            archivo.write('\n')
+            total += 1
+    return total
+
+
+def exportar(db_manager, tipo, ruta, dia=None, historico=False):
+    """Exporta 'pedidos', 'produccion' o 'entregas' a CSV o JSON lines según la extensión.
+
+    Las filas van de un cursor de la base al archivo de a una, así que la
+    memoria usada no depende del tamaño de la base. Con `historico` se
+    incluyen los pedidos archivados. Devuelve el número de filas escritas.
+    Las filas se escriben en un archivo temporal junto a `ruta`, que la
+    reemplaza solo si se escribió entero: un error deja el archivo anterior.
+    """
+    if tipo not in COLUMNAS_EXPORTACION:
+        raise Exception(f"Tipo de exportación desconocido: '{tipo}'.")
+    if tipo == 'entregas' and not dia:
+        raise Exception("La lista de entregas necesita un día.")
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in ('.csv', '.jsonl', '.json', '.ndjson'):
+        raise Exception(f"Formato de exportación no soportado: '{extension}'.")
+    filas = _filas_exportacion(db_manager, tipo, dia, historico)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        if extension == '.csv':
+            total = escribir_csv(filas, temporal, COLUMNAS_EXPORTACION[tipo])
+        else:
+            total = escribir_jsonl(filas, temporal)
+        os.replace(temporal, ruta)
+        return total
+    except OSError as e:
+        raise Exception(f"No se pudo escribir el archivo de exportación: {e}")
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
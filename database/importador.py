@@ -0,0 +1,153 @@
+import csv
+import json
+import math
+import os
+import time
+from config.settings import SABORES_VALIDOS, IMPORTACION_TAMANO_LOTE
+from utils.validators import validar_numero
+
+# Formato de los archivos de importación
+#
+# CSV con encabezado: dia, nombre, precio_pedido, precio_envio, direccion,
+# horario, pago e items, donde items es "Sabor:cantidad;Sabor:cantidad".
+# En lugar de items se aceptan las columnas sabor y cantidad (un solo item).
+#
+# JSON lines: un objeto por línea con las mismas claves; items puede ser el
+# texto anterior o una lista de {"sabor": ..., "cantidad": ...}.
+
+VALORES_PAGADO = {'1', 'si', 'sí', 'true', 'pagado'}
+
+
+def leer_csv(ruta):
+    """Genera (número de línea, fila) de un CSV de pedidos."""
+    with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+        lector = csv.DictReader(archivo)
+        for fila in lector:
+            yield lector.line_num, fila
+
+
+def leer_jsonl(ruta):
+    """Genera (número de línea, objeto) de un archivo JSON lines de pedidos."""
+    with open(ruta, encoding='utf-8') as archivo:
+        for numero, linea in enumerate(archivo, start=1):
+            if not linea.strip():
+                continue
+            try:
+                yield numero, json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield numero, ValueError(f"JSON inválido: {e}")
+
+
+def _parsear_items(fila):
+    """Devuelve la lista de items crudos de una fila, en cualquiera de los formatos."""
+    items = fila.get('items')
+    if items is None:
+        if fila.get('sabor') is None:
+            return []
+        return [{'sabor': fila.get('sabor'), 'cantidad': fila.get('cantidad')}]
+    if isinstance(items, list):
+        return items
+    crudos = []
+    for parte in str(items).split(';'):
+        if not parte.strip():
+            continue
+        sabor, _, cantidad = parte.partition(':')
+        crudos.append({'sabor': sabor, 'cantidad': cantidad})
+    return crudos
+
+
+def validar_pedido(fila):
+    """Valida una fila cruda con las mismas reglas que el formulario.
+
+    Devuelve (pedido, None) si es válida o (None, mensaje de error).
+    """
+    if isinstance(fila, Exception):
+        return None, str(fila)
+    if not isinstance(fila, dict):
+        return None, "La fila no es un objeto."
+
+    dia = str(fila.get('dia') or '').strip()
+    nombre = str(fila.get('nombre') or '').strip()
+    if not dia:
+        return None, "El campo 'dia' es obligatorio."
+    if not nombre:
+        return None, "El campo 'nombre' es obligatorio."
+
+    # float() acepta 'nan', 'inf' y '1e400': se rechazan acá y no al guardar el lote
+    precio_pedido = validar_numero(fila.get('precio_pedido', ''), tipo='float', permitir_cero=False)
+    if precio_pedido is None or not math.isfinite(precio_pedido) or precio_pedido <= 0:
+        return None, "El 'precio_pedido' debe ser un número positivo."
+    precio_envio = validar_numero(fila.get('precio_envio') or '', tipo='float', permitir_cero=True, permitir_vacio=True)
+    if precio_envio is None or not math.isfinite(precio_envio) or precio_envio < 0:
+        return None, "El 'precio_envio' debe ser un número no negativo."
+
+    items = []
+    for crudo in _parsear_items(fila):
+        sabor = str(crudo.get('sabor') or '').strip().capitalize()
+        if sabor not in SABORES_VALIDOS:
+            return None, f"Sabor inválido: '{sabor}'."
+        cantidad = validar_numero(crudo.get('cantidad', ''), tipo='int', permitir_cero=False)
+        if cantidad is None or cantidad < 0:
+            return None, f"Cantidad inválida para {sabor}."
+        items.append({'sabor': sabor, 'cantidad': cantidad})
+    if not items:
+        return None, "El pedido debe tener al menos un item."
+
+    return {
+        'dia': dia,
+        'nombre': nombre,
+        'precio_pedido': precio_pedido,
+        'precio_envio': precio_envio,
+        'direccion': str(fila.get('direccion') or '').strip(),
+        'horario': str(fila.get('horario') or '').strip(),
+        'pago': 1 if str(fila.get('pago') or '').strip().lower() in VALORES_PAGADO else 0,
+        'items': items,
+    }, None
+
+
+def importar_archivo(db_manager, ruta, tamano_lote=IMPORTACION_TAMANO_LOTE):
+    """Importa un archivo CSV o JSON lines de pedidos por lotes.
+
+    Lee el archivo de forma incremental, valida cada fila y guarda los
+    pedidos válidos con `agregar_pedidos_lote`, una transacción por lote.
+    Las filas inválidas, o de un lote que falle, no detienen la
+    importación: quedan en 'errores' como (línea, mensaje).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.csv':
+        filas = leer_csv(ruta)
+    elif extension in ('.jsonl', '.json', '.ndjson'):
+        filas = leer_jsonl(ruta)
+    else:
+        raise Exception(f"Formato de importación no soportado: '{extension}'.")
+
+    resultado = {'importados': 0, 'errores': [], 'segundos': 0.0}
+    inicio = time.perf_counter()
+    lote, lineas = [], []
+
+    def guardar_lote():
+        try:
+            db_manager.agregar_pedidos_lote(lote)
+            resultado['importados'] += len(lote)
+        except Exception as e:
+            resultado['errores'].extend((linea, str(e)) for linea in lineas)
+        lote.clear()
+        lineas.clear()
+
+    try:
+        for linea, fila in filas:
+            pedido, error = validar_pedido(fila)
+            if error:
+                resultado['errores'].append((linea, error))
+                continue
+            lote.append(pedido)
+            lineas.append(linea)
+            if len(lote) >= tamano_lote:
+                guardar_lote()
+        if lote:
+            guardar_lote()
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        raise Exception(f"No se pudo leer el archivo de importación: {e}")
+
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
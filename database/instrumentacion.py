@@ -0,0 +1,284 @@
+import functools
+import inspect
+import logging
+import logging.handlers
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+
+# Medición de latencias de DatabaseManager
+#
+# Cada método público decorado con @medido registra su duración y las filas
+# devueltas en un histograma por operación. Además, cada sentencia SQL pasa
+# por CursorMedido, que suma el tiempo de execute y de los fetch; las que
+# superan el umbral se escriben en un log rotativo de consultas lentas con
+# el método y la línea que la lanzaron (y el EXPLAIN QUERY PLAN si se pide).
+
+# Muestras que guarda cada histograma; los percentiles son de las más recientes
+MUESTRAS_HISTOGRAMA = 5000
+# Largo máximo del SQL y de los parámetros en el log de consultas lentas
+LARGO_MAXIMO_LOG = 500
+
+
+class Histograma:
+    """Duraciones (en segundos) de una operación y filas procesadas."""
+
+    def __init__(self, muestras=MUESTRAS_HISTOGRAMA):
+        self.muestras = deque(maxlen=muestras)
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.filas = 0
+
+    def registrar(self, segundos, filas=0):
+        self.muestras.append(segundos)
+        self.llamadas += 1
+        self.total += segundos
+        self.maximo = max(self.maximo, segundos)
+        self.filas += filas
+
+    @staticmethod
+    def _percentil(ordenadas, p):
+        """Percentil `p` (0-100) de muestras ordenadas, por el método del rango más cercano."""
+        if not ordenadas:
+            return 0.0
+        return ordenadas[max(0, min(len(ordenadas) - 1, int(round(p / 100 * len(ordenadas) + 0.5)) - 1))]
+
+    def resumen(self):
+        """Dict con llamadas, filas y p50/p95/p99/max/media en milisegundos."""
+        ordenadas = sorted(self.muestras)
+        return {
+            'llamadas': self.llamadas,
+            'filas': self.filas,
+            'p50_ms': self._percentil(ordenadas, 50) * 1000,
+            'p95_ms': self._percentil(ordenadas, 95) * 1000,
+            'p99_ms': self._percentil(ordenadas, 99) * 1000,
+            'max_ms': self.maximo * 1000,
+            'media_ms': self.total / self.llamadas * 1000 if self.llamadas else 0.0,
+        }
+
+
+class Instrumentacion:
+    """Histogramas por método y log de consultas lentas de un DatabaseManager."""
+
+    def __init__(self, umbral_lento_ms, ruta_log=None, max_bytes=1_000_000, copias=3, explicar=False):
+        self.umbral_lento = umbral_lento_ms / 1000
+        self.explicar = explicar
+        self.operaciones = {}
+        self.consultas_lentas = 0
+        # Métodos @medido en curso; el de arriba es la etiqueta de las sentencias
+        self.pila = []
+        self._log = None
+        if ruta_log:
+            self._log = logging.getLogger(f"{__name__}.{os.path.abspath(ruta_log)}")
+            self._log.propagate = False
+            self._log.setLevel(logging.INFO)
+            if not self._log.handlers:
+                manejador = logging.handlers.RotatingFileHandler(
+                    ruta_log, maxBytes=max_bytes, backupCount=copias, encoding='utf-8', delay=True)
+                manejador.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self._log.addHandler(manejador)
+
+    def registrar(self, operacion, segundos, filas=0):
+        """Suma una llamada al histograma de `operacion`."""
+        histograma = self.operaciones.get(operacion)
+        if histograma is None:
+            histograma = self.operaciones[operacion] = Histograma()
+        histograma.registrar(segundos, filas)
+
+    def etiqueta_actual(self):
+        """Método @medido que está ejecutando sentencias, o '-'."""
+        return self.pila[-1] if self.pila else "-"
+
+    def registrar_consulta(self, conexion, etiqueta, origen, sql, parametros, segundos, filas):
+        """Registra una sentencia terminada; si es lenta la escribe en el log."""
+        if segundos < self.umbral_lento:
+            return
+        self.consultas_lentas += 1
+        if self._log is None:
+            return
+        lineas = [
+            f"{segundos * 1000:.1f} ms {etiqueta} ({origen}) filas={filas}",
+            f"  sql: {_recortar(' '.join(sql.split()))}",
+        ]
+        if parametros:
+            lineas.append(f"  parametros: {_recortar(repr(parametros))}")
+        if self.explicar:
+            lineas.extend(f"  plan: {paso}" for paso in _plan_consulta(conexion, sql, parametros))
+        self._log.info("\n".join(lineas))
+
+    def resumen(self):
+        """Dict operacion -> resumen del histograma, ordenado por tiempo total."""
+        orden = sorted(self.operaciones.items(), key=lambda par: par[1].total, reverse=True)
+        return {operacion: histograma.resumen() for operacion, histograma in orden}
+
+    def informe(self):
+        """Tabla de texto con p50/p95/p99 por método."""
+        lineas = [f"{'operación':<28} {'llamadas':>9} {'filas':>10} {'p50 ms':>9} {'p95 ms':>9} "
+                  f"{'p99 ms':>9} {'max ms':>9}"]
+        for operacion, datos in self.resumen().items():
+            lineas.append(f"{operacion:<28} {datos['llamadas']:>9} {datos['filas']:>10} {datos['p50_ms']:>9.2f} "
+                          f"{datos['p95_ms']:>9.2f} {datos['p99_ms']:>9.2f} {datos['max_ms']:>9.2f}")
+        lineas.append(f"Consultas lentas (>= {self.umbral_lento * 1000:g} ms): {self.consultas_lentas}")
+        return "\n".join(lineas)
+
+    def reiniciar(self):
+        """Descarta los histogramas acumulados."""
+        self.operaciones.clear()
+        self.consultas_lentas = 0
+
+
+def _recortar(texto):
+    return texto if len(texto) <= LARGO_MAXIMO_LOG else texto[:LARGO_MAXIMO_LOG] + "..."
+
+
+def _plan_consulta(conexion, sql, parametros):
+    """Pasos de EXPLAIN QUERY PLAN de una sentencia, sin volver a medirla."""
+    cursor = sqlite3.Cursor(conexion)
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros or ())
+        return [fila[-1] for fila in cursor.fetchall()]
+    except sqlite3.Error as e:
+        return [f"(no disponible: {e})"]
+    finally:
+        cursor.close()
+
+
+class ConexionMedida(sqlite3.Connection):
+    """Conexión cuyos cursores miden cada sentencia."""
+
+    instrumentacion = None
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or CursorMedido)
+
+
+class CursorMedido(sqlite3.Cursor):
+    """Cursor que mide execute y fetch de cada sentencia y cuenta sus filas.
+
+    Una sentencia se da por terminada al agotar sus filas, al ejecutar la
+    siguiente o al cerrar el cursor; recién entonces se registra.
+    """
+
+    def __init__(self, conexion):
+        super().__init__(conexion)
+        self._en_curso = None
+
+    def _empezar(self, sql, parametros, ejecutar):
+        self._terminar()
+        instrumentacion = self.connection.instrumentacion
+        if instrumentacion is None:
+            return ejecutar()
+        marco = sys._getframe(2)
+        origen = f"{os.path.basename(marco.f_code.co_filename)}:{marco.f_lineno}"
+        etiqueta = instrumentacion.etiqueta_actual()
+        inicio = time.perf_counter()
+        try:
+            resultado = ejecutar()
+        finally:
+            self._en_curso = [etiqueta, origen, sql, parametros, time.perf_counter() - inicio, 0]
+        if self.description is None:
+            # Sin filas que leer (INSERT, UPDATE, DELETE...): ya terminó
+            self._en_curso[5] = max(self.rowcount, 0)
+            self._terminar()
+        return resultado
+
+    def _terminar(self):
+        if self._en_curso is None:
+            return
+        etiqueta, origen, sql, parametros, segundos, filas = self._en_curso
+        self._en_curso = None
+        self.connection.instrumentacion.registrar_consulta(
+            self.connection, etiqueta, origen, sql, parametros, segundos, filas)
+
+    def _leer(self, leer, agotado):
+        inicio = time.perf_counter()
+        filas = leer()
+        if self._en_curso is not None:
+            self._en_curso[4] += time.perf_counter() - inicio
+            self._en_curso[5] += len(filas) if isinstance(filas, list) else int(filas is not None)
+            if agotado(filas):
+                self._terminar()
+        return filas
+
+    def execute(self, sql, parametros=()):
+        return self._empezar(sql, parametros, lambda: super(CursorMedido, self).execute(sql, parametros))
+
+    def executemany(self, sql, secuencia):
+        secuencia = secuencia if isinstance(secuencia, (list, tuple)) else list(secuencia)
+        primero = secuencia[0] if secuencia else ()
+        return self._empezar(sql, primero, lambda: super(CursorMedido, self).executemany(sql, secuencia))
+
+    def fetchone(self):
+        return self._leer(super().fetchone, lambda fila: fila is None)
+
+    def fetchmany(self, size=None):
+        leer = super().fetchmany if size is None else lambda: super(CursorMedido, self).fetchmany(size)
+        return self._leer(leer, lambda filas: not filas)
+
+    def fetchall(self):
+        return self._leer(super().fetchall, lambda filas: True)
+
+    def __next__(self):
+        fila = self._leer(super().fetchone, lambda fila: fila is None)
+        if fila is None:
+            raise StopIteration
+        return fila
+
+    def close(self):
+        self._terminar()
+        super().close()
+
+
+def medido(metodo):
+    """Registra la duración de cada llamada al método en self.instrumentacion.
+
+    Las filas son el largo del resultado si es una lista. En los generadores
+    se mide solo el tiempo dentro del generador, no el del consumidor.
+    """
+    nombre = metodo.__name__
+
+    if inspect.isgeneratorfunction(metodo):
+        @functools.wraps(metodo)
+        def envoltura_generador(self, *args, **kwargs):
+            instrumentacion = self.instrumentacion
+            if instrumentacion is None:
+                yield from metodo(self, *args, **kwargs)
+                return
+            generador = metodo(self, *args, **kwargs)
+            segundos, filas = 0.0, 0
+            try:
+                while True:
+                    instrumentacion.pila.append(nombre)
+                    inicio = time.perf_counter()
+                    try:
+                        fila = next(generador)
+                    except StopIteration:
+                        break
+                    finally:
+                        segundos += time.perf_counter() - inicio
+                        instrumentacion.pila.pop()
+                    filas += 1
+                    yield fila
+            finally:
+                generador.close()
+                instrumentacion.registrar(nombre, segundos, filas)
+        return envoltura_generador
+
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        instrumentacion = self.instrumentacion
+        if instrumentacion is None:
+            return metodo(self, *args, **kwargs)
+        instrumentacion.pila.append(nombre)
+        inicio = time.perf_counter()
+        try:
+            resultado = metodo(self, *args, **kwargs)
+        finally:
+            segundos = time.perf_counter() - inicio
+            instrumentacion.pila.pop()
+        instrumentacion.registrar(nombre, segundos, len(resultado) if isinstance(resultado, list) else 0)
+        return resultado
+    return envoltura
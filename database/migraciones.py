@@ -0,0 +1,216 @@
+from config.settings import SABORES_VALIDOS
+from database.esquema import (
+    TABLAS_CATALOGO, TABLAS_PEDIDOS, VISTAS, SEMBRAR_SABORES, MIGRAR_SABORES, MIGRAR_CLIENTES,
+    MIGRAR_PEDIDOS, MIGRAR_ITEMS, AGREGAR_FECHA_ENTREGA, CALCULAR_FECHA_ENTREGA, INDICES_FECHA_ENTREGA,
+    INDICES_ORDEN_POR_DIA, VISTA_PEDIDOS_ENTREGA,
+)
+from database.cambios import (
+    TABLAS_CAMBIOS, TRIGGERS_CAMBIOS, TRIGGERS_CAMBIOS_OBSOLETOS, CAMBIOS_POR_PEDIDO, TRIGGERS_CAMBIOS_PEDIDOS,
+    TRIGGERS_CAMBIOS_ALTAS,
+)
+from database.resumenes import (
+    TABLAS_RESUMEN, TRIGGERS_RESUMEN, RECALCULO_PRODUCCION, RECALCULO_RECAUDACION, TABLAS_PRODUCCION_FECHA,
+    TRIGGERS_PRODUCCION_FECHA, RECALCULO_PRODUCCION_FECHA, TRIGGERS_PRODUCCION_FECHA_OBSOLETOS,
+    TRIGGER_BORRADO_PEDIDOS, TRIGGERS_ALTAS_OBSOLETOS, TRIGGER_BORRADO_PEDIDOS_PRODUCCION,
+)
+from utils.fechas import fecha_entrega
+
+# Migraciones numeradas del esquema.
+#
+# La versión aplicada se guarda en PRAGMA user_version. Al abrir la base,
+# DatabaseManager aplica en orden las migraciones con número mayor, cada
+# una en su propia transacción junto con el nuevo user_version, así que una
+# migración queda entera o no queda. Una base nueva (versión 0, sin tablas)
+# recorre el mismo camino. Cada migración recibe el cursor dentro de la
+# transacción, con las claves foráneas desactivadas; se comprueban al final.
+#
+# Para cambiar el esquema se agrega una función al final de MIGRACIONES con
+# el número siguiente. Las migraciones ya publicadas no se modifican.
+
+# Índices sobre las tablas principales
+INDICES = [
+    'CREATE INDEX IF NOT EXISTS idx_pedido_id ON pedido_items (pedido_id)',
+    # Join pedidos -> items para el recálculo y el cambio de día de un pedido
+    'CREATE INDEX IF NOT EXISTS idx_items_pedido_sabor ON pedido_items (pedido_id, sabor_id, cantidad)',
+    # Orden de la lista de pedidos y paginación por clave (keyset)
+    # También sirve al filtro por día, que es su primera columna
+    'CREATE INDEX IF NOT EXISTS idx_pedidos_orden ON pedidos (dia, fecha_registro, id)',
+    # Filtros por estado de pago y por sabor, ya en el orden de la lista
+    'CREATE INDEX IF NOT EXISTS idx_pedidos_pago_orden ON pedidos (pago, dia, fecha_registro, id)',
+    'CREATE INDEX IF NOT EXISTS idx_items_sabor_pedido ON pedido_items (sabor_id, pedido_id)',
+    # Pedidos de un cliente (filtro de texto y agrupación por cliente)
+    'CREATE INDEX IF NOT EXISTS idx_pedidos_cliente ON pedidos (cliente_id)',
+]
+
+# Índices de versiones anteriores que ya no se usan
+INDICES_OBSOLETOS = ['idx_pedidos_dia', 'idx_items_sabor', 'idx_pedidos_precios']
+
+
+def _tabla_existe(cursor, tabla):
+    """Indica si una tabla existe en la base de datos."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,))
+    return cursor.fetchone() is not None
+
+
+def _columna_existe(cursor, tabla, columna):
+    """Indica si una columna existe en una tabla."""
+    cursor.execute(f"PRAGMA table_info({tabla})")
+    return columna in [info[1] for info in cursor.fetchall()]
+
+
+def _crear_tablas_principales(cursor):
+    """Crea las tablas de sabores, clientes, pedidos e items y siembra los sabores."""
+    for sql in TABLAS_CATALOGO + TABLAS_PEDIDOS:
+        cursor.execute(sql)
+    cursor.executemany(SEMBRAR_SABORES, [(sabor,) for sabor in SABORES_VALIDOS])
+
+
+def _crear_estructura_derivada(cursor):
+    """Crea índices, vistas y tablas de resumen con sus triggers."""
+    for sql in INDICES + VISTAS + TABLAS_RESUMEN + TRIGGERS_RESUMEN:
+        cursor.execute(sql)
+    for indice in INDICES_OBSOLETOS:
+        cursor.execute(f"DROP INDEX IF EXISTS {indice}")
+
+
+def _normalizar_tablas(cursor):
+    """Pasa los sabores y los clientes de una base vieja a tablas propias.
+
+    Renombra `pedidos` y `pedido_items`, crea las tablas nuevas, copia los
+    datos conservando los ids y rehace índices, vistas y resúmenes.
+    """
+    cursor.execute("SELECT name, seq FROM sqlite_sequence WHERE name IN ('pedidos', 'pedido_items')")
+    secuencias = [tuple(fila) for fila in cursor.fetchall()]
+    # Triggers, índice de búsqueda y producción viejos usan columnas que desaparecen
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('pedidos', 'pedido_items')")
+    for (trigger,) in cursor.fetchall():
+        cursor.execute(f'DROP TRIGGER "{trigger}"')
+    for tabla in ('pedidos_fts_vocab', 'pedidos_fts', 'produccion_dia_sabor'):
+        cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+    cursor.execute("ALTER TABLE pedidos RENAME TO pedidos_viejo")
+    cursor.execute("ALTER TABLE pedido_items RENAME TO pedido_items_viejo")
+
+    _crear_tablas_principales(cursor)
+    for sql in (MIGRAR_SABORES, MIGRAR_CLIENTES, MIGRAR_PEDIDOS, MIGRAR_ITEMS):
+        cursor.execute(sql)
+    cursor.execute("DROP TABLE pedido_items_viejo")
+    cursor.execute("DROP TABLE pedidos_viejo")
+    # Los ids borrados antes de migrar no se reutilizan
+    for tabla, seq in secuencias:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (tabla,))
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (tabla, seq))
+
+    _crear_estructura_derivada(cursor)
+    cursor.execute("DELETE FROM recaudacion_dia")
+    cursor.execute(f"INSERT INTO produccion_dia_sabor (dia, sabor_id, cantidad) {RECALCULO_PRODUCCION}")
+    cursor.execute(f"INSERT INTO recaudacion_dia (dia, pedidos, total, pagado) {RECALCULO_RECAUDACION}")
+
+
+def esquema_inicial(cursor):
+    """Versión 1: catálogos de sabores y clientes, pedidos, items y resúmenes.
+
+    Crea el esquema en una base vacía. Las bases anteriores a las versiones
+    numeradas se reconocen por sus tablas: a las que guardan el sabor y el
+    cliente como texto se les agrega la columna `pago` si falta y se
+    normalizan; a las demás se les borran los items huérfanos y se les
+    completan índices, vistas y resúmenes.
+    """
+    if not _tabla_existe(cursor, 'pedidos'):
+        _crear_tablas_principales(cursor)
+        _crear_estructura_derivada(cursor)
+        return
+
+    if not _tabla_existe(cursor, 'sabores'):
+        if not _columna_existe(cursor, 'pedidos', 'pago'):
+            cursor.execute('ALTER TABLE pedidos ADD COLUMN pago INTEGER DEFAULT 0')
+        _normalizar_tablas(cursor)
+        return
+
+    # Items huérfanos de bases creadas sin PRAGMA foreign_keys
+    cursor.execute("DELETE FROM pedido_items WHERE pedido_id NOT IN (SELECT id FROM pedidos)")
+    _crear_estructura_derivada(cursor)
+
+
+def registro_cambios(cursor):
+    """Versión 2: tabla `cambios` con el último cambio de cada pedido y sus triggers."""
+    for sql in TABLAS_CAMBIOS + TRIGGERS_CAMBIOS:
+        cursor.execute(sql)
+
+
+def registrar_fecha_entrega(conexion):
+    """Agrega a la conexión la función SQL fecha_entrega(dia, referencia) de utils/fechas.py."""
+    conexion.create_function('fecha_entrega', 2, fecha_entrega)
+
+
+def fecha_entrega_iso(cursor):
+    """Versión 3: columna `fecha_entrega` calculada del texto del día, con sus índices.
+
+    Los días de la semana y las fechas sin año se resuelven desde la fecha
+    de registro de cada pedido. La vista `vista_pedidos` suma la columna.
+    """
+    registrar_fecha_entrega(cursor.connection)
+    cursor.execute(AGREGAR_FECHA_ENTREGA)
+    cursor.execute(CALCULAR_FECHA_ENTREGA)
+    for indice in INDICES_ORDEN_POR_DIA:
+        cursor.execute(f"DROP INDEX IF EXISTS {indice}")
+    for sql in INDICES_FECHA_ENTREGA:
+        cursor.execute(sql)
+    cursor.execute("DROP VIEW IF EXISTS vista_pedidos")
+    cursor.execute(VISTA_PEDIDOS_ENTREGA)
+
+
+def produccion_por_fecha(cursor):
+    """Versión 4: resumen de producción por fecha de entrega y sabor, con sus triggers."""
+    for sql in TABLAS_PRODUCCION_FECHA + TRIGGERS_PRODUCCION_FECHA:
+        cursor.execute(sql)
+    cursor.execute(f"INSERT INTO produccion_fecha_sabor (fecha_entrega, sabor_id, cantidad) "
+                   f"{RECALCULO_PRODUCCION_FECHA}")
+
+
+def cambios_por_pedido(cursor):
+    """Versión 5: `cambios` con seq AUTOINCREMENT y triggers solo en `pedidos`.
+
+    Los de la versión 2 registraban el pedido una vez por item y leían
+    MAX(seq) en cada fila, lo que frenaba las altas en lote.
+    """
+    for trigger in TRIGGERS_CAMBIOS_OBSOLETOS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    for sql in CAMBIOS_POR_PEDIDO + TRIGGERS_CAMBIOS_PEDIDOS:
+        cursor.execute(sql)
+
+
+def produccion_fecha_por_pedido(cursor):
+    """Versión 6: produccion_fecha_sabor sin triggers por item.
+
+    Las altas y ediciones la actualizan desde DatabaseManager, una vez por
+    pedido o por lote; el borrado de pedidos, en el trigger de borrado.
+    """
+    for trigger in TRIGGERS_PRODUCCION_FECHA_OBSOLETOS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute(TRIGGER_BORRADO_PEDIDOS)
+
+
+def altas_por_lote(cursor):
+    """Versión 7: las altas de pedidos e items sin triggers.
+
+    DatabaseManager suma cada alta o lote a la producción por día y a la
+    recaudación, y lo registra en `cambios`, con unas pocas sentencias por
+    lote; los triggers por fila eran la mayor parte del costo de importar.
+    """
+    for trigger in TRIGGERS_ALTAS_OBSOLETOS + TRIGGERS_CAMBIOS_ALTAS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute(TRIGGER_BORRADO_PEDIDOS_PRODUCCION)
+
+
+# (versión, descripción, función que recibe el cursor)
+MIGRACIONES = [
+    (1, "esquema con catálogos de sabores y clientes", esquema_inicial),
+    (2, "registro de cambios para refrescar otros terminales", registro_cambios),
+    (3, "fecha de entrega ISO calculada del día", fecha_entrega_iso),
+    (4, "producción por fecha de entrega para la planificación", produccion_por_fecha),
+    (5, "un registro de cambios por pedido y no por item", cambios_por_pedido),
+    (6, "producción por fecha actualizada por pedido y no por item", produccion_fecha_por_pedido),
+    (7, "altas de pedidos sumadas a los resúmenes por lote y no por fila", altas_por_lote),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
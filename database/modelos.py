@@ -0,0 +1,114 @@
+import sys
+from collections import namedtuple
+
+# Un sabor y su cantidad dentro de un pedido. Es inmutable, así que los
+# items iguales de distintos pedidos comparten el mismo objeto (ver `crear_item`).
+PedidoItem = namedtuple('PedidoItem', ['sabor', 'cantidad'])
+
+# Items ya creados, por (sabor, cantidad); son pocas combinaciones
+_items = {}
+
+
+def crear_item(sabor, cantidad):
+    """Devuelve el PedidoItem (sabor, cantidad), compartido entre pedidos."""
+    clave = (sabor, cantidad)
+    resultado = _items.get(clave)
+    if resultado is None:
+        resultado = _items[clave] = PedidoItem(sys.intern(sabor), cantidad)
+    return resultado
+
+
+class Pedido:
+    """Un pedido con sus items, tal como lo lee DatabaseManager.
+
+    Usa __slots__ en lugar de un dict por pedido. `cantidad_total` se
+    acumula al agregar items y `valores` guarda el texto de las columnas de
+    la lista de pedidos, que se arma una sola vez. `fecha_entrega` es la
+    fecha ISO que se sacó del texto de `dia` ('' si no se entendió).
+    """
+
+    __slots__ = ('id', 'dia', 'nombre', 'precio_pedido', 'precio_envio', 'direccion', 'horario', 'pago',
+                 'fecha_registro', 'fecha_entrega', 'items', 'cantidad_total', '_valores')
+
+    # Columnas de la consulta, en el orden del constructor
+    COLUMNAS = ('id', 'dia', 'nombre', 'precio_pedido', 'precio_envio', 'direccion', 'horario', 'pago',
+                'fecha_registro', 'fecha_entrega')
+
+    def __init__(self, id, dia, nombre, precio_pedido, precio_envio, direccion, horario, pago, fecha_registro,
+                 fecha_entrega=''):
+        self.id = id
+        # Días y horarios se repiten en todos los pedidos: se comparte el texto
+        self.dia = sys.intern(dia)
+        self.nombre = nombre
+        self.precio_pedido = precio_pedido
+        self.precio_envio = precio_envio
+        self.direccion = direccion
+        self.horario = sys.intern(horario) if horario else horario
+        self.pago = pago
+        self.fecha_registro = fecha_registro
+        self.fecha_entrega = sys.intern(fecha_entrega) if fecha_entrega else ''
+        self.items = []
+        self.cantidad_total = 0
+        self._valores = None
+
+    @classmethod
+    def desde_fila(cls, cursor, fila):
+        """row_factory de sqlite3 para consultas que leen `COLUMNAS`."""
+        return cls(*fila)
+
+    def agregar_item(self, sabor, cantidad):
+        """Agrega un item al final y actualiza `cantidad_total`."""
+        self.items.append(crear_item(sabor, cantidad))
+        self.cantidad_total += cantidad
+        self._valores = None
+
+    @property
+    def clave(self):
+        """Clave (fecha_entrega, dia, fecha_registro, id) con la que la base ordena los pedidos."""
+        return (self.fecha_entrega, self.dia, self.fecha_registro or '', self.id)
+
+    @property
+    def valores(self):
+        """Texto de las columnas de la lista de pedidos, como lo devuelve Tk al leer la fila."""
+        if self._valores is None:
+            if not self.items:
+                sabor = '??'
+            elif len(self.items) == 1:
+                sabor = self.items[0].sabor
+            else:
+                sabor = "Múltiple"
+            self._valores = (
+                self.dia,
+                self.nombre,
+                sabor,
+                str(self.cantidad_total) if self.cantidad_total > 0 else '??',
+                f"${self.precio_pedido or 0.0:.2f}",
+                f"${self.precio_envio or 0.0:.2f}",
+                str(self.direccion or ''),
+                str(self.horario or ''),
+                "Sí" if self.pago == 1 else "No",
+            )
+        return self._valores
+
+    def como_dict(self):
+        """El pedido como dict, con los items como dicts."""
+        pedido_dict = {columna: getattr(self, columna) for columna in self.COLUMNAS}
+        pedido_dict['items'] = [item._asdict() for item in self.items]
+        return pedido_dict
+
+    def __eq__(self, otro):
+        if not isinstance(otro, Pedido):
+            return NotImplemented
+        return all(getattr(self, columna) == getattr(otro, columna) for columna in self.COLUMNAS + ('items',))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Pedido(id={self.id!r}, dia={self.dia!r}, nombre={self.nombre!r}, items={self.items!r})"
+
+
+def preparar_valores(pedidos):
+    """Arma el texto de las filas de varios pedidos (para hacerlo fuera del hilo de Tk)."""
+    for pedido in pedidos:
+        pedido.valores
+    return pedidos
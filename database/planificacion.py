@@ -0,0 +1,208 @@
+import time
+from array import array
+from datetime import date, timedelta
+from config.settings import (
+    SABORES_VALIDOS, PLANIFICACION_NUMPY, PLANIFICACION_DIAS, PLANIFICACION_VENTANA, PLANIFICACION_COOKIES_POR_TANDA,
+    PLANIFICACION_COOKIES_POR_SABOR, PLANIFICACION_TANDAS_POR_DIA,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Planificación de la producción de varios días.
+#
+# Las cantidades a producir se cargan como una matriz fecha x sabor desde
+# la tabla de resumen produccion_fecha_sabor (una fila por fecha y sabor,
+# no por pedido). Sobre la matriz se calculan los totales móviles de los
+# próximos días, las tandas de horno por sabor y el cronograma de horneado.
+# Con NumPy cada cálculo es una operación sobre la matriz entera; sin él la
+# matriz es un array('q') plano, fila por fila, y los cálculos son bucles
+# sobre ese array. Las dos formas dan los mismos resultados.
+
+
+class MatrizProduccion:
+    """Matriz de enteros con una fila por fecha y una columna por sabor.
+
+    `fechas` son días ISO consecutivos y `sabores` los nombres de las
+    columnas. `datos` es un ndarray int64 (fechas x sabores) si `numpy`,
+    o un array('q') plano con las filas una tras otra.
+    """
+
+    def __init__(self, fechas, sabores, datos=None, usar_numpy=PLANIFICACION_NUMPY):
+        self.fechas = list(fechas)
+        self.sabores = list(sabores)
+        self.numpy = bool(usar_numpy) and np is not None
+        if datos is None:
+            if self.numpy:
+                datos = np.zeros((len(self.fechas), len(self.sabores)), dtype=np.int64)
+            else:
+                datos = array('q', bytes(8 * len(self.fechas) * len(self.sabores)))
+        self.datos = datos
+
+    @classmethod
+    def desde_filas(cls, filas, desde, dias, sabores=None, usar_numpy=PLANIFICACION_NUMPY):
+        """Arma la matriz de `dias` fechas desde `desde` con filas (fecha ISO, sabor, cantidad).
+
+        Sin `sabores` las columnas son SABORES_VALIDOS más los otros sabores
+        de las filas. Las filas fuera de las fechas se ignoran.
+        """
+        fechas = [(desde + timedelta(days=numero)).isoformat() for numero in range(dias)]
+        if sabores is None:
+            sabores = SABORES_VALIDOS + sorted({sabor for _, sabor, _ in filas} - set(SABORES_VALIDOS))
+        matriz = cls(fechas, sabores, usar_numpy=usar_numpy)
+        fila_de = {fecha: numero for numero, fecha in enumerate(fechas)}
+        columna_de = {sabor: numero for numero, sabor in enumerate(sabores)}
+        posiciones = [(fila_de[fecha], columna_de[sabor], cantidad) for fecha, sabor, cantidad in filas
+                      if fecha in fila_de and sabor in columna_de]
+        if not posiciones:
+            return matriz
+        if matriz.numpy:
+            filas_i, columnas_i, cantidades = zip(*posiciones)
+            np.add.at(matriz.datos, (np.array(filas_i), np.array(columnas_i)), np.array(cantidades, dtype=np.int64))
+        else:
+            ancho = len(sabores)
+            for fila, columna, cantidad in posiciones:
+                matriz.datos[fila * ancho + columna] += cantidad
+        return matriz
+
+    def _con_datos(self, datos):
+        """Otra matriz con las mismas fechas y sabores."""
+        return MatrizProduccion(self.fechas, self.sabores, datos, self.numpy)
+
+    def filas(self):
+        """Lista de filas (una lista de enteros por fecha)."""
+        if self.numpy:
+            return self.datos.tolist()
+        ancho = len(self.sabores)
+        return [self.datos[inicio:inicio + ancho].tolist() for inicio in range(0, len(self.datos), ancho)]
+
+    def totales_por_fecha(self):
+        """Suma de cada fila."""
+        if self.numpy:
+            return self.datos.sum(axis=1).tolist()
+        return [sum(fila) for fila in self.filas()]
+
+    def totales_por_sabor(self):
+        """Suma de cada columna."""
+        if self.numpy:
+            return self.datos.sum(axis=0).tolist()
+        ancho = len(self.sabores)
+        return [sum(self.datos[columna::ancho]) for columna in range(ancho)]
+
+    def acumulado(self, ventana=PLANIFICACION_VENTANA):
+        """Totales móviles: en cada fecha, la suma de esa fecha y las `ventana` - 1 siguientes.
+
+        Se calcula con sumas prefijas, así cuesta lo mismo con cualquier
+        ventana. Cerca del final la ventana se corta en la última fecha.
+        """
+        ventana = max(1, ventana)
+        cantidad_fechas = len(self.fechas)
+        if self.numpy:
+            prefijas = np.zeros((cantidad_fechas + 1, len(self.sabores)), dtype=np.int64)
+            np.cumsum(self.datos, axis=0, out=prefijas[1:])
+            fin = np.minimum(np.arange(cantidad_fechas) + ventana, cantidad_fechas)
+            return self._con_datos(prefijas[fin] - prefijas[:-1])
+        ancho = len(self.sabores)
+        prefijas = array('q', bytes(8 * ancho))
+        for inicio in range(0, len(self.datos), ancho):
+            prefijas.extend(a + b for a, b in zip(prefijas[inicio:inicio + ancho], self.datos[inicio:inicio + ancho]))
+        datos = array('q')
+        for fila in range(cantidad_fechas):
+            desde, hasta = fila * ancho, min(fila + ventana, cantidad_fechas) * ancho
+            datos.extend(b - a for a, b in zip(prefijas[desde:desde + ancho], prefijas[hasta:hasta + ancho]))
+        return self._con_datos(datos)
+
+    def tandas(self, cookies_por_sabor=None, cookies_por_tanda=PLANIFICACION_COOKIES_POR_TANDA):
+        """Tandas de horno por fecha y sabor: la cantidad dividida por las cookies de una tanda, hacia arriba.
+
+        `cookies_por_sabor` da la capacidad de la tanda de cada sabor
+        (por defecto PLANIFICACION_COOKIES_POR_SABOR, y si no está,
+        `cookies_por_tanda`).
+        """
+        cookies_por_sabor = PLANIFICACION_COOKIES_POR_SABOR if cookies_por_sabor is None else cookies_por_sabor
+        capacidades = [max(1, cookies_por_sabor.get(sabor, cookies_por_tanda)) for sabor in self.sabores]
+        if self.numpy:
+            # División entera hacia arriba de cantidades no negativas
+            return self._con_datos(-(-self.datos // np.array(capacidades, dtype=np.int64)))
+        ancho = len(self.sabores)
+        return self._con_datos(array('q', (-(-cantidad // capacidades[posicion % ancho])
+                                           for posicion, cantidad in enumerate(self.datos))))
+
+
+def cronograma(tandas, tandas_por_dia=PLANIFICACION_TANDAS_POR_DIA):
+    """Reparte las tandas en días de horno sin pasar `tandas_por_dia`.
+
+    Cada tanda se hornea el día de su entrega; si ese día el horno no
+    alcanza, lo que sobra pasa al día anterior (se recorre de la última
+    fecha a la primera). Cada día se hornean los sabores en el orden de las
+    columnas, de a un sabor entero por vez, así el horno cambia de sabor lo
+    menos posible. Devuelve un dict con 'horneado' (MatrizProduccion de
+    tandas por día de horno), 'uso' (tandas por día) y 'sin_lugar' (tandas
+    por sabor que tendrían que hornearse antes de la primera fecha).
+    """
+    horneado = tandas._con_datos(None)
+    cantidad_fechas, ancho = len(tandas.fechas), len(tandas.sabores)
+    if tandas.numpy:
+        arrastre = np.zeros(ancho, dtype=np.int64)
+        for fila in range(cantidad_fechas - 1, -1, -1):
+            pendiente = tandas.datos[fila] + arrastre
+            # Lugar que queda en el horno antes de cada sabor
+            antes = np.cumsum(pendiente) - pendiente
+            horneado.datos[fila] = np.clip(tandas_por_dia - antes, 0, pendiente)
+            arrastre = pendiente - horneado.datos[fila]
+        sin_lugar = arrastre.tolist()
+    else:
+        arrastre = [0] * ancho
+        for fila in range(cantidad_fechas - 1, -1, -1):
+            libre = tandas_por_dia
+            for columna in range(ancho):
+                pendiente = tandas.datos[fila * ancho + columna] + arrastre[columna]
+                hornear = min(max(libre, 0), pendiente)
+                horneado.datos[fila * ancho + columna] = hornear
+                arrastre[columna] = pendiente - hornear
+                libre -= hornear
+        sin_lugar = arrastre
+    return {'horneado': horneado, 'uso': horneado.totales_por_fecha(), 'sin_lugar': sin_lugar}
+
+
+def planificar(db_manager, desde=None, dias=PLANIFICACION_DIAS, ventana=PLANIFICACION_VENTANA,
+               tandas_por_dia=PLANIFICACION_TANDAS_POR_DIA, cookies_por_sabor=None, usar_numpy=PLANIFICACION_NUMPY):
+    """Plan de producción de `dias` días desde `desde` ('AAAA-MM-DD' o date; por defecto hoy).
+
+    Devuelve un dict con las matrices 'cantidades', 'acumulado' (totales
+    de `ventana` días), 'tandas' y 'horneado', más 'uso' y 'sin_lugar'
+    del cronograma, 'sin_fecha' (cookies de pedidos cuyo día no se
+    entendió, que no entran en el plan), 'numpy' y los ms de lectura
+    ('ms_bd') y de cálculo ('ms_calculo').
+    """
+    if desde is None:
+        desde = date.today()
+    elif not isinstance(desde, date):
+        try:
+            desde = date.fromisoformat(str(desde).strip())
+        except ValueError:
+            raise Exception(f"No se pudo planificar: '{desde}' no es una fecha AAAA-MM-DD.")
+    dias = max(1, dias)
+
+    inicio = time.perf_counter()
+    filas = db_manager.produccion_por_fecha(desde.isoformat(), (desde + timedelta(days=dias - 1)).isoformat())
+    sin_fecha = sum(cantidad for _, _, cantidad in db_manager.produccion_por_fecha('', ''))
+    lectura = time.perf_counter()
+
+    cantidades = MatrizProduccion.desde_filas(filas, desde, dias, usar_numpy=usar_numpy)
+    tandas = cantidades.tandas(cookies_por_sabor)
+    plan = cronograma(tandas, tandas_por_dia)
+    return {
+        'cantidades': cantidades,
+        'acumulado': cantidades.acumulado(ventana),
+        'tandas': tandas,
+        'horneado': plan['horneado'],
+        'uso': plan['uso'],
+        'sin_lugar': plan['sin_lugar'],
+        'sin_fecha': sin_fecha,
+        'numpy': cantidades.numpy,
+        'ms_bd': (lectura - inicio) * 1000,
+        'ms_calculo': (time.perf_counter() - lectura) * 1000,
+    }
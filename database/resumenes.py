@@ -0,0 +1,331 @@
+# Tablas de resumen materializadas y los triggers que las mantienen.
+#
+# produccion_dia_sabor guarda la cantidad a producir por (dia, sabor_id) y
+# recaudacion_dia el número de pedidos, el total y lo ya pagado por día.
+# Los triggers las actualizan en cada INSERT, UPDATE y DELETE de `pedidos`
+# y `pedido_items`, así que leer un resumen cuesta O(días x sabores).
+# Desde la versión 7 las altas no tienen triggers: DatabaseManager las suma
+# por pedido o por lote (ver más abajo).
+
+TABLAS_RESUMEN = [
+    '''
+    CREATE TABLE IF NOT EXISTS produccion_dia_sabor (
+        dia TEXT NOT NULL,
+        sabor_id INTEGER NOT NULL,
+        cantidad INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dia, sabor_id)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS recaudacion_dia (
+        dia TEXT PRIMARY KEY,
+        pedidos INTEGER NOT NULL DEFAULT 0,
+        total REAL NOT NULL DEFAULT 0.0,
+        pagado REAL NOT NULL DEFAULT 0.0
+    ) WITHOUT ROWID
+    ''',
+]
+
+TRIGGERS_RESUMEN = [
+    # --- pedido_items ---
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_resumen_insert
+    AFTER INSERT ON pedido_items WHEN NEW.cantidad <> 0
+    BEGIN
+        INSERT OR IGNORE INTO produccion_dia_sabor (dia, sabor_id, cantidad)
+            SELECT dia, NEW.sabor_id, 0 FROM pedidos WHERE id = NEW.pedido_id;
+        UPDATE produccion_dia_sabor SET cantidad = cantidad + NEW.cantidad
+            WHERE sabor_id = NEW.sabor_id AND dia = (SELECT dia FROM pedidos WHERE id = NEW.pedido_id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_resumen_delete
+    AFTER DELETE ON pedido_items WHEN OLD.cantidad <> 0
+    BEGIN
+        UPDATE produccion_dia_sabor SET cantidad = cantidad - OLD.cantidad
+            WHERE sabor_id = OLD.sabor_id AND dia = (SELECT dia FROM pedidos WHERE id = OLD.pedido_id);
+        DELETE FROM produccion_dia_sabor
+            WHERE sabor_id = OLD.sabor_id AND dia = (SELECT dia FROM pedidos WHERE id = OLD.pedido_id)
+            AND cantidad = 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_resumen_update
+    AFTER UPDATE OF pedido_id, sabor_id, cantidad ON pedido_items
+    BEGIN
+        UPDATE produccion_dia_sabor SET cantidad = cantidad - OLD.cantidad
+            WHERE sabor_id = OLD.sabor_id AND dia = (SELECT dia FROM pedidos WHERE id = OLD.pedido_id);
+        DELETE FROM produccion_dia_sabor
+            WHERE sabor_id = OLD.sabor_id AND dia = (SELECT dia FROM pedidos WHERE id = OLD.pedido_id)
+            AND cantidad = 0;
+        INSERT OR IGNORE INTO produccion_dia_sabor (dia, sabor_id, cantidad)
+            SELECT dia, NEW.sabor_id, 0 FROM pedidos WHERE id = NEW.pedido_id AND NEW.cantidad <> 0;
+        UPDATE produccion_dia_sabor SET cantidad = cantidad + NEW.cantidad
+            WHERE sabor_id = NEW.sabor_id AND dia = (SELECT dia FROM pedidos WHERE id = NEW.pedido_id);
+    END
+    ''',
+    # --- pedidos ---
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_resumen_insert
+    AFTER INSERT ON pedidos
+    BEGIN
+        INSERT OR IGNORE INTO recaudacion_dia (dia) VALUES (NEW.dia);
+        UPDATE recaudacion_dia SET
+            pedidos = pedidos + 1,
+            total = total + NEW.precio_pedido + IFNULL(NEW.precio_envio, 0),
+            pagado = pagado + CASE WHEN NEW.pago = 1 THEN NEW.precio_pedido + IFNULL(NEW.precio_envio, 0) ELSE 0 END
+            WHERE dia = NEW.dia;
+    END
+    ''',
+    # BEFORE DELETE: los items se borran mientras el pedido todavía existe,
+    # así sus triggers encuentran el día (el ON DELETE CASCADE llega tarde).
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_resumen_delete
+    BEFORE DELETE ON pedidos
+    BEGIN
+        DELETE FROM pedido_items WHERE pedido_id = OLD.id;
+        UPDATE recaudacion_dia SET
+            pedidos = pedidos - 1,
+            total = total - (OLD.precio_pedido + IFNULL(OLD.precio_envio, 0)),
+            pagado = pagado - CASE WHEN OLD.pago = 1 THEN OLD.precio_pedido + IFNULL(OLD.precio_envio, 0) ELSE 0 END
+            WHERE dia = OLD.dia;
+        DELETE FROM recaudacion_dia WHERE dia = OLD.dia AND pedidos <= 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_resumen_update
+    AFTER UPDATE OF dia, precio_pedido, precio_envio, pago ON pedidos
+    BEGIN
+        UPDATE recaudacion_dia SET
+            pedidos = pedidos - 1,
+            total = total - (OLD.precio_pedido + IFNULL(OLD.precio_envio, 0)),
+            pagado = pagado - CASE WHEN OLD.pago = 1 THEN OLD.precio_pedido + IFNULL(OLD.precio_envio, 0) ELSE 0 END
+            WHERE dia = OLD.dia;
+        DELETE FROM recaudacion_dia WHERE dia = OLD.dia AND pedidos <= 0;
+        INSERT OR IGNORE INTO recaudacion_dia (dia) VALUES (NEW.dia);
+        UPDATE recaudacion_dia SET
+            pedidos = pedidos + 1,
+            total = total + NEW.precio_pedido + IFNULL(NEW.precio_envio, 0),
+            pagado = pagado + CASE WHEN NEW.pago = 1 THEN NEW.precio_pedido + IFNULL(NEW.precio_envio, 0) ELSE 0 END
+            WHERE dia = NEW.dia;
+    END
+    ''',
+    # Cambio de día: la producción del pedido pasa del día viejo al nuevo.
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_resumen_cambio_dia
+    AFTER UPDATE OF dia ON pedidos WHEN OLD.dia IS NOT NEW.dia
+    BEGIN
+        UPDATE produccion_dia_sabor SET cantidad = cantidad - (
+                SELECT SUM(cantidad) FROM pedido_items
+                WHERE pedido_id = NEW.id AND sabor_id = produccion_dia_sabor.sabor_id)
+            WHERE dia = OLD.dia AND sabor_id IN (SELECT sabor_id FROM pedido_items WHERE pedido_id = NEW.id);
+        DELETE FROM produccion_dia_sabor WHERE dia = OLD.dia AND cantidad = 0;
+        INSERT OR IGNORE INTO produccion_dia_sabor (dia, sabor_id, cantidad)
+            SELECT DISTINCT NEW.dia, sabor_id, 0 FROM pedido_items WHERE pedido_id = NEW.id;
+        UPDATE produccion_dia_sabor SET cantidad = cantidad + (
+                SELECT SUM(cantidad) FROM pedido_items
+                WHERE pedido_id = NEW.id AND sabor_id = produccion_dia_sabor.sabor_id)
+            WHERE dia = NEW.dia AND sabor_id IN (SELECT sabor_id FROM pedido_items WHERE pedido_id = NEW.id);
+        DELETE FROM produccion_dia_sabor WHERE dia = NEW.dia AND cantidad = 0;
+    END
+    ''',
+]
+
+# Recálculo completo, usado para reconstruir y verificar las tablas.
+RECALCULO_PRODUCCION = '''
+    SELECT p.dia, i.sabor_id, SUM(i.cantidad)
+    FROM pedidos p JOIN pedido_items i ON i.pedido_id = p.id
+    GROUP BY p.dia, i.sabor_id
+    HAVING SUM(i.cantidad) <> 0
+'''
+
+RECALCULO_RECAUDACION = '''
+    SELECT dia, COUNT(*),
+        SUM(precio_pedido + IFNULL(precio_envio, 0)),
+        SUM(CASE WHEN pago = 1 THEN precio_pedido + IFNULL(precio_envio, 0) ELSE 0 END)
+    FROM pedidos
+    GROUP BY dia
+'''
+
+# Diferencia tolerada entre los totales materializados y el recálculo,
+# por el redondeo acumulado de sumas y restas en coma flotante.
+TOLERANCIA_IMPORTES = 0.005
+
+# Versión 4: producción por fecha de entrega (ISO) y sabor, para la
+# planificación (database/planificacion.py). Son los triggers de
+# produccion_dia_sabor con `fecha_entrega` en lugar de `dia`; el de borrado
+# de pedidos ya borra los items antes, así que no hace falta otro.
+TABLAS_PRODUCCION_FECHA = [
+    '''
+    CREATE TABLE IF NOT EXISTS produccion_fecha_sabor (
+        fecha_entrega TEXT NOT NULL,
+        sabor_id INTEGER NOT NULL,
+        cantidad INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (fecha_entrega, sabor_id)
+    ) WITHOUT ROWID
+    ''',
+]
+
+TRIGGERS_PRODUCCION_FECHA = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_fecha_insert
+    AFTER INSERT ON pedido_items WHEN NEW.cantidad <> 0
+    BEGIN
+        INSERT OR IGNORE INTO produccion_fecha_sabor (fecha_entrega, sabor_id, cantidad)
+            SELECT fecha_entrega, NEW.sabor_id, 0 FROM pedidos WHERE id = NEW.pedido_id;
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad + NEW.cantidad
+            WHERE sabor_id = NEW.sabor_id
+            AND fecha_entrega = (SELECT fecha_entrega FROM pedidos WHERE id = NEW.pedido_id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_fecha_delete
+    AFTER DELETE ON pedido_items WHEN OLD.cantidad <> 0
+    BEGIN
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad - OLD.cantidad
+            WHERE sabor_id = OLD.sabor_id
+            AND fecha_entrega = (SELECT fecha_entrega FROM pedidos WHERE id = OLD.pedido_id);
+        DELETE FROM produccion_fecha_sabor
+            WHERE sabor_id = OLD.sabor_id
+            AND fecha_entrega = (SELECT fecha_entrega FROM pedidos WHERE id = OLD.pedido_id)
+            AND cantidad = 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_items_fecha_update
+    AFTER UPDATE OF pedido_id, sabor_id, cantidad ON pedido_items
+    BEGIN
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad - OLD.cantidad
+            WHERE sabor_id = OLD.sabor_id
+            AND fecha_entrega = (SELECT fecha_entrega FROM pedidos WHERE id = OLD.pedido_id);
+        DELETE FROM produccion_fecha_sabor
+            WHERE sabor_id = OLD.sabor_id
+            AND fecha_entrega = (SELECT fecha_entrega FROM pedidos WHERE id = OLD.pedido_id)
+            AND cantidad = 0;
+        INSERT OR IGNORE INTO produccion_fecha_sabor (fecha_entrega, sabor_id, cantidad)
+            SELECT fecha_entrega, NEW.sabor_id, 0 FROM pedidos WHERE id = NEW.pedido_id AND NEW.cantidad <> 0;
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad + NEW.cantidad
+            WHERE sabor_id = NEW.sabor_id
+            AND fecha_entrega = (SELECT fecha_entrega FROM pedidos WHERE id = NEW.pedido_id);
+    END
+    ''',
+    # Cambio de fecha: la producción del pedido pasa de la fecha vieja a la nueva.
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_fecha_cambio
+    AFTER UPDATE OF fecha_entrega ON pedidos WHEN OLD.fecha_entrega IS NOT NEW.fecha_entrega
+    BEGIN
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad - (
+                SELECT SUM(cantidad) FROM pedido_items
+                WHERE pedido_id = NEW.id AND sabor_id = produccion_fecha_sabor.sabor_id)
+            WHERE fecha_entrega = OLD.fecha_entrega
+            AND sabor_id IN (SELECT sabor_id FROM pedido_items WHERE pedido_id = NEW.id);
+        DELETE FROM produccion_fecha_sabor WHERE fecha_entrega = OLD.fecha_entrega AND cantidad = 0;
+        INSERT OR IGNORE INTO produccion_fecha_sabor (fecha_entrega, sabor_id, cantidad)
+            SELECT DISTINCT NEW.fecha_entrega, sabor_id, 0 FROM pedido_items WHERE pedido_id = NEW.id;
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad + (
+                SELECT SUM(cantidad) FROM pedido_items
+                WHERE pedido_id = NEW.id AND sabor_id = produccion_fecha_sabor.sabor_id)
+            WHERE fecha_entrega = NEW.fecha_entrega
+            AND sabor_id IN (SELECT sabor_id FROM pedido_items WHERE pedido_id = NEW.id);
+        DELETE FROM produccion_fecha_sabor WHERE fecha_entrega = NEW.fecha_entrega AND cantidad = 0;
+    END
+    ''',
+]
+
+RECALCULO_PRODUCCION_FECHA = '''
+    SELECT p.fecha_entrega, i.sabor_id, SUM(i.cantidad)
+    FROM pedidos p JOIN pedido_items i ON i.pedido_id = p.id
+    GROUP BY p.fecha_entrega, i.sabor_id
+    HAVING SUM(i.cantidad) <> 0
+'''
+
+# Versión 6: produccion_fecha_sabor sin triggers por item. DatabaseManager
+# suma en Python lo que agrega o cambia cada alta, lote o edición y lo
+# aplica con una sentencia por (fecha, sabor) tocado, no una por item. El
+# borrado de un pedido lo resta en el trigger BEFORE DELETE de `pedidos`,
+# que reemplaza al de la versión 1 (el orden entre dos triggers BEFORE no
+# está definido y la resta tiene que ver los items). El cambio de fecha
+# sigue en trg_pedidos_fecha_cambio, una vez por pedido.
+TRIGGERS_PRODUCCION_FECHA_OBSOLETOS = ['trg_items_fecha_insert', 'trg_items_fecha_delete', 'trg_items_fecha_update',
+                                       'trg_pedidos_resumen_delete']
+
+TRIGGER_BORRADO_PEDIDOS = '''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_resumen_delete
+    BEFORE DELETE ON pedidos
+    BEGIN
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad - (
+                SELECT SUM(cantidad) FROM pedido_items
+                WHERE pedido_id = OLD.id AND sabor_id = produccion_fecha_sabor.sabor_id)
+            WHERE fecha_entrega = OLD.fecha_entrega
+            AND sabor_id IN (SELECT sabor_id FROM pedido_items WHERE pedido_id = OLD.id);
+        DELETE FROM produccion_fecha_sabor WHERE fecha_entrega = OLD.fecha_entrega AND cantidad = 0;
+        DELETE FROM pedido_items WHERE pedido_id = OLD.id;
+        UPDATE recaudacion_dia SET
+            pedidos = pedidos - 1,
+            total = total - (OLD.precio_pedido + IFNULL(OLD.precio_envio, 0)),
+            pagado = pagado - CASE WHEN OLD.pago = 1 THEN OLD.precio_pedido + IFNULL(OLD.precio_envio, 0) ELSE 0 END
+            WHERE dia = OLD.dia;
+        DELETE FROM recaudacion_dia WHERE dia = OLD.dia AND pedidos <= 0;
+    END
+'''
+
+# Parámetros (fecha_entrega, sabor_id) y (cantidad, fecha_entrega, sabor_id)
+CREAR_PRODUCCION_FECHA = """
+    INSERT OR IGNORE INTO produccion_fecha_sabor (fecha_entrega, sabor_id, cantidad) VALUES (?, ?, 0)
+"""
+SUMAR_PRODUCCION_FECHA = """
+    UPDATE produccion_fecha_sabor SET cantidad = cantidad + ? WHERE fecha_entrega = ? AND sabor_id = ?
+"""
+LIMPIAR_PRODUCCION_FECHA = """
+    DELETE FROM produccion_fecha_sabor WHERE fecha_entrega = ? AND sabor_id = ? AND cantidad = 0
+"""
+
+# Versión 7: las altas de pedidos e items ya no tienen triggers.
+# DatabaseManager suma cada alta o lote a produccion_dia_sabor (como a
+# produccion_fecha_sabor en la 6) y a recaudacion_dia, agrupado por día o
+# fecha. Las modificaciones de pedidos y los borrados siguen en triggers
+# por pedido; el de borrado resta ahora las dos producciones.
+TRIGGERS_ALTAS_OBSOLETOS = ['trg_items_resumen_insert', 'trg_items_resumen_delete', 'trg_items_resumen_update',
+                            'trg_pedidos_resumen_insert', 'trg_pedidos_resumen_delete']
+
+TRIGGER_BORRADO_PEDIDOS_PRODUCCION = '''
+    CREATE TRIGGER IF NOT EXISTS trg_pedidos_resumen_delete
+    BEFORE DELETE ON pedidos
+    BEGIN
+        UPDATE produccion_dia_sabor SET cantidad = cantidad - (
+                SELECT SUM(cantidad) FROM pedido_items
+                WHERE pedido_id = OLD.id AND sabor_id = produccion_dia_sabor.sabor_id)
+            WHERE dia = OLD.dia AND sabor_id IN (SELECT sabor_id FROM pedido_items WHERE pedido_id = OLD.id);
+        DELETE FROM produccion_dia_sabor WHERE dia = OLD.dia AND cantidad = 0;
+        UPDATE produccion_fecha_sabor SET cantidad = cantidad - (
+                SELECT SUM(cantidad) FROM pedido_items
+                WHERE pedido_id = OLD.id AND sabor_id = produccion_fecha_sabor.sabor_id)
+            WHERE fecha_entrega = OLD.fecha_entrega
+            AND sabor_id IN (SELECT sabor_id FROM pedido_items WHERE pedido_id = OLD.id);
+        DELETE FROM produccion_fecha_sabor WHERE fecha_entrega = OLD.fecha_entrega AND cantidad = 0;
+        DELETE FROM pedido_items WHERE pedido_id = OLD.id;
+        UPDATE recaudacion_dia SET
+            pedidos = pedidos - 1,
+            total = total - (OLD.precio_pedido + IFNULL(OLD.precio_envio, 0)),
+            pagado = pagado - CASE WHEN OLD.pago = 1 THEN OLD.precio_pedido + IFNULL(OLD.precio_envio, 0) ELSE 0 END
+            WHERE dia = OLD.dia;
+        DELETE FROM recaudacion_dia WHERE dia = OLD.dia AND pedidos <= 0;
+    END
+'''
+
+# Parámetros (dia, sabor_id) y (cantidad, dia, sabor_id)
+CREAR_PRODUCCION_DIA = "INSERT OR IGNORE INTO produccion_dia_sabor (dia, sabor_id, cantidad) VALUES (?, ?, 0)"
+SUMAR_PRODUCCION_DIA = "UPDATE produccion_dia_sabor SET cantidad = cantidad + ? WHERE dia = ? AND sabor_id = ?"
+LIMPIAR_PRODUCCION_DIA = "DELETE FROM produccion_dia_sabor WHERE dia = ? AND sabor_id = ? AND cantidad = 0"
+
+# Parámetros (dia) y (pedidos, total, pagado, dia)
+CREAR_RECAUDACION = "INSERT OR IGNORE INTO recaudacion_dia (dia) VALUES (?)"
+SUMAR_RECAUDACION = """
+    UPDATE recaudacion_dia SET pedidos = pedidos + ?, total = total + ?, pagado = pagado + ? WHERE dia = ?
+"""
+
+# (alta de la fila en cero, suma, borrado de la fila en cero) de cada resumen de producción
+SENTENCIAS_PRODUCCION = [
+    (CREAR_PRODUCCION_DIA, SUMAR_PRODUCCION_DIA, LIMPIAR_PRODUCCION_DIA),
+    (CREAR_PRODUCCION_FECHA, SUMAR_PRODUCCION_FECHA, LIMPIAR_PRODUCCION_FECHA),
+]
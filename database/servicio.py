@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import DB_NAME, DB_AGRUPAR_ESCRITURAS
+from database.cola_escritura import ColaEscritura
+from database.db_manager import DatabaseManager
+
+class ServicioBD:
+    """Ejecuta las operaciones de DatabaseManager en un hilo propio.
+
+    El hilo abre la conexión y es el único que la usa, así que SQLite nunca
+    bloquea el bucle de Tk. Cada llamada devuelve un concurrent.futures.Future.
+    Con `agrupar_escrituras` las escrituras pasan por una ColaEscritura y
+    se guardan en grupos con un solo commit.
+    """
+
+    def __init__(self, db_name=DB_NAME, agrupar_escrituras=DB_AGRUPAR_ESCRITURAS):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="servicio_bd")
+        self.db_manager = None
+        # La conexión se crea dentro del hilo de la BD; los errores de apertura se propagan aquí
+        self._executor.submit(self._abrir, db_name).result()
+        self.cola = ColaEscritura(self) if agrupar_escrituras else None
+
+    def _abrir(self, db_name):
+        """Abre la base de datos desde el hilo de la BD."""
+        self.db_manager = DatabaseManager(db_name)
+
+    def enviar(self, funcion, *args, **kwargs):
+        """Ejecuta funcion(db_manager, *args, **kwargs) en el hilo de la BD."""
+        return self._executor.submit(lambda: funcion(self.db_manager, *args, **kwargs))
+
+    def ejecutar(self, metodo, *args, **kwargs):
+        """Llama a un método de DatabaseManager en el hilo de la BD."""
+        return self._executor.submit(lambda: getattr(self.db_manager, metodo)(*args, **kwargs))
+
+    def escribir(self, funcion, *args, **kwargs):
+        """Como enviar, para funciones que escriben: pasan por la cola de escrituras si está activa."""
+        if self.cola is not None:
+            return self.cola.enviar(funcion, *args, **kwargs)
+        return self.enviar(funcion, *args, **kwargs)
+
+    def _escribir_metodo(self, metodo, *args):
+        """Como ejecutar, para métodos que escriben."""
+        if self.cola is not None:
+            return self.cola.ejecutar(metodo, *args)
+        return self.ejecutar(metodo, *args)
+
+    def cargar_pedidos(self, filtro=None):
+        """Future con la lista completa de pedidos, o de los que cumplen `filtro`."""
+        return self.ejecutar('cargar_pedidos', filtro)
+
+    def obtener_pedido(self, pedido_id):
+        """Future con un pedido y sus items, o None."""
+        return self.ejecutar('obtener_pedido', pedido_id)
+
+    def agregar_pedido(self, dia, nombre, precio_pedido, precio_envio, direccion, horario, items):
+        """Future con el id del pedido nuevo."""
+        return self._escribir_metodo('agregar_pedido', dia, nombre, precio_pedido, precio_envio, direccion, horario,
+                                     items)
+
+    def actualizar_pedido(self, pedido_id, dia, nombre, precio_pedido, precio_envio, direccion, horario, items, pago=0):
+        """Future con el resumen de cambios guardados (ver DatabaseManager.actualizar_pedido)."""
+        return self._escribir_metodo('actualizar_pedido', pedido_id, dia, nombre, precio_pedido, precio_envio,
+                                     direccion, horario, items, pago)
+
+    def eliminar_pedido(self, pedido_id):
+        """Future con True si el pedido existía."""
+        return self._escribir_metodo('eliminar_pedido', pedido_id)
+
+    def eliminar_pedidos(self, pedido_ids):
+        """Future con los ids eliminados."""
+        return self._escribir_metodo('eliminar_pedidos', pedido_ids)
+
+    def marcar_pagados(self, pedido_ids, estado=1):
+        """Future con los ids cuyo estado de pago cambió."""
+        return self._escribir_metodo('marcar_pagados', pedido_ids, estado)
+
+    def mover_dia(self, pedido_ids, nuevo_dia):
+        """Future con los ids que cambiaron de día."""
+        return self._escribir_metodo('mover_dia', pedido_ids, nuevo_dia)
+
+    def toggle_pago_pedido(self, pedido_id):
+        """Future con el nuevo estado de pago."""
+        return self._escribir_metodo('toggle_pago_pedido', pedido_id)
+
+    def latencias(self):
+        """Future con el resumen p50/p95/p99 por método ({} si no se mide)."""
+        return self.enviar(lambda db: db.instrumentacion.resumen() if db.instrumentacion else {})
+
+    def informe_latencias(self):
+        """Future con la tabla de latencias y los aciertos de la caché en texto."""
+        return self.enviar(lambda db: "\n".join((
+            db.instrumentacion.informe() if db.instrumentacion else "Medición desactivada.", db.informe_cache())))
+
+    def informe_cache(self):
+        """Future con los aciertos y fallos de la caché de lecturas en texto."""
+        return self.ejecutar('informe_cache')
+
+    def reiniciar_latencias(self):
+        """Future que se resuelve al descartar las latencias y los contadores de la caché."""
+        def reiniciar(db):
+            if db.instrumentacion:
+                db.instrumentacion.reiniciar()
+            db.cache_pedidos.reiniciar()
+            db.cache_consultas.reiniciar()
+        return self.enviar(reiniciar)
+
+    def close(self):
+        """Guarda las escrituras encoladas, cierra la conexión en su hilo y detiene el hilo."""
+        if self.cola is not None:
+            self.cola.close()
+            self.cola = None
+        if self.db_manager:
+            self._executor.submit(self.db_manager.close).result()
+            self.db_manager = None
+        self._executor.shutdown(wait=True)
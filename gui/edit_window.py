@@ -2,19 +2,23 @@
 from tkinter import ttk, messagebox
 from config.settings import SABORES_VALIDOS
 from utils.validators import validar_numero
+from .tareas import al_terminar
 
 class EditWindow:
-    def __init__(self, parent, db_manager, pedido, callback_actualizar):
+    def __init__(self, parent, servicio_bd, pedido, callback_actualizar):
         self.parent = parent
-        self.db_manager = db_manager
+        self.servicio_bd = servicio_bd
         self.pedido = pedido
         self.callback_actualizar = callback_actualizar
-        self.items_edit_actual = pedido.get('items', []).copy()
+        self.items_edit_actual = [item._asdict() for item in pedido.items]
 
         # Crear ventana Toplevel
         self.win = tk.Toplevel(parent)
-        self.win.title(f"Editar Pedido #{pedido['id']}")
-        self.win.state("zoomed")
+        self.win.title(f"Editar Pedido #{pedido.id}")
+        try:
+            self.win.state("zoomed")
+        except tk.TclError:
+            self.win.attributes("-zoomed", True)
 
         # Frame principal
         self.frame = ttk.Frame(self.win, padding="10")
@@ -37,7 +41,7 @@ def _setup_ui(self):
         self.entry_horario = self._create_entry_field(frame_datos_generales, "Horario Entrega:", 5)
 
         # Checkbutton para estado de pago
-        self.pago_var = tk.IntVar(value=self.pedido.get('pago', 0))
+        self.pago_var = tk.IntVar(value=self.pedido.pago or 0)
         ttk.Checkbutton(frame_datos_generales, text="Pedido Pagado", variable=self.pago_var).grid(
             row=6, column=0, columnspan=2, padx=5, pady=10, sticky=tk.W)
 
@@ -47,7 +51,8 @@ def _setup_ui(self):
         # Frame para botones
         btn_frame = ttk.Frame(self.frame)
         btn_frame.pack(pady=10)
-        ttk.Button(btn_frame, text="Guardar Cambios", command=self.guardar_cambios).pack(side=tk.LEFT, padx=5)
+        self.btn_guardar = ttk.Button(btn_frame, text="Guardar Cambios", command=self.guardar_cambios)
+        self.btn_guardar.pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Cancelar", command=self.win.destroy).pack(side=tk.LEFT, padx=5)
 
         # Cargar datos iniciales
@@ -94,12 +99,12 @@ def _setup_items_frame(self):
 
     def _cargar_datos_iniciales(self):
         """Carga los datos iniciales en los campos."""
-        self.entry_dia.insert(0, self.pedido.get('dia', ''))
-        self.entry_nombre.insert(0, self.pedido.get('nombre', ''))
-        self.entry_precio_pedido.insert(0, str(self.pedido.get('precio_pedido', '')))
-        self.entry_precio_envio.insert(0, str(self.pedido.get('precio_envio', '')))
-        self.entry_direccion.insert(0, self.pedido.get('direccion', ''))
-        self.entry_horario.insert(0, self.pedido.get('horario', ''))
+        self.entry_dia.insert(0, self.pedido.dia)
+        self.entry_nombre.insert(0, self.pedido.nombre)
+        self.entry_precio_pedido.insert(0, str(self.pedido.precio_pedido))
+        self.entry_precio_envio.insert(0, str(self.pedido.precio_envio if self.pedido.precio_envio is not None else ''))
+        self.entry_direccion.insert(0, self.pedido.direccion or '')
+        self.entry_horario.insert(0, self.pedido.horario or '')
 
     def actualizar_tree_items(self):
         """Actualiza el Treeview de items."""
@@ -163,13 +168,20 @@ def guardar_cambios(self):
             messagebox.showerror("Error", "El pedido debe tener al menos un item.", parent=self.win)
             return
 
-        try:
-            self.db_manager.actualizar_pedido(
-                self.pedido['id'], dia, nombre, precio_pedido, precio_envio,
-                direccion, horario, self.items_edit_actual, pago_estado
-            )
+        def guardado(cambios):
             self.win.destroy()
-            self.callback_actualizar()
-            messagebox.showinfo("Éxito", "Pedido actualizado correctamente.")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo actualizar el pedido: {e}", parent=self.win) 
\ No newline at end of file
+            self.callback_actualizar(self.pedido.id, cambios)
+            if cambios['modificado']:
+                messagebox.showinfo("Éxito", "Pedido actualizado correctamente.")
+            else:
+                messagebox.showinfo("Sin cambios", "No había cambios para guardar.")
+
+        # Evita un segundo guardado mientras el hilo de la BD procesa el primero
+        self.btn_guardar.state(['disabled'])
+        future = self.servicio_bd.actualizar_pedido(
+            self.pedido.id, dia, nombre, precio_pedido, precio_envio,
+            direccion, horario, list(self.items_edit_actual), pago_estado
+        )
+        # Se revisa desde la ventana principal: esta se destruye al guardar
+        al_terminar(self.parent, future, guardado, "No se pudo actualizar el pedido", parent=self.win,
+                    fallo=lambda _: self.btn_guardar.state(['!disabled'])) 
\ No newline at end of file
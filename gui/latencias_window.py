@@ -0,0 +1,74 @@
+import tkinter as tk
+from tkinter import ttk
+from config.settings import DB_CONSULTA_LENTA_MS, DB_LOG_CONSULTAS_LENTAS
+from .tareas import al_terminar
+
+class LatenciasWindow:
+    """Ventana de depuración con p50/p95/p99 por método de DatabaseManager."""
+
+    COLUMNAS = {
+        'operacion': ('Operación', 200, tk.W),
+        'llamadas': ('Llamadas', 80, tk.E),
+        'filas': ('Filas', 90, tk.E),
+        'p50_ms': ('p50 (ms)', 80, tk.E),
+        'p95_ms': ('p95 (ms)', 80, tk.E),
+        'p99_ms': ('p99 (ms)', 80, tk.E),
+        'max_ms': ('Máx. (ms)', 80, tk.E),
+    }
+
+    def __init__(self, parent, servicio_bd):
+        self.parent = parent
+        self.servicio_bd = servicio_bd
+
+        self.win = tk.Toplevel(parent)
+        self.win.title("Latencia de consultas")
+
+        frame = ttk.Frame(self.win, padding="10")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        self.tree = ttk.Treeview(frame, columns=tuple(self.COLUMNAS), show='headings', height=15)
+        for col, (heading, width, anchor) in self.COLUMNAS.items():
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, width=width, anchor=anchor)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.label_cache = ttk.Label(frame, text="", justify=tk.LEFT)
+        self.label_cache.pack(pady=5, anchor=tk.W)
+
+        ttk.Label(frame, text=f"Las consultas de más de {DB_CONSULTA_LENTA_MS} ms se guardan en "
+                              f"{DB_LOG_CONSULTAS_LENTAS}, junto a la base de datos.").pack(pady=5, anchor=tk.W)
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Actualizar", command=self.actualizar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Reiniciar", command=self.reiniciar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cerrar", command=self.win.destroy).pack(side=tk.LEFT, padx=5)
+
+        self.actualizar()
+
+    def actualizar(self):
+        """Pide las latencias al hilo de la BD y las muestra."""
+        def mostrar(resumen):
+            if not self.win.winfo_exists():
+                return
+            self.tree.delete(*self.tree.get_children())
+            for operacion, datos in resumen.items():
+                self.tree.insert('', 'end', values=(
+                    operacion, datos['llamadas'], datos['filas'], f"{datos['p50_ms']:.2f}",
+                    f"{datos['p95_ms']:.2f}", f"{datos['p99_ms']:.2f}", f"{datos['max_ms']:.2f}",
+                ))
+
+        al_terminar(self.parent, self.servicio_bd.latencias(), mostrar,
+                    "No se pudieron leer las latencias", parent=self.win)
+
+        def mostrar_cache(informe):
+            if self.win.winfo_exists():
+                self.label_cache.config(text=informe)
+
+        al_terminar(self.parent, self.servicio_bd.informe_cache(), mostrar_cache,
+                    "No se pudo leer el estado de la caché", parent=self.win)
+
+    def reiniciar(self):
+        """Descarta las latencias acumuladas."""
+        al_terminar(self.parent, self.servicio_bd.reiniciar_latencias(), lambda _: self.actualizar(),
+                    "No se pudieron reiniciar las latencias", parent=self.win)
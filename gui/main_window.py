@@ -1,19 +1,70 @@
+import bisect
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-from collections import defaultdict
-from config.settings import SABORES_VALIDOS, WINDOW_TITLE
+from tkinter import ttk, messagebox, scrolledtext, filedialog, simpledialog
+from itertools import groupby
+from operator import itemgetter
+from config.settings import (
+    SABORES_VALIDOS, WINDOW_TITLE, LISTA_VIRTUAL_UMBRAL, LISTA_VIRTUAL_MARGEN, FILTRO_ESPERA_MS,
+    CAMBIOS_INTERVALO_MS,
+)
+from database.exportador import exportar
+from database.modelos import preparar_valores
+from database.importador import importar_archivo
+from utils.fechas import proximos_dias, esta_semana
 from utils.validators import validar_numero
 from .edit_window import EditWindow
+from .latencias_window import LatenciasWindow
+from .planificacion_window import PlanificacionWindow
+from .tareas import al_terminar
 
 class MainWindow:
-    def __init__(self, db_manager):
-        self.db_manager = db_manager
+    # Opciones del filtro de pago -> valor de la columna pago (None = sin filtrar)
+    OPCIONES_PAGO = {"Todos": None, "Pagados": 1, "No pagados": 0}
+    # Opciones del filtro de entrega -> función que da el rango (desde, hasta) de fechas ISO
+    OPCIONES_ENTREGA = {
+        "Todas": None,
+        "Hoy": lambda: proximos_dias(1),
+        "Próximos 3 días": lambda: proximos_dias(3),
+        "Esta semana": esta_semana,
+    }
+
+    def __init__(self, servicio_bd):
+        self.servicio_bd = servicio_bd
         self.items_pedido_actual = []
+        self.tiempos_refresco = {}
+        # Operaciones en curso en el hilo de la BD (y lanzadas en total) y refrescos agrupados
+        self._tareas_pendientes = 0
+        self._tareas_lanzadas = 0
+        self._refrescando = False
+        self._refresco_pendiente = False
+        self._ventana_cargando = False
+        self._ventana_destino = None
+        # Filas mostradas en tree_pedidos: iid -> valores, y claves de orden
+        self._filas_pedidos = {}
+        self._orden_pedidos = []
+        # Lista virtual: tree_pedidos solo contiene la ventana que empieza en _posicion
+        self._lista_virtual = False
+        self._total_pedidos = 0
+        self._posicion = 0
+        self._ventana_pendiente = False
+        # Filtro activo de la lista ({} = todos) y el after() que lo aplica al dejar de escribir
+        self._filtro = {}
+        self._filtro_programado = None
+        # Último cambio de `cambios` y PRAGMA data_version ya reflejados en la lista
+        self._cambio_visto = None
+        self._version_datos = None
+        # Si la última revisión de cambios falló (el error ya se mostró)
+        self._error_cambios = False
         self.root = tk.Tk()
         self.root.title(WINDOW_TITLE)
-        self.root.state('zoomed')
+        try:
+            self.root.state('zoomed')
+        except tk.TclError:
+            self.root.attributes('-zoomed', True)  # X11 no tiene el estado 'zoomed'
         self._setup_ui()
         self.actualizar_todo()
+        self.root.after(CAMBIOS_INTERVALO_MS, self._revisar_cambios)
 
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -40,9 +91,12 @@ def _setup_ui(self):
         self._setup_summary_frame()
         self._setup_list_frame()
         self._setup_daily_summary_frame()
+        self._setup_status_bar()
+        self._setup_menu()
 
         # Bindings
         self.tree_pedidos.bind("<Double-1>", self.toggle_pago_status)
+        self.tree_pedidos.bind("<Button-3>", self._abrir_menu_pedidos)
 
     def _setup_form_frame(self):
         """Configura el frame del formulario de entrada."""
@@ -118,6 +172,8 @@ def _setup_list_frame(self):
         list_frame = ttk.LabelFrame(self.main_frame, text="Pedidos Registrados", padding="10")
         list_frame.grid(row=0, column=1, rowspan=2, padx=10, pady=10, sticky="nsew")
 
+        self._setup_filter_bar(list_frame)
+
         # Configurar Treeview principal
         columns = ('dia', 'cliente', 'sabor', 'cantidad', 'precio', 'envio', 'direccion', 'horario', 'pago')
         self.tree_pedidos = ttk.Treeview(list_frame, columns=columns, show='headings', height=25)
@@ -125,24 +181,68 @@ def _setup_list_frame(self):
         # Configurar columnas
         self._configure_treeview_columns()
 
-        # Scrollbars
-        scrollbar_y = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree_pedidos.yview)
+        # Scrollbars (la vertical pasa por la lista virtual)
+        self.scrollbar_y = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self._desplazar_lista)
         scrollbar_x = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.tree_pedidos.xview)
-        self.tree_pedidos.configure(yscroll=scrollbar_y.set, xscroll=scrollbar_x.set)
+        self.tree_pedidos.configure(yscroll=self._on_scroll_lista, xscroll=scrollbar_x.set)
 
         # Empaquetar elementos
-        self.tree_pedidos.grid(row=0, column=0, sticky='nsew')
-        scrollbar_y.grid(row=0, column=1, sticky='ns')
-        scrollbar_x.grid(row=1, column=0, sticky='ew')
+        self.tree_pedidos.grid(row=1, column=0, sticky='nsew')
+        self.scrollbar_y.grid(row=1, column=1, sticky='ns')
+        scrollbar_x.grid(row=2, column=0, sticky='ew')
 
         # Frame para botones de acción
         action_frame = ttk.Frame(list_frame)
-        action_frame.grid(row=2, column=0, pady=10, sticky='ew')
-        action_frame.columnconfigure(0, weight=1)
-        action_frame.columnconfigure(1, weight=1)
+        action_frame.grid(row=3, column=0, pady=10, sticky='ew')
+        for columna in range(5):
+            action_frame.columnconfigure(columna, weight=1)
 
         ttk.Button(action_frame, text="Editar Pedido", command=self.editar_pedido).grid(row=0, column=0, padx=5)
         ttk.Button(action_frame, text="Eliminar Pedido", command=self.eliminar_pedido).grid(row=0, column=1, padx=5)
+        ttk.Button(action_frame, text="Marcar Pagados", command=lambda: self.marcar_pagados(1)).grid(
+            row=0, column=2, padx=5)
+        ttk.Button(action_frame, text="Marcar No Pagados", command=lambda: self.marcar_pagados(0)).grid(
+            row=0, column=3, padx=5)
+        ttk.Button(action_frame, text="Mover de Día...", command=self.mover_dia).grid(row=0, column=4, padx=5)
+
+        # Menú contextual con las acciones sobre la selección (admite varias filas)
+        self.menu_pedidos = tk.Menu(self.root, tearoff=0)
+        self.menu_pedidos.add_command(label="Editar", command=self.editar_pedido)
+        self.menu_pedidos.add_command(label="Marcar pagados", command=lambda: self.marcar_pagados(1))
+        self.menu_pedidos.add_command(label="Marcar no pagados", command=lambda: self.marcar_pagados(0))
+        self.menu_pedidos.add_command(label="Mover de día...", command=self.mover_dia)
+        self.menu_pedidos.add_separator()
+        self.menu_pedidos.add_command(label="Eliminar", command=self.eliminar_pedido)
+
+    def _setup_filter_bar(self, parent):
+        """Configura la barra de filtros de la lista de pedidos."""
+        filter_frame = ttk.Frame(parent)
+        filter_frame.grid(row=0, column=0, columnspan=2, pady=(0, 5), sticky='ew')
+
+        self.var_buscar = tk.StringVar()
+        self.var_filtro_dia = tk.StringVar()
+        self.var_filtro_sabor = tk.StringVar()
+        self.var_filtro_pago = tk.StringVar(value="Todos")
+        self.var_filtro_entrega = tk.StringVar(value="Todas")
+
+        ttk.Label(filter_frame, text="Buscar:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Entry(filter_frame, textvariable=self.var_buscar, width=25).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Día:").pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Entry(filter_frame, textvariable=self.var_filtro_dia, width=10).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Sabor:").pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Combobox(filter_frame, textvariable=self.var_filtro_sabor, values=[""] + SABORES_VALIDOS,
+                     width=14, state='readonly').pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Pago:").pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Combobox(filter_frame, textvariable=self.var_filtro_pago, values=list(self.OPCIONES_PAGO),
+                     width=10, state='readonly').pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Entrega:").pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Combobox(filter_frame, textvariable=self.var_filtro_entrega, values=list(self.OPCIONES_ENTREGA),
+                     width=15, state='readonly').pack(side=tk.LEFT)
+        ttk.Button(filter_frame, text="Limpiar", command=self.limpiar_filtro).pack(side=tk.LEFT, padx=10)
+
+        for variable in (self.var_buscar, self.var_filtro_dia, self.var_filtro_sabor, self.var_filtro_pago,
+                         self.var_filtro_entrega):
+            variable.trace_add('write', lambda *_: self._programar_filtro())
 
     def _setup_daily_summary_frame(self):
         """Configura el frame para el resumen diario."""
@@ -152,6 +252,75 @@ def _setup_daily_summary_frame(self):
         self.text_resumen_dia = scrolledtext.ScrolledText(daily_summary_frame, wrap=tk.WORD, state='disabled', height=15, width=40)
         self.text_resumen_dia.pack(expand=True, fill=tk.BOTH)
 
+    def _setup_status_bar(self):
+        """Configura la barra de estado con los tiempos de actualización."""
+        status_frame = ttk.Frame(self.main_frame)
+        status_frame.grid(row=2, column=0, columnspan=3, padx=10, sticky="ew")
+        status_frame.columnconfigure(0, weight=1)
+
+        self.label_estado = ttk.Label(status_frame, text="", anchor="w")
+        self.label_estado.grid(row=0, column=0, sticky="ew")
+
+        # Indicador de carga, visible mientras haya operaciones en el hilo de la BD
+        self.label_cargando = ttk.Label(status_frame, text="Cargando...")
+        self.progress_cargando = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+
+    def _setup_menu(self):
+        """Configura la barra de menú."""
+        menubar = tk.Menu(self.root)
+        self.menu_archivo = tk.Menu(menubar, tearoff=0)
+        self.menu_archivo.add_command(label="Importar pedidos...", command=self.importar_pedidos)
+        self.menu_archivo.add_separator()
+        self.menu_archivo.add_command(label="Exportar pedidos...", command=lambda: self.exportar('pedidos'))
+        self.menu_archivo.add_command(label="Exportar producción por día...",
+                                      command=lambda: self.exportar('produccion'))
+        self.menu_archivo.add_command(label="Exportar entregas de un día...",
+                                      command=lambda: self.exportar('entregas'))
+        self.menu_archivo.add_command(label="Exportar histórico de pedidos...",
+                                      command=lambda: self.exportar('pedidos', historico=True))
+        self.menu_archivo.add_separator()
+        self.menu_archivo.add_command(label="Archivar días cerrados...", command=self.archivar_dias)
+        menubar.add_cascade(label="Archivo", menu=self.menu_archivo)
+        self.menu_herramientas = tk.Menu(menubar, tearoff=0)
+        self.menu_herramientas.add_command(label="Planificación...",
+                                           command=lambda: PlanificacionWindow(self.root, self.servicio_bd))
+        self.menu_herramientas.add_command(label="Latencia de consultas...",
+                                           command=lambda: LatenciasWindow(self.root, self.servicio_bd))
+        menubar.add_cascade(label="Herramientas", menu=self.menu_herramientas)
+        self.root.config(menu=menubar)
+
+    def _tarea(self, future, exito, mensaje_error, fallo=None):
+        """Sigue una operación del hilo de la BD mostrando el indicador de carga."""
+        self._tareas_pendientes += 1
+        self._tareas_lanzadas += 1
+        self._actualizar_indicador()
+
+        def terminar(resultado):
+            self._tareas_pendientes -= 1
+            self._actualizar_indicador()
+            exito(resultado)
+            self._avanzar_cambio_visto()
+
+        def fallar(error):
+            self._tareas_pendientes -= 1
+            self._actualizar_indicador()
+            if fallo:
+                fallo(error)
+
+        al_terminar(self.root, future, terminar, mensaje_error, fallo=fallar)
+
+    def _actualizar_indicador(self):
+        """Muestra u oculta el indicador de carga."""
+        if self._tareas_pendientes > 0:
+            if not self.progress_cargando.winfo_ismapped():
+                self.label_cargando.grid(row=0, column=1, padx=5)
+                self.progress_cargando.grid(row=0, column=2)
+                self.progress_cargando.start(15)
+        elif self.progress_cargando.winfo_ismapped():
+            self.progress_cargando.stop()
+            self.progress_cargando.grid_remove()
+            self.label_cargando.grid_remove()
+
     def _configure_treeview_columns(self):
         """Configura las columnas del Treeview principal."""
         column_configs = {
@@ -175,98 +344,448 @@ def run(self):
         self.root.mainloop()
 
     def actualizar_todo(self):
-        """Actualiza todos los elementos de la interfaz."""
-        self.actualizar_lista_pedidos()
-        self.actualizar_resumen_produccion()
-        self.actualizar_total_recaudado()
-        self.actualizar_resumen_por_dia()
+        """Actualiza todos los elementos de la interfaz con una única carga de datos.
+
+        Los datos se leen una sola vez por ciclo, en el hilo de la BD, y se
+        pasan a cada panel. Si ya hay un ciclo en curso, las peticiones se
+        agrupan en un único ciclo posterior. Los tiempos de la carga y de
+        cada panel quedan en `tiempos_refresco`.
+        """
+        if self._refrescando:
+            self._refresco_pendiente = True
+            return
+        self._refrescando = True
+        inicio = time.perf_counter()
+        virtual = self._lista_virtual
+        future = self.servicio_bd.enviar(
+            self._leer_snapshot, self._tamano_ventana(),
+            self._posicion if virtual else 0, list(self._orden_pedidos) if virtual else [], dict(self._filtro)
+        )
+        self._tarea(future, lambda snapshot: self._aplicar_snapshot(snapshot, inicio),
+                    "No se pudieron cargar los pedidos", self._fin_refresco)
+
+    def _programar_filtro(self):
+        """Aplica el filtro cuando pasan FILTRO_ESPERA_MS sin cambios en la barra."""
+        if self._filtro_programado is not None:
+            self.root.after_cancel(self._filtro_programado)
+        self._filtro_programado = self.root.after(FILTRO_ESPERA_MS, self._aplicar_filtro)
+
+    def _leer_filtro(self):
+        """Arma el dict de filtro para DatabaseManager con los campos no vacíos de la barra."""
+        filtro = {
+            'texto': self.var_buscar.get().strip(),
+            'dia': self.var_filtro_dia.get().strip(),
+            'sabor': self.var_filtro_sabor.get(),
+            'pago': self.OPCIONES_PAGO.get(self.var_filtro_pago.get()),
+        }
+        rango = self.OPCIONES_ENTREGA.get(self.var_filtro_entrega.get())
+        if rango is not None:
+            filtro['fecha_desde'], filtro['fecha_hasta'] = rango()
+        return {clave: valor for clave, valor in filtro.items() if valor not in ("", None)}
+
+    def _aplicar_filtro(self):
+        """Recarga la lista desde el principio con el filtro de la barra."""
+        self._filtro_programado = None
+        filtro = self._leer_filtro()
+        if filtro == self._filtro:
+            return
+        self._filtro = filtro
+        # La ventana cargada es de la lista anterior: se relee desde el principio
+        self._lista_virtual = False
+        self._posicion = 0
+        self.actualizar_todo()
+
+    def limpiar_filtro(self):
+        """Vacía la barra de filtros y muestra todos los pedidos."""
+        self.var_buscar.set("")
+        self.var_filtro_dia.set("")
+        self.var_filtro_sabor.set("")
+        self.var_filtro_pago.set("Todos")
+        self.var_filtro_entrega.set("Todas")
+
+    def _aplicar_snapshot(self, snapshot, inicio):
+        """Vuelca en los paneles un snapshot leído por `_leer_snapshot`."""
+        tiempos = {
+            'bd': snapshot['tiempo_bd'],
+            'espera': (time.perf_counter() - inicio) * 1000 - snapshot['tiempo_bd'],
+        }
+
+        self._lista_virtual = snapshot['virtual']
+        self._total_pedidos = snapshot['cantidad']
+        self._posicion = snapshot['posicion']
+        self._cambio_visto = snapshot['cambio']
+        self._version_datos = snapshot['version']
+        paneles = (
+            ('lista', lambda: self.actualizar_lista_pedidos(snapshot['pedidos'])),
+            ('produccion', lambda: self.actualizar_resumen_produccion(snapshot['produccion'])),
+            ('total', lambda: self.actualizar_total_recaudado(snapshot['total'])),
+            ('por_dia', lambda: self.actualizar_resumen_por_dia(snapshot['por_dia'])),
+        )
+        for nombre, actualizar in paneles:
+            inicio_panel = time.perf_counter()
+            actualizar()
+            tiempos[nombre] = (time.perf_counter() - inicio_panel) * 1000
+        tiempos['interfaz'] = sum(tiempos[nombre] for nombre, _ in paneles)
+
+        self.tiempos_refresco = tiempos
+        self._mostrar_estado(
+            f"Actualizado en {tiempos['bd'] + tiempos['espera'] + tiempos['interfaz']:.1f} ms "
+            f"(BD {tiempos['bd']:.1f} ms, espera {tiempos['espera']:.1f} ms, interfaz {tiempos['interfaz']:.1f} ms)"
+        )
+        self._fin_refresco()
+
+    def _fin_refresco(self, error=None):
+        """Cierra un ciclo de actualización y lanza el agrupado, si lo hay."""
+        self._refrescando = False
+        if self._refresco_pendiente:
+            self._refresco_pendiente = False
+            self.actualizar_todo()
+
+    @classmethod
+    def _leer_snapshot(cls, db_manager, tamano_ventana, posicion, claves, filtro=None):
+        """Lee todo lo que necesita un ciclo de actualización. Corre en el hilo de la BD.
+
+        Con más de LISTA_VIRTUAL_UMBRAL pedidos solo se lee la ventana de la
+        lista que empieza en `posicion`, cuyas claves actuales son `claves`.
+        La lista se limita a los pedidos que cumplen `filtro`; los resúmenes no.
+        """
+        inicio = time.perf_counter()
+        # Antes que los datos: un cambio de otro terminal durante la lectura se vuelve a aplicar
+        version = db_manager.version_datos()
+        cambio = db_manager.ultimo_cambio()
+        cantidad = db_manager.contar_pedidos(filtro)
+        virtual = cantidad > LISTA_VIRTUAL_UMBRAL
+        posicion_leida = 0
+        if virtual:
+            pedidos = cls._leer_ventana(db_manager, posicion, tamano_ventana, posicion, claves, filtro)
+            if not pedidos and cantidad:
+                pedidos = db_manager.cargar_pedidos_desde(cantidad - tamano_ventana, tamano_ventana, filtro)
+            if pedidos:
+                posicion_leida = db_manager.posicion_pedido(pedidos[0].clave, filtro)
+        else:
+            pedidos = db_manager.cargar_pedidos(filtro)
+            cantidad = len(pedidos)
+        # El texto de las filas se arma aquí, fuera del hilo de Tk
+        preparar_valores(pedidos)
+        snapshot = {
+            'pedidos': pedidos,
+            'virtual': virtual,
+            'cantidad': cantidad,
+            'posicion': posicion_leida,
+            'cambio': cambio,
+            'version': version,
+        }
+        snapshot.update(cls._leer_resumenes(db_manager))
+        snapshot['tiempo_bd'] = (time.perf_counter() - inicio) * 1000
+        return snapshot
+
+    def _revisar_cambios(self):
+        """Aplica los pedidos que cambiaron en otros terminales y vuelve a programarse.
+
+        Sin escrituras de otras conexiones la revisión solo lee PRAGMA
+        data_version en el hilo de la BD. No se revisa mientras hay otra
+        operación en curso: su resultado ya trae los datos al día.
+        """
+        if self._tareas_pendientes or self._refrescando or self._cambio_visto is None:
+            self.root.after(CAMBIOS_INTERVALO_MS, self._revisar_cambios)
+            return
+        lanzadas = self._tareas_lanzadas
+        future = self.servicio_bd.enviar(self._leer_cambios, self._cambio_visto, self._version_datos)
+
+        def aplicar(cambios):
+            self._error_cambios = False
+            self.root.after(CAMBIOS_INTERVALO_MS, self._revisar_cambios)
+            # Si mientras tanto empezó otra operación, sus datos pueden ser más nuevos;
+            # estos cambios se vuelven a leer en la próxima revisión
+            if cambios is None or lanzadas != self._tareas_lanzadas:
+                return
+            if cambios['completo']:
+                self.actualizar_todo()
+                return
+            self._cambio_visto = cambios['ultimo']
+            self._version_datos = cambios['version']
+            if cambios['pedido_ids']:
+                self.aplicar_cambios_lista(cambios['pedidos'], cambios['eliminados'], cambios['resumenes'])
+                self._mostrar_estado(f"{len(cambios['pedido_ids'])} pedido(s) cambiados en otro terminal")
+            else:
+                self.actualizar_resumenes(cambios['resumenes'])
+
+        def fallo(error):
+            # La revisión sigue; el error se muestra una vez hasta que vuelva a funcionar
+            print(f"No se pudieron leer los cambios de otros terminales: {error}")
+            self._error_cambios = True
+            self.root.after(CAMBIOS_INTERVALO_MS, self._revisar_cambios)
 
-    def actualizar_lista_pedidos(self):
-        """Actualiza la lista de pedidos en el Treeview."""
-        for item in self.tree_pedidos.get_children():
-            self.tree_pedidos.delete(item)
+        al_terminar(self.root, future, aplicar,
+                    None if self._error_cambios else "No se pudieron leer los cambios de otros terminales",
+                    fallo=fallo)
 
+    def _avanzar_cambio_visto(self):
+        """Tras una operación propia, da por vistos sus cambios si ningún otro terminal escribió.
+
+        Así la próxima revisión no vuelve a leer los pedidos que esta
+        ventana acaba de guardar y ya muestra.
+        """
+        if self._cambio_visto is None:
+            return
+        version = self._version_datos
+        future = self.servicio_bd.enviar(self._leer_cambio_propio, version)
+
+        def aplicar(ultimo):
+            if ultimo is not None and version == self._version_datos and ultimo > self._cambio_visto:
+                self._cambio_visto = ultimo
+
+        al_terminar(self.root, future, aplicar, None)
+
+    @staticmethod
+    def _leer_cambio_propio(db_manager, version):
+        """Último cambio, o None si otra conexión escribió desde `version`. Corre en el hilo de la BD."""
+        if db_manager.version_datos() != version:
+            return None
+        return db_manager.ultimo_cambio()
+
+    @classmethod
+    def _leer_cambios(cls, db_manager, desde, version):
+        """Lee los pedidos cambiados después de `desde` y los resúmenes. Corre en el hilo de la BD.
+
+        Devuelve None si ninguna otra conexión escribió desde `version`.
+        """
+        cambios = db_manager.cambios_desde(desde, version)
+        if cambios is None or cambios['completo']:
+            return cambios
+        pedidos = preparar_valores(db_manager.obtener_pedidos(cambios['pedido_ids']))
+        existentes = {pedido.id for pedido in pedidos}
+        cambios['pedidos'] = pedidos
+        cambios['eliminados'] = [pedido_id for pedido_id in cambios['pedido_ids'] if pedido_id not in existentes]
+        cambios['resumenes'] = cls._leer_resumenes(db_manager)
+        return cambios
+
+    @staticmethod
+    def _leer_resumenes(db_manager):
+        """Lee los tres resúmenes. Corre en el hilo de la BD."""
+        return {
+            'produccion': db_manager.resumen_produccion(),
+            'por_dia': db_manager.resumen_por_dia(),
+            'total': db_manager.total_recaudado(),
+        }
+
+    def actualizar_lista_pedidos(self, pedidos):
+        """Sincroniza el Treeview con la lista de pedidos.
+
+        Solo inserta, modifica o quita las filas que cambiaron, así se
+        conservan la selección y la posición del scroll.
+        """
         try:
-            pedidos = self.db_manager.cargar_pedidos()
+            nuevos_ids = {str(pedido.id) for pedido in pedidos}
+            quitar = [iid for iid in self._filas_pedidos if iid not in nuevos_ids]
+            if quitar:
+                self.tree_pedidos.delete(*quitar)
+                for iid in quitar:
+                    del self._filas_pedidos[iid]
+
+            orden = []
             for pedido in pedidos:
-                items = pedido.get('items', [])
-                sabor_display = '??'
-                cantidad_total = 0
-                if items:
-                    if len(items) == 1:
-                        sabor_display = items[0].get('sabor', '??')
-                        cantidad_total = items[0].get('cantidad', 0)
-                    else:
-                        sabor_display = "Múltiple"
-                        cantidad_total = sum(item.get('cantidad', 0) for item in items)
-
-                pago_status = pedido.get('pago', 0)
-                pago_display = "Sí" if pago_status == 1 else "No"
-
-                self.tree_pedidos.insert(
-                    '', 'end', iid=pedido['id'],
-                    values=(
-                        pedido.get('dia', ''),
-                        pedido.get('nombre', ''),
-                        sabor_display,
-                        cantidad_total if cantidad_total > 0 else '??',
-                        f"${pedido.get('precio_pedido', 0.0):.2f}",
-                        f"${pedido.get('precio_envio', 0.0):.2f}",
-                        pedido.get('direccion', ''),
-                        pedido.get('horario', ''),
-                        pago_display
-                    )
-                )
+                iid = str(pedido.id)
+                valores = pedido.valores
+                anterior = self._filas_pedidos.get(iid)
+                if anterior is None:
+                    self.tree_pedidos.insert('', 'end', iid=iid, values=valores)
+                elif anterior != valores:
+                    self.tree_pedidos.item(iid, values=valores)
+                self._filas_pedidos[iid] = valores
+                orden.append(iid)
+
+            if list(self.tree_pedidos.get_children()) != orden:
+                for index, iid in enumerate(orden):
+                    self.tree_pedidos.move(iid, '', index)
+            self._orden_pedidos = [pedido.clave for pedido in pedidos]
         except Exception as e:
             messagebox.showerror("Error", f"No se pudieron cargar los pedidos: {e}")
 
-    def actualizar_resumen_produccion(self):
-        """Actualiza el resumen de producción."""
-        try:
-            pedidos = self.db_manager.cargar_pedidos()
-            produccion = defaultdict(int)
-            cantidad_total_produccion = 0
+    def _actualizar_fila_pedido(self, pedido):
+        """Inserta o actualiza la fila de un único pedido en su posición."""
+        iid = str(pedido.id)
+        valores = pedido.valores
+        clave = pedido.clave
+        if iid in self._filas_pedidos:
+            index = bisect.bisect_left(self._orden_pedidos, clave)
+            if index < len(self._orden_pedidos) and self._orden_pedidos[index] == clave:
+                # Misma posición: basta con cambiar los valores
+                if self._filas_pedidos[iid] != valores:
+                    self.tree_pedidos.item(iid, values=valores)
+                    self._filas_pedidos[iid] = valores
+                return
+            self._quitar_filas_pedidos([pedido.id])
 
-            for pedido in pedidos:
-                for item in pedido.get('items', []):
-                    if item.get('sabor') and item.get('cantidad'):
-                        cantidad = item['cantidad']
-                        produccion[item['sabor']] += cantidad
-                        cantidad_total_produccion += cantidad
+        index = bisect.bisect_left(self._orden_pedidos, clave)
+        self._orden_pedidos.insert(index, clave)
+        self.tree_pedidos.insert('', index, iid=iid, values=valores)
+        self._filas_pedidos[iid] = valores
 
+    def _quitar_filas_pedidos(self, pedido_ids):
+        """Quita del Treeview las filas de los pedidos indicados."""
+        quitar = {str(pedido_id) for pedido_id in pedido_ids} & self._filas_pedidos.keys()
+        if not quitar:
+            return
+        self.tree_pedidos.delete(*quitar)
+        for iid in quitar:
+            del self._filas_pedidos[iid]
+        self._orden_pedidos = [clave for clave in self._orden_pedidos if str(clave[-1]) not in quitar]
+
+    def actualizar_resumenes(self, resumenes):
+        """Actualiza solo los paneles de resumen, sin tocar la lista."""
+        self.actualizar_resumen_produccion(resumenes['produccion'])
+        self.actualizar_total_recaudado(resumenes['total'])
+        self.actualizar_resumen_por_dia(resumenes['por_dia'])
+
+    def _mostrar_estado(self, texto):
+        """Muestra en la barra de estado el número de pedidos y un texto."""
+        filtrados = " filtrados" if self._filtro else ""
+        self.label_estado.config(text=f"{self._total_pedidos} pedidos{filtrados} | {texto}")
+
+    def aplicar_cambios_lista(self, actualizados=(), eliminados=(), resumenes=None):
+        """Aplica a la lista los pedidos modificados y los ids eliminados.
+
+        En modo virtual, o con un filtro activo (el pedido podría dejar de
+        cumplirlo), se relee la ventana visible junto con los resúmenes; si
+        no, se tocan solo las filas afectadas.
+        """
+        if self._lista_virtual or self._filtro:
+            self.actualizar_todo()
+            return
+        inicio = time.perf_counter()
+        self._quitar_filas_pedidos(eliminados)
+        for pedido in actualizados:
+            self._actualizar_fila_pedido(pedido)
+        self._total_pedidos = len(self._filas_pedidos)
+        if resumenes is not None:
+            self.actualizar_resumenes(resumenes)
+        self._mostrar_estado(f"Cambio aplicado en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    def _tamano_ventana(self):
+        """Filas que se cargan en modo virtual: las visibles más dos márgenes."""
+        return int(self.tree_pedidos.cget('height')) + 2 * LISTA_VIRTUAL_MARGEN
+
+    @staticmethod
+    def _leer_ventana(db_manager, inicio, tamano, posicion, claves, filtro=None):
+        """Lee los pedidos [inicio, inicio + tamano) de la lista (filtrada).
+
+        `posicion` y `claves` describen la ventana mostrada. Si la pedida se
+        solapa con ella se pagina por clave a partir de sus filas; para
+        saltos lejanos se usa la posición absoluta. Corre en el hilo de la BD,
+        donde también se arma el texto de las filas.
+        """
+        fin_actual = posicion + len(claves)
+        if claves and posicion <= inicio < fin_actual:
+            clave = claves[inicio - posicion]
+            return preparar_valores(
+                db_manager.cargar_pagina_pedidos(despues_de=clave, limite=tamano, incluir=True, filtro=filtro))
+        if claves and inicio < posicion <= inicio + tamano:
+            primera = claves[0]
+            anteriores = db_manager.cargar_pagina_pedidos(antes_de=primera, limite=posicion - inicio, filtro=filtro)
+            return preparar_valores(anteriores + db_manager.cargar_pagina_pedidos(
+                despues_de=primera, limite=tamano - len(anteriores), incluir=True, filtro=filtro))
+        return preparar_valores(db_manager.cargar_pedidos_desde(inicio, tamano, filtro))
+
+    def _fila_superior(self):
+        """Posición en la lista completa de la primera fila visible."""
+        primero, _ = self.tree_pedidos.yview()
+        return self._posicion + int(round(primero * len(self._orden_pedidos)))
+
+    def _mover_ventana(self, arriba):
+        """Carga la ventana para que la fila `arriba` quede primera a la vista.
+
+        Mientras se lee una ventana solo se recuerda el último destino pedido.
+        """
+        if self._ventana_cargando:
+            self._ventana_destino = arriba
+            return
+        visibles = int(self.tree_pedidos.cget('height'))
+        arriba = max(0, min(arriba, self._total_pedidos - visibles))
+        inicio = max(0, arriba - LISTA_VIRTUAL_MARGEN)
+        self._ventana_cargando = True
+        future = self.servicio_bd.enviar(
+            self._leer_ventana, inicio, self._tamano_ventana(), self._posicion, list(self._orden_pedidos),
+            dict(self._filtro))
+
+        def aplicar(pedidos):
+            self._ventana_cargando = False
+            self._posicion = inicio
+            self.actualizar_lista_pedidos(pedidos)
+            if pedidos:
+                self.tree_pedidos.yview_moveto((arriba - inicio) / len(pedidos))
+            if self._ventana_destino is not None:
+                destino, self._ventana_destino = self._ventana_destino, None
+                self._mover_ventana(destino)
+
+        def fallo(error):
+            self._ventana_cargando = False
+            self._ventana_destino = None
+
+        self._tarea(future, aplicar, "No se pudieron cargar los pedidos", fallo)
+
+    def _desplazar_lista(self, *args):
+        """Comando de la barra vertical; en modo virtual los saltos van a la BD."""
+        if self._lista_virtual and args and args[0] == 'moveto':
+            self._mover_ventana(int(float(args[1]) * self._total_pedidos))
+        else:
+            self.tree_pedidos.yview(*args)
+
+    def _on_scroll_lista(self, primero, ultimo):
+        """yscrollcommand de tree_pedidos.
+
+        En modo virtual traduce la vista de la ventana a la lista completa y
+        pide la ventana siguiente cuando la vista se acerca a un borde.
+        """
+        filas = len(self._orden_pedidos)
+        if not self._lista_virtual or not filas or not self._total_pedidos:
+            self.scrollbar_y.set(primero, ultimo)
+            return
+        arriba = float(primero) * filas
+        abajo = float(ultimo) * filas
+        self.scrollbar_y.set((self._posicion + arriba) / self._total_pedidos,
+                             (self._posicion + abajo) / self._total_pedidos)
+
+        margen = LISTA_VIRTUAL_MARGEN // 2
+        cerca_inicio = arriba < margen and self._posicion > 0
+        cerca_fin = abajo > filas - margen and self._posicion + filas < self._total_pedidos
+        if (cerca_inicio or cerca_fin) and not self._ventana_pendiente:
+            # Fuera del callback: cambiar filas aquí volvería a llamarlo
+            self._ventana_pendiente = True
+            self.root.after_idle(self._recentrar_ventana)
+
+    def _recentrar_ventana(self):
+        """Centra la ventana cargada alrededor de la vista actual."""
+        self._ventana_pendiente = False
+        self._mover_ventana(self._fila_superior())
+
+    def actualizar_resumen_produccion(self, produccion):
+        """Actualiza el resumen de producción a partir de [(sabor, cantidad)]."""
+        try:
             resumen_texto = "Resumen General de Producción:\n"
             if not produccion:
                 resumen_texto += "(No hay pedidos registrados)"
             else:
-                items_resumen = [f"- {cantidad} de {sabor}" for sabor, cantidad in sorted(produccion.items())]
+                items_resumen = [f"- {cantidad} de {sabor}" for sabor, cantidad in produccion]
                 resumen_texto += "\n".join(items_resumen)
+                cantidad_total_produccion = sum(cantidad for _, cantidad in produccion)
                 resumen_texto += f"\n--------------------\nTotal Cookies a Producir: {cantidad_total_produccion}"
 
             self.label_resumen_produccion.config(text=resumen_texto)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo actualizar el resumen: {e}")
 
-    def actualizar_resumen_por_dia(self):
-        """Actualiza el resumen de producción por día."""
+    def actualizar_resumen_por_dia(self, por_dia):
+        """Actualiza el resumen de producción por día a partir de [(dia, sabor, cantidad)]."""
         try:
-            pedidos = self.db_manager.cargar_pedidos()
-            produccion_por_dia = defaultdict(lambda: defaultdict(int))
-
-            for pedido in pedidos:
-                dia = pedido.get('dia', 'Sin Día')
-                for item in pedido.get('items', []):
-                    if item.get('sabor') and item.get('cantidad'):
-                        produccion_por_dia[dia][item['sabor']] += item['cantidad']
-
             resumen_texto = "Resumen de Producción por Día:\n\n"
-            if not produccion_por_dia:
+            if not por_dia:
                 resumen_texto += "(No hay pedidos registrados)"
             else:
-                for dia in sorted(produccion_por_dia.keys()):
+                for dia, filas_dia in groupby(por_dia, key=itemgetter(0)):
                     resumen_texto += f"--- Día: {dia} ---\n"
-                    items_dia = produccion_por_dia[dia]
                     total_dia = 0
-                    for sabor, cantidad in sorted(items_dia.items()):
+                    for _, sabor, cantidad in filas_dia:
                         resumen_texto += f"  - {cantidad} de {sabor}\n"
                         total_dia += cantidad
                     resumen_texto += f"  Total del día: {total_dia}\n\n"
@@ -278,14 +797,9 @@ def actualizar_resumen_por_dia(self):
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo actualizar el resumen por día: {e}")
 
-    def actualizar_total_recaudado(self):
+    def actualizar_total_recaudado(self, total):
         """Actualiza el total recaudado."""
         try:
-            pedidos = self.db_manager.cargar_pedidos()
-            total = sum(
-                pedido.get('precio_pedido', 0.0) + pedido.get('precio_envio', 0.0)
-                for pedido in pedidos
-            )
             self.label_total_recaudado.config(text=f"Total Recaudado (General): ${total:.2f}")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo actualizar el total: {e}")
@@ -378,13 +892,23 @@ def agregar_pedido(self):
             if not messagebox.askyesno("Aviso", "Hay costo de envío pero no dirección. ¿Continuar?"):
                 return
 
-        try:
-            self.db_manager.agregar_pedido(dia, nombre, precio_pedido, precio_envio, direccion, horario, self.items_pedido_actual)
+        def registrado(resultado):
+            pedido, resumenes = resultado
+            self.aplicar_cambios_lista(actualizados=[pedido], resumenes=resumenes)
             messagebox.showinfo("Éxito", "Pedido registrado correctamente.")
             self.limpiar_campos_entrada()
-            self.actualizar_todo()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo guardar el pedido: {e}")
+
+        future = self.servicio_bd.escribir(
+            self._agregar_y_leer, dia, nombre, precio_pedido, precio_envio, direccion, horario,
+            list(self.items_pedido_actual)
+        )
+        self._tarea(future, registrado, "No se pudo guardar el pedido")
+
+    @classmethod
+    def _agregar_y_leer(cls, db_manager, *datos_pedido):
+        """Guarda un pedido y lo devuelve junto con los resúmenes. Corre en el hilo de la BD."""
+        pedido_id = db_manager.agregar_pedido(*datos_pedido)
+        return db_manager.obtener_pedido(pedido_id), cls._leer_resumenes(db_manager)
 
     def eliminar_pedido(self):
         """Elimina los pedidos seleccionados."""
@@ -394,19 +918,77 @@ def eliminar_pedido(self):
             return
 
         if messagebox.askyesno("Confirmar Eliminación", "¿Eliminar los pedidos seleccionados?"):
-            try:
-                ids_a_eliminar = [int(iid) for iid in seleccionados]
-                count = 0
-                for pedido_id in ids_a_eliminar:
-                    if self.db_manager.eliminar_pedido(pedido_id):
-                        count += 1
+            def eliminados(resultado):
+                ids_eliminados, resumenes = resultado
+                count = len(ids_eliminados)
+                self.aplicar_cambios_lista(eliminados=ids_eliminados, resumenes=resumenes)
                 if count > 0:
                     messagebox.showinfo("Eliminado", f"{count} Pedido(s) eliminado(s).")
-                    self.actualizar_todo()
                 else:
                     messagebox.showwarning("Sin Cambios", "No se encontraron los pedidos.")
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo eliminar: {e}")
+
+            ids_a_eliminar = [int(iid) for iid in seleccionados]
+            future = self.servicio_bd.escribir(self._eliminar_y_leer, ids_a_eliminar)
+            self._tarea(future, eliminados, "No se pudo eliminar")
+
+    @classmethod
+    def _eliminar_y_leer(cls, db_manager, ids_a_eliminar):
+        """Elimina pedidos y devuelve los ids borrados y los resúmenes. Corre en el hilo de la BD."""
+        return db_manager.eliminar_pedidos(ids_a_eliminar), cls._leer_resumenes(db_manager)
+
+    def _abrir_menu_pedidos(self, event):
+        """Muestra el menú contextual; si se hace clic fuera de la selección, selecciona esa fila."""
+        iid = self.tree_pedidos.identify_row(event.y)
+        if iid and iid not in self.tree_pedidos.selection():
+            self.tree_pedidos.selection_set(iid)
+        if self.tree_pedidos.selection():
+            self.menu_pedidos.tk_popup(event.x_root, event.y_root)
+
+    def _ids_seleccionados(self):
+        """Ids de los pedidos seleccionados en la lista."""
+        return [int(iid) for iid in self.tree_pedidos.selection()]
+
+    def marcar_pagados(self, estado):
+        """Pone el estado de pago de todos los pedidos seleccionados en una transacción."""
+        ids = self._ids_seleccionados()
+        if not ids:
+            messagebox.showwarning("Selección Vacía", "Seleccione los pedidos a marcar.")
+            return
+
+        def marcados(cambiados):
+            if 'pago' in self._filtro:
+                self.actualizar_todo()
+            for pedido_id in cambiados:
+                self._mostrar_pago(pedido_id, estado)
+            self._mostrar_estado(f"{len(cambiados)} pedido(s) marcado(s) como {'pagados' if estado else 'no pagados'}")
+
+        self._tarea(self.servicio_bd.marcar_pagados(ids, estado), marcados,
+                    "No se pudo actualizar el estado de pago")
+
+    def mover_dia(self):
+        """Pasa los pedidos seleccionados a otro día de entrega."""
+        ids = self._ids_seleccionados()
+        if not ids:
+            messagebox.showwarning("Selección Vacía", "Seleccione los pedidos a mover.")
+            return
+        nuevo_dia = simpledialog.askstring("Mover de Día", f"Nuevo día de entrega para {len(ids)} pedido(s):",
+                                           parent=self.root)
+        if not nuevo_dia or not nuevo_dia.strip():
+            return
+
+        def movidos(resultado):
+            pedidos, resumenes = resultado
+            self.aplicar_cambios_lista(actualizados=pedidos, resumenes=resumenes)
+            self._mostrar_estado(f"{len(pedidos)} pedido(s) movido(s) a {nuevo_dia.strip()}")
+
+        future = self.servicio_bd.escribir(self._mover_y_leer, ids, nuevo_dia.strip())
+        self._tarea(future, movidos, "No se pudieron mover los pedidos")
+
+    @classmethod
+    def _mover_y_leer(cls, db_manager, pedido_ids, nuevo_dia):
+        """Mueve pedidos de día y devuelve los que cambiaron y los resúmenes. Corre en el hilo de la BD."""
+        movidos = db_manager.mover_dia(pedido_ids, nuevo_dia)
+        return db_manager.obtener_pedidos(movidos), cls._leer_resumenes(db_manager)
 
     def editar_pedido(self):
         """Abre la ventana de edición de pedido."""
@@ -416,16 +998,16 @@ def editar_pedido(self):
             return
 
         pedido_id = int(seleccionados[0])
-        try:
-            pedido = self.db_manager.obtener_pedido(pedido_id)
+
+        def abrir(pedido):
             if not pedido:
                 messagebox.showerror("Error", f"No se encontró el pedido ID {pedido_id}.")
                 return
+            edit_window = EditWindow(self.root, self.servicio_bd, pedido, self.pedido_actualizado)
+            edit_window.win.grab_set()
 
-            edit_window = EditWindow(self.root, self.db_manager, pedido, self.actualizar_todo)
-            edit_window.grab_set()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo cargar el pedido para editar: {e}")
+        self._tarea(self.servicio_bd.obtener_pedido(pedido_id), abrir,
+                    "No se pudo cargar el pedido para editar")
 
     def toggle_pago_status(self, event):
         """Cambia el estado de pago del pedido seleccionado con doble clic."""
@@ -434,8 +1016,113 @@ def toggle_pago_status(self, event):
             return
 
         pedido_id = int(selected_items[0])
-        try:
-            self.db_manager.toggle_pago_pedido(pedido_id)
-            self.actualizar_lista_pedidos()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo actualizar el estado de pago: {e}") 
\ No newline at end of file
+
+        def cambiado(nuevo_estado):
+            if 'pago' in self._filtro:
+                self.actualizar_todo()
+            else:
+                self._mostrar_pago(pedido_id, nuevo_estado)
+
+        self._tarea(self.servicio_bd.toggle_pago_pedido(pedido_id), cambiado,
+                    "No se pudo actualizar el estado de pago")
+
+    def _mostrar_pago(self, pedido_id, estado):
+        """Cambia solo la columna 'Pagó?' de la fila del pedido, si está en la lista."""
+        iid = str(pedido_id)
+        if iid in self._filas_pedidos:
+            valores = self._filas_pedidos[iid][:-1] + ("Sí" if estado == 1 else "No",)
+            self.tree_pedidos.item(iid, values=valores)
+            self._filas_pedidos[iid] = valores
+
+    def pedido_actualizado(self, pedido_id, cambios=None):
+        """Refleja en la interfaz el alta o la edición de un único pedido.
+
+        Con el resumen de cambios de `actualizar_pedido` no se relee nada si
+        no hubo cambios, ni los resúmenes si producción y recaudación siguen igual.
+        """
+        if cambios is not None and not cambios['modificado']:
+            self._mostrar_estado(f"Pedido #{pedido_id} sin cambios")
+            return
+        leer_resumenes = cambios is None or cambios['resumenes']
+
+        def aplicar(resultado):
+            pedido, resumenes = resultado
+            if pedido:
+                self.aplicar_cambios_lista(actualizados=[pedido], resumenes=resumenes)
+            else:
+                self.aplicar_cambios_lista(eliminados=[pedido_id], resumenes=resumenes)
+
+        future = self.servicio_bd.enviar(
+            lambda db_manager: (db_manager.obtener_pedido(pedido_id),
+                                self._leer_resumenes(db_manager) if leer_resumenes else None))
+        self._tarea(future, aplicar, "No se pudo cargar el pedido")
+
+    def importar_pedidos(self):
+        """Importa pedidos desde un archivo CSV o JSON lines."""
+        ruta = filedialog.askopenfilename(
+            title="Importar pedidos",
+            filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl *.json *.ndjson"), ("Todos", "*.*")]
+        )
+        if not ruta:
+            return
+
+        def importado(resultado):
+            self.actualizar_todo()
+            mensaje = f"{resultado['importados']} pedido(s) importado(s) en {resultado['segundos']:.1f} s."
+            errores = resultado['errores']
+            if not errores:
+                messagebox.showinfo("Importación", mensaje)
+                return
+            detalle = "\n".join(f"Línea {linea}: {error}" for linea, error in errores[:20])
+            if len(errores) > 20:
+                detalle += f"\n... y {len(errores) - 20} más"
+            messagebox.showwarning("Importación", f"{mensaje}\n\n{len(errores)} fila(s) con errores:\n{detalle}")
+
+        self._tarea(self.servicio_bd.enviar(importar_archivo, ruta), importado, "No se pudo importar el archivo")
+
+    def exportar(self, tipo, historico=False):
+        """Exporta pedidos, producción o entregas a un archivo CSV o JSON lines (con `historico`, y los archivados)."""
+        dia = None
+        if tipo == 'entregas':
+            dia = simpledialog.askstring("Exportar entregas", "Día de entrega:", parent=self.root)
+            if not dia or not dia.strip():
+                return
+            dia = dia.strip()
+        ruta = filedialog.asksaveasfilename(
+            title="Exportar", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl")]
+        )
+        if not ruta:
+            return
+
+        self._tarea(
+            self.servicio_bd.enviar(exportar, tipo, ruta, dia, historico),
+            lambda total: messagebox.showinfo("Exportación", f"{total} fila(s) exportada(s) a {ruta}."),
+            "No se pudo exportar"
+        )
+
+    def archivar_dias(self):
+        """Pasa al archivo los pedidos de los días ya entregados y compacta la base."""
+        dias = simpledialog.askstring("Archivar días cerrados", "Días de entrega a archivar (separados por coma):",
+                                      parent=self.root)
+        if not dias or not dias.strip():
+            return
+        dias = [dia.strip() for dia in dias.split(',') if dia.strip()]
+        antes_de = simpledialog.askstring(
+            "Archivar días cerrados", "Solo los registrados antes de (AAAA-MM-DD; vacío para todos):",
+            parent=self.root)
+        if antes_de is None:
+            return
+        antes_de = antes_de.strip() or None
+        if not messagebox.askyesno("Confirmar Archivo", f"¿Pasar al archivo los pedidos de {', '.join(dias)}"
+                                   f"{f' registrados antes de {antes_de}' if antes_de else ''}?"):
+            return
+
+        def archivados(resultado):
+            self.actualizar_todo()
+            messagebox.showinfo(
+                "Archivo", f"{resultado['archivados']} pedido(s) archivado(s). Base: "
+                           f"{resultado['bytes_antes'] / 1e6:.1f} MB -> {resultado['bytes_despues'] / 1e6:.1f} MB.")
+
+        self._tarea(self.servicio_bd.ejecutar('archivar_pedidos', dias, antes_de), archivados,
+                    "No se pudieron archivar los pedidos")
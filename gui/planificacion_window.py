@@ -0,0 +1,106 @@
+import tkinter as tk
+from datetime import date
+from tkinter import ttk, messagebox
+from config.settings import PLANIFICACION_DIAS, PLANIFICACION_VENTANA, PLANIFICACION_TANDAS_POR_DIA
+from database.planificacion import planificar
+from utils.fechas import NOMBRES_DIAS
+from utils.validators import validar_numero
+from .tareas import al_terminar
+
+class PlanificacionWindow:
+    """Panel de planificación: cookies, totales móviles, tandas y horneado por fecha y sabor."""
+
+    COLUMNAS = {
+        'cantidades': ('Cookies', 80, tk.E),
+        'acumulado': ('Próximos días', 100, tk.E),
+        'tandas': ('Tandas', 70, tk.E),
+        'horneado': ('Hornear', 70, tk.E),
+    }
+
+    def __init__(self, parent, servicio_bd):
+        self.parent = parent
+        self.servicio_bd = servicio_bd
+
+        self.win = tk.Toplevel(parent)
+        self.win.title("Planificación de producción")
+
+        frame = ttk.Frame(self.win, padding="10")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        opciones = ttk.Frame(frame)
+        opciones.pack(fill=tk.X, pady=(0, 5))
+        self.var_desde = tk.StringVar(value=date.today().isoformat())
+        self.var_dias = tk.StringVar(value=str(PLANIFICACION_DIAS))
+        self.var_ventana = tk.StringVar(value=str(PLANIFICACION_VENTANA))
+        self.var_tandas = tk.StringVar(value=str(PLANIFICACION_TANDAS_POR_DIA))
+        ttk.Label(opciones, text="Desde:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Entry(opciones, textvariable=self.var_desde, width=11).pack(side=tk.LEFT)
+        for texto, variable, maximo in (("Días:", self.var_dias, 366), ("Ventana:", self.var_ventana, 31),
+                                        ("Tandas por día:", self.var_tandas, 1000)):
+            ttk.Label(opciones, text=texto).pack(side=tk.LEFT, padx=(10, 5))
+            ttk.Spinbox(opciones, textvariable=variable, from_=1, to=maximo, width=5).pack(side=tk.LEFT)
+
+        # Una fila por fecha con los totales y, debajo, una por sabor
+        self.tree = ttk.Treeview(frame, columns=tuple(self.COLUMNAS), height=20)
+        self.tree.heading('#0', text='Fecha / sabor')
+        self.tree.column('#0', width=200)
+        for col, (heading, width, anchor) in self.COLUMNAS.items():
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, width=width, anchor=anchor)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.label_info = ttk.Label(frame, text="", justify=tk.LEFT)
+        self.label_info.pack(pady=5, anchor=tk.W)
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Calcular", command=self.actualizar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Cerrar", command=self.win.destroy).pack(side=tk.LEFT, padx=5)
+
+        self.actualizar()
+
+    def actualizar(self):
+        """Calcula el plan en el hilo de la BD con las opciones de la ventana y lo muestra."""
+        valores = [validar_numero(variable.get(), tipo='int', permitir_cero=False)
+                   for variable in (self.var_dias, self.var_ventana, self.var_tandas)]
+        if any(valor is None or valor < 1 for valor in valores):
+            messagebox.showerror("Error", "Días, ventana y tandas por día deben ser enteros positivos.",
+                                 parent=self.win)
+            return
+        dias, ventana, tandas_por_dia = valores
+        self.tree.heading('acumulado', text=f"Próximos {ventana} días")
+
+        def mostrar(plan):
+            if self.win.winfo_exists():
+                self._mostrar_plan(plan)
+
+        al_terminar(self.parent, self.servicio_bd.enviar(planificar, self.var_desde.get(), dias, ventana,
+                                                         tandas_por_dia),
+                    mostrar, "No se pudo calcular la planificación", parent=self.win)
+
+    def _mostrar_plan(self, plan):
+        """Vuelca en el árbol un plan de `planificar`."""
+        self.tree.delete(*self.tree.get_children())
+        cantidades = plan['cantidades']
+        matrices = [plan[nombre].filas() for nombre in self.COLUMNAS]
+        for numero, fecha in enumerate(cantidades.fechas):
+            filas = [matriz[numero] for matriz in matrices]
+            nombre_dia = NOMBRES_DIAS[date.fromisoformat(fecha).weekday()]
+            padre = self.tree.insert('', 'end', text=f"{fecha} {nombre_dia}",
+                                     values=[sum(fila) for fila in filas], open=bool(sum(filas[0])))
+            for columna, sabor in enumerate(cantidades.sabores):
+                valores = [fila[columna] for fila in filas]
+                if any(valores):
+                    self.tree.insert(padre, 'end', text=sabor, values=valores)
+
+        lineas = [f"Calculado en {plan['ms_calculo']:.1f} ms ({'NumPy' if plan['numpy'] else 'arrays de Python'}), "
+                  f"lectura {plan['ms_bd']:.1f} ms."]
+        if plan['sin_fecha']:
+            lineas.append(f"{plan['sin_fecha']} cookies de pedidos con un día que no se entiende no entran en el plan.")
+        faltan = [f"{sabor}: {tandas}" for sabor, tandas in zip(cantidades.sabores, plan['sin_lugar']) if tandas]
+        if faltan:
+            lineas.append(f"Tandas que no entran en el horno a partir del {cantidades.fechas[0]}: {', '.join(faltan)}.")
+        self.label_info.config(text="\n".join(lineas))
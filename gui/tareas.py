@@ -0,0 +1,28 @@
+from tkinter import messagebox
+
+# Cada cuánto se revisa, desde el hilo de Tk, si terminó una operación de la BD
+INTERVALO_REVISION_MS = 15
+
+def al_terminar(widget, future, exito, mensaje_error, parent=None, fallo=None):
+    """Entrega el resultado de `future` en el hilo de Tk.
+
+    Revisa el future con `widget.after` (Tk no admite llamadas desde otros
+    hilos) y llama a `exito(resultado)`. Si la operación falla muestra
+    `mensaje_error` (si no es None) y llama a `fallo(error)` si se indicó.
+    """
+    def revisar():
+        if not future.done():
+            widget.after(INTERVALO_REVISION_MS, revisar)
+            return
+        try:
+            resultado = future.result()
+        except Exception as e:
+            if mensaje_error is not None:
+                opciones = {'parent': parent} if parent is not None else {}
+                messagebox.showerror("Error", f"{mensaje_error}: {e}", **opciones)
+            if fallo:
+                fallo(e)
+            return
+        exito(resultado)
+
+    widget.after(INTERVALO_REVISION_MS, revisar)
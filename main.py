@@ -1,17 +1,86 @@
+import argparse
 import atexit
+import sys
 from database.db_manager import DatabaseManager
-from gui.main_window import MainWindow
+from database.exportador import exportar
+from database.importador import importar_archivo
+from database.servicio import ServicioBD
+
+def parse_args():
+    """Lee los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="SweetCookies - Gestión de Pedidos")
+    parser.add_argument('--verificar-resumenes', action='store_true',
+                        help="Compara las tablas de resumen con un recálculo completo y sale.")
+    parser.add_argument('--reconstruir-resumenes', action='store_true',
+                        help="Recalcula las tablas de resumen desde los pedidos y sale.")
+    parser.add_argument('--importar', metavar='ARCHIVO',
+                        help="Importa pedidos de un archivo CSV o JSON lines y sale.")
+    parser.add_argument('--exportar', nargs=2, metavar=('TIPO', 'ARCHIVO'),
+                        help="Exporta 'pedidos', 'produccion' o 'entregas' a CSV o JSON lines y sale.")
+    parser.add_argument('--dia', help="Día de entrega para --exportar.")
+    parser.add_argument('--historico', action='store_true',
+                        help="Con --exportar, incluye los pedidos archivados.")
+    parser.add_argument('--archivar', nargs='*', metavar='DIA',
+                        help="Pasa al archivo los pedidos de esos días de entrega (y/o de --antes-de), "
+                             "compacta la base y sale.")
+    parser.add_argument('--antes-de', metavar='AAAA-MM-DD',
+                        help="Con --archivar, solo los pedidos registrados antes de esa fecha.")
+    parser.add_argument('--informe-consultas', action='store_true',
+                        help="Al terminar, muestra p50/p95/p99 de cada operación de la base de datos.")
+    return parser.parse_args()
 
 def main():
-    # Inicializar el gestor de base de datos
-    db_manager = DatabaseManager()
-    
-    # Registrar el cierre de la base de datos al salir
-    atexit.register(db_manager.close)
-    
-    # Crear y ejecutar la ventana principal
-    app = MainWindow(db_manager)
-    app.run()
+    args = parse_args()
+
+    archivar = args.archivar is not None
+    if args.reconstruir_resumenes or args.verificar_resumenes or args.importar or args.exportar or archivar:
+        db_manager = DatabaseManager()
+        atexit.register(db_manager.close)
+        if args.informe_consultas and db_manager.instrumentacion:
+            # atexit ejecuta en orden inverso: el informe sale antes de cerrar
+            atexit.register(lambda: print(f"{db_manager.instrumentacion.informe()}\n{db_manager.informe_cache()}"))
+        if args.exportar:
+            tipo, ruta = args.exportar
+            total = exportar(db_manager, tipo, ruta, args.dia, args.historico)
+            print(f"{total} fila(s) exportada(s) a {ruta}.")
+            return
+        if archivar:
+            resultado = db_manager.archivar_pedidos(args.archivar, args.antes_de)
+            print(f"{resultado['archivados']} pedido(s) archivado(s) en {db_manager.db_archivo} "
+                  f"en {resultado['segundos']:.2f} s. Base: {resultado['bytes_antes'] / 1e6:.1f} MB -> "
+                  f"{resultado['bytes_despues'] / 1e6:.1f} MB.")
+            return
+        if args.importar:
+            resultado = importar_archivo(db_manager, args.importar)
+            for linea, error in resultado['errores']:
+                print(f"Línea {linea}: {error}")
+            print(f"{resultado['importados']} pedido(s) importado(s) en {resultado['segundos']:.2f} s, "
+                  f"{len(resultado['errores'])} fila(s) con errores.")
+            sys.exit(1 if resultado['errores'] else 0)
+        if args.reconstruir_resumenes:
+            db_manager.reconstruir_resumenes()
+            print("Resúmenes reconstruidos.")
+            return
+        diferencias = db_manager.verificar_resumenes()
+        for diferencia in diferencias:
+            print(diferencia)
+        print(f"{len(diferencias)} diferencia(s) encontrada(s).")
+        sys.exit(1 if diferencias else 0)
+
+    from gui.main_window import MainWindow
+
+    # La base de datos se usa desde su propio hilo para no bloquear la interfaz
+    servicio_bd = ServicioBD()
+
+    # Cerrar la base de datos al salir (no con atexit: el hilo ya no aceptaría tareas)
+    try:
+        # Crear y ejecutar la ventana principal
+        app = MainWindow(servicio_bd)
+        app.run()
+        if args.informe_consultas:
+            print(servicio_bd.informe_latencias().result())
+    finally:
+        servicio_bd.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
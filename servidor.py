@@ -0,0 +1,353 @@
+"""Servidor HTTP/JSON de pedidos, sin interfaz gráfica.
+
+Uso:
+    python servidor.py [--host 127.0.0.1] [--puerto 8080] [--db cookies_pedidos.db]
+
+Expone las operaciones de DatabaseManager como endpoints JSON para
+formularios web, bots u otros sistemas:
+
+    GET    /pedidos?texto=&dia=&sabor=&pago=&entrega_desde=&entrega_hasta=&desde=0&limite=50
+    GET    /pedidos/<id>
+    POST   /pedidos                 cuerpo con las claves de la importación
+    PUT    /pedidos/<id>            ídem; reemplaza el pedido
+    DELETE /pedidos/<id>
+    POST   /pedidos/<id>/pago       alterna el pago, o {"pago": 0|1}
+    GET    /resumen                 producción, producción por día y total
+    GET    /cambios?desde=N         pedidos cambiados después del cambio N
+    GET    /estado                  contadores de la cola, las escrituras y la caché
+
+Usa solo asyncio y la biblioteca estándar. Las lecturas y las escrituras
+van a dos conexiones, cada una en su hilo (ServicioBD). Las escrituras
+pasan por una ColaEscritura: las que llegan en unos ms, o mientras se
+guarda el grupo anterior, se guardan juntas con un solo commit (group
+commit), cada una con su resultado o su error. Las lecturas de resúmenes y de la lista
+salen de la caché de DatabaseManager mientras nadie escriba.
+"""
+import argparse
+import asyncio
+import json
+import re
+from datetime import date
+from urllib.parse import urlsplit, parse_qs
+
+from config.settings import (
+    DB_NAME, SERVIDOR_HOST, SERVIDOR_PUERTO, SERVIDOR_LOTE_MAXIMO, SERVIDOR_MAX_CUERPO, SERVIDOR_LIMITE_PAGINA,
+)
+from database.cola_escritura import ColaEscritura
+from database.importador import validar_pedido
+from database.servicio import ServicioBD
+
+MENSAJES_HTTP = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+}
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde al cliente con un código HTTP."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ServidorPedidos:
+    """Atiende las peticiones HTTP y las reparte entre la conexión de lectura y la cola de escritura."""
+
+    def __init__(self, db_name=DB_NAME, lote_maximo=SERVIDOR_LOTE_MAXIMO):
+        # La de escritura se abre primero: aplica las migraciones pendientes
+        self.escritura = ServicioBD(db_name)
+        self.lectura = ServicioBD(db_name)
+        self.cola = ColaEscritura(self.escritura, lote_maximo=lote_maximo)
+        self.estadisticas = {'peticiones': 0, 'errores': 0}
+        self.rutas = [
+            ('GET', re.compile(r'/pedidos'), self.listar_pedidos),
+            ('POST', re.compile(r'/pedidos'), self.agregar_pedido),
+            ('GET', re.compile(r'/pedidos/(\d+)'), self.obtener_pedido),
+            ('PUT', re.compile(r'/pedidos/(\d+)'), self.actualizar_pedido),
+            ('DELETE', re.compile(r'/pedidos/(\d+)'), self.eliminar_pedido),
+            ('POST', re.compile(r'/pedidos/(\d+)/pago'), self.cambiar_pago),
+            ('GET', re.compile(r'/resumen'), self.resumen),
+            ('GET', re.compile(r'/cambios'), self.cambios),
+            ('GET', re.compile(r'/estado'), self.estado),
+        ]
+
+    async def iniciar(self, host=SERVIDOR_HOST, puerto=SERVIDOR_PUERTO):
+        """Abre el puerto; devuelve el asyncio.Server."""
+        return await asyncio.start_server(self._atender, host, puerto)
+
+    def close(self):
+        """Guarda las escrituras encoladas y cierra las dos conexiones."""
+        self.cola.close()
+        self.lectura.close()
+        self.escritura.close()
+
+    # --- Lecturas y escrituras ---
+
+    async def leer(self, funcion, *args):
+        """Ejecuta funcion(db_manager, *args) en el hilo de lectura."""
+        return await asyncio.wrap_future(self.lectura.enviar(funcion, *args))
+
+    async def escribir(self, funcion, *args):
+        """Encola funcion(db_manager, *args) y espera a que su grupo se guarde."""
+        return await asyncio.wrap_future(self.cola.enviar(funcion, *args))
+
+    # --- Endpoints ---
+
+    async def listar_pedidos(self, consulta, cuerpo):
+        filtro = {
+            'texto': consulta.get('texto', '').strip(),
+            'dia': consulta.get('dia', '').strip(),
+            'sabor': consulta.get('sabor', '').strip().capitalize(),
+            'pago': _entero(consulta, 'pago', None),
+            'fecha_desde': _fecha(consulta, 'entrega_desde'),
+            'fecha_hasta': _fecha(consulta, 'entrega_hasta'),
+        }
+        filtro = {clave: valor for clave, valor in filtro.items() if valor not in ("", None)}
+        desde = max(0, _entero(consulta, 'desde', 0))
+        limite = min(SERVIDOR_LIMITE_PAGINA, max(1, _entero(consulta, 'limite', 50)))
+
+        def leer(db_manager):
+            return {
+                'total': db_manager.contar_pedidos(filtro),
+                'pedidos': [pedido.como_dict() for pedido in db_manager.cargar_pedidos_desde(desde, limite, filtro)],
+            }
+        return 200, await self.leer(leer)
+
+    async def obtener_pedido(self, consulta, cuerpo, pedido_id):
+        pedido = await self.leer(lambda db_manager: db_manager.obtener_pedido(int(pedido_id)))
+        if pedido is None:
+            raise ErrorHTTP(404, f"No existe el pedido {pedido_id}.")
+        return 200, pedido.como_dict()
+
+    async def agregar_pedido(self, consulta, cuerpo):
+        pedido = _validar(cuerpo)
+        ids = await self.escribir(lambda db_manager: db_manager.agregar_pedidos_lote([pedido]))
+        return 201, {'id': ids[0]}
+
+    async def actualizar_pedido(self, consulta, cuerpo, pedido_id):
+        pedido = _validar(cuerpo)
+        pedido_id = int(pedido_id)
+
+        def actualizar(db_manager):
+            if db_manager.obtener_pedido(pedido_id) is None:
+                return None
+            return db_manager.actualizar_pedido(
+                pedido_id, pedido['dia'], pedido['nombre'], pedido['precio_pedido'], pedido['precio_envio'],
+                pedido['direccion'], pedido['horario'], pedido['items'], pedido['pago'])
+        cambios = await self.escribir(actualizar)
+        if cambios is None:
+            raise ErrorHTTP(404, f"No existe el pedido {pedido_id}.")
+        return 200, cambios
+
+    async def eliminar_pedido(self, consulta, cuerpo, pedido_id):
+        if not await self.escribir(lambda db_manager: db_manager.eliminar_pedido(int(pedido_id))):
+            raise ErrorHTTP(404, f"No existe el pedido {pedido_id}.")
+        return 200, {'id': int(pedido_id), 'eliminado': True}
+
+    async def cambiar_pago(self, consulta, cuerpo, pedido_id):
+        pedido_id = int(pedido_id)
+        if cuerpo is not None and not isinstance(cuerpo, dict):
+            raise ErrorHTTP(400, "El cuerpo debe ser un objeto JSON.")
+        estado = (cuerpo or {}).get('pago')
+        # True == 1 y 1.0 == 1 en Python: solo se aceptan los enteros de JSON
+        if estado is not None and not (type(estado) is int and estado in (0, 1)):
+            raise ErrorHTTP(400, "'pago' debe ser 0 o 1.")
+
+        def cambiar(db_manager):
+            pedido = db_manager.obtener_pedido(pedido_id)
+            if pedido is None:
+                return None
+            if estado is None:
+                return db_manager.toggle_pago_pedido(pedido_id)
+            db_manager.marcar_pagados([pedido_id], estado)
+            return estado
+        nuevo_estado = await self.escribir(cambiar)
+        if nuevo_estado is None:
+            raise ErrorHTTP(404, f"No existe el pedido {pedido_id}.")
+        return 200, {'id': pedido_id, 'pago': nuevo_estado}
+
+    async def resumen(self, consulta, cuerpo):
+        def leer(db_manager):
+            return {
+                'produccion': db_manager.resumen_produccion(),
+                'por_dia': db_manager.resumen_por_dia(),
+                'total': db_manager.total_recaudado(),
+            }
+        return 200, await self.leer(leer)
+
+    async def cambios(self, consulta, cuerpo):
+        desde = max(0, _entero(consulta, 'desde', 0))
+        return 200, await self.leer(lambda db_manager: db_manager.cambios_desde(desde))
+
+    async def estado(self, consulta, cuerpo):
+        escritura = await asyncio.wrap_future(self.escritura.enviar(lambda db_manager: dict(
+            db_manager.estadisticas_escritura)))
+        cache = await self.leer(lambda db_manager: db_manager.estadisticas_cache())
+        return 200, {'servidor': self.estadisticas, 'cola': self.cola.estadisticas(),
+                     'escritura': escritura, 'cache': cache}
+
+    # --- HTTP ---
+
+    async def _atender(self, lector, escritor):
+        """Atiende las peticiones de una conexión, con keep-alive."""
+        try:
+            while True:
+                peticion = await _leer_peticion(lector)
+                if peticion is None:
+                    break
+                metodo, ruta, consulta, cuerpo, mantener = peticion
+                estado, datos = await self._despachar(metodo, ruta, consulta, cuerpo)
+                escritor.write(_respuesta(estado, datos, mantener))
+                await escritor.drain()
+                if not mantener:
+                    break
+        except ErrorHTTP as e:
+            # Petición mal formada: se responde y se cierra la conexión
+            escritor.write(_respuesta(e.estado, {'error': str(e)}, False))
+            await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _despachar(self, metodo, ruta, consulta, cuerpo):
+        """Busca el endpoint de la ruta y devuelve (estado HTTP, datos JSON)."""
+        self.estadisticas['peticiones'] += 1
+        try:
+            metodos = []
+            for metodo_ruta, patron, atender in self.rutas:
+                coincidencia = patron.fullmatch(ruta.rstrip('/') or '/')
+                if coincidencia is None:
+                    continue
+                if metodo_ruta == metodo:
+                    return await atender(consulta, cuerpo, *coincidencia.groups())
+                metodos.append(metodo_ruta)
+            if metodos:
+                raise ErrorHTTP(405, f"Método no permitido; use {', '.join(metodos)}.")
+            raise ErrorHTTP(404, f"No existe la ruta {ruta}.")
+        except ErrorHTTP as e:
+            self.estadisticas['errores'] += 1
+            return e.estado, {'error': str(e)}
+        except Exception as e:
+            self.estadisticas['errores'] += 1
+            return 500, {'error': str(e)}
+
+
+def _entero(consulta, clave, defecto):
+    """Lee un parámetro entero de la URL."""
+    valor = consulta.get(clave, '').strip()
+    if not valor:
+        return defecto
+    try:
+        return int(valor)
+    except ValueError:
+        raise ErrorHTTP(400, f"El parámetro '{clave}' debe ser un número entero.")
+
+
+def _fecha(consulta, clave):
+    """Lee un parámetro de fecha 'AAAA-MM-DD' de la URL ('' si no está)."""
+    valor = consulta.get(clave, '').strip()
+    if not valor:
+        return ''
+    try:
+        return date.fromisoformat(valor).isoformat()
+    except ValueError:
+        raise ErrorHTTP(400, f"El parámetro '{clave}' debe ser una fecha AAAA-MM-DD.")
+
+
+def _validar(cuerpo):
+    """Valida el cuerpo de un pedido con las reglas de la importación."""
+    if not isinstance(cuerpo, dict):
+        raise ErrorHTTP(400, "El cuerpo debe ser un objeto JSON.")
+    pedido, error = validar_pedido(cuerpo)
+    if error:
+        raise ErrorHTTP(400, error)
+    return pedido
+
+
+async def _leer_linea(lector):
+    """Lee una línea de la cabecera; una más larga que el límite del lector es un error 431."""
+    try:
+        return await lector.readline()
+    except (asyncio.LimitOverrunError, ValueError):
+        # readline convierte LimitOverrunError en ValueError
+        raise ErrorHTTP(431, "Línea de cabecera demasiado larga.")
+
+
+async def _leer_peticion(lector):
+    """Lee una petición HTTP/1.1; devuelve (método, ruta, consulta, cuerpo, keep-alive) o None al cerrar."""
+    linea = await _leer_linea(lector)
+    if not linea:
+        return None
+    try:
+        metodo, destino, version = linea.decode('latin-1').split()
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de petición inválida.")
+    cabeceras = {}
+    while True:
+        linea = await _leer_linea(lector)
+        if linea in (b'\r\n', b'\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+
+    largo = cabeceras.get('content-length') or '0'
+    # Solo dígitos: int() también aceptaría signos, espacios y '_'
+    if not re.fullmatch(r'[0-9]+', largo):
+        raise ErrorHTTP(400, "Content-Length inválido.")
+    largo = int(largo)
+    if largo > SERVIDOR_MAX_CUERPO:
+        raise ErrorHTTP(413, "El cuerpo de la petición es demasiado grande.")
+    cuerpo = None
+    if largo:
+        try:
+            cuerpo = json.loads(await lector.readexactly(largo))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ErrorHTTP(400, f"JSON inválido: {e}")
+
+    conexion = cabeceras.get('connection', '').lower()
+    mantener = conexion != 'close' if version == 'HTTP/1.1' else conexion == 'keep-alive'
+    partes = urlsplit(destino)
+    consulta = {clave: valores[-1] for clave, valores in parse_qs(partes.query).items()}
+    return metodo.upper(), partes.path, consulta, cuerpo, mantener
+
+
+def _respuesta(estado, datos, mantener):
+    """Arma la respuesta HTTP con el cuerpo JSON."""
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+    cabeceras = (
+        f"HTTP/1.1 {estado} {MENSAJES_HTTP.get(estado, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n"
+    )
+    return cabeceras.encode('latin-1') + cuerpo
+
+
+async def servir(host, puerto, db_name):
+    """Corre el servidor hasta que se interrumpa."""
+    servidor_pedidos = ServidorPedidos(db_name)
+    try:
+        servidor = await servidor_pedidos.iniciar(host, puerto)
+        print(f"Sirviendo pedidos en http://{host}:{puerto} (base: {db_name})")
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servidor_pedidos.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON de pedidos de SweetCookies")
+    parser.add_argument('--host', default=SERVIDOR_HOST)
+    parser.add_argument('--puerto', type=int, default=SERVIDOR_PUERTO)
+    parser.add_argument('--db', default=DB_NAME, help="Archivo de la base de datos.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.db))
+    except KeyboardInterrupt:
+        print("Servidor detenido.")
+
+
+if __name__ == "__main__":
+    main()
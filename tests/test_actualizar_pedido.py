@@ -0,0 +1,135 @@
+import unittest
+
+from database.db_manager import DatabaseManager
+
+
+def items(*pares):
+    """Lista de items [{'sabor', 'cantidad'}] desde pares (sabor, cantidad)."""
+    return [{'sabor': sabor, 'cantidad': cantidad} for sabor, cantidad in pares]
+
+
+class DiferenciaItemsTest(unittest.TestCase):
+    """_diferencia_items sin base: (actualizar, insertar, eliminar) para cada par de listas."""
+
+    CASOS = [
+        # (guardados, nuevos, actualizar, insertar, eliminar)
+        ("sin cambios", [("Pistacho", 2), ("Rocher", 1)], [("Pistacho", 2), ("Rocher", 1)], [], [], []),
+        ("solo cantidad", [("Pistacho", 2), ("Rocher", 1)], [("Pistacho", 2), ("Rocher", 5)],
+         [("Rocher", 5, 2)], [], []),
+        ("agregado al final", [("Pistacho", 2)], [("Pistacho", 2), ("Rocher", 1)], [], [("Rocher", 1)], []),
+        ("borrado en el medio", [("Pistacho", 2), ("Rocher", 1), ("Coco", 3)], [("Pistacho", 2), ("Coco", 3)],
+         [], [], [2]),
+        ("reordenados", [("Pistacho", 2), ("Rocher", 1)], [("Rocher", 1), ("Pistacho", 2)],
+         [("Rocher", 1, 1), ("Pistacho", 2, 2)], [], []),
+        ("agregado en el medio", [("Pistacho", 2), ("Rocher", 1)], [("Pistacho", 2), ("Coco", 4), ("Rocher", 1)],
+         [("Coco", 4, 2)], [("Rocher", 1)], []),
+        ("sabor repetido, cambia el segundo", [("Pistacho", 2), ("Rocher", 1), ("Pistacho", 3)],
+         [("Pistacho", 2), ("Rocher", 1), ("Pistacho", 6)], [("Pistacho", 6, 3)], [], []),
+        ("sabor repetido, se borra el segundo", [("Pistacho", 2), ("Rocher", 1), ("Pistacho", 3)],
+         [("Pistacho", 2), ("Rocher", 1)], [], [], [3]),
+        ("sabor repetido, se agrega otro", [("Pistacho", 2)], [("Pistacho", 2), ("Pistacho", 2)],
+         [], [("Pistacho", 2)], []),
+        ("lista vacía", [("Pistacho", 2), ("Rocher", 1)], [], [], [], [1, 2]),
+        ("pedido sin items", [], [("Pistacho", 2)], [], [("Pistacho", 2)], []),
+    ]
+
+    def test_casos(self):
+        for nombre, guardados, nuevos, actualizar, insertar, eliminar in self.CASOS:
+            with self.subTest(nombre):
+                filas = [{'item_id': numero, 'sabor': sabor, 'cantidad': cantidad}
+                         for numero, (sabor, cantidad) in enumerate(guardados, start=1)]
+                self.assertEqual(DatabaseManager._diferencia_items(filas, items(*nuevos)),
+                                 (actualizar, items(*insertar), eliminar))
+
+
+class ActualizarPedidoTest(unittest.TestCase):
+    """actualizar_pedido contra una base en memoria: filas tocadas, items guardados y resúmenes."""
+
+    def setUp(self):
+        self.db = DatabaseManager(':memory:', instrumentar=False)
+        self.addCleanup(self.db.close)
+
+    def agregar(self, *pares):
+        return self.db.agregar_pedido('Lunes', 'Ana', 3000, 500, 'Calle 1', '10-12', items(*pares))
+
+    def actualizar(self, pedido_id, *pares, dia='Lunes'):
+        return self.db.actualizar_pedido(pedido_id, dia, 'Ana', 3000, 500, 'Calle 1', '10-12', items(*pares))
+
+    def guardados(self, pedido_id):
+        """[(item_id, sabor, cantidad)] del pedido en el orden en que se leen."""
+        return [tuple(fila) for fila in self.db.conn.execute(
+            "SELECT item_id, sabor, cantidad FROM vista_items WHERE pedido_id = ? ORDER BY item_id", (pedido_id,))]
+
+    def comprobar(self, pedido_id, *pares):
+        """El pedido leído tiene esos items en ese orden y los resúmenes coinciden con un recálculo."""
+        self.assertEqual([(item.sabor, item.cantidad) for item in self.db.obtener_pedido(pedido_id).items],
+                         list(pares))
+        self.assertEqual(self.db.verificar_resumenes(), [])
+
+    def contadores(self, cambios):
+        return cambios['items_actualizados'], cambios['items_insertados'], cambios['items_eliminados']
+
+    def test_sin_cambios_no_escribe(self):
+        pedido_id = self.agregar(("Pistacho", 2), ("Rocher", 1))
+        cambios = self.actualizar(pedido_id, ("Pistacho", 2), ("Rocher", 1))
+        self.assertFalse(cambios['modificado'])
+        self.assertFalse(cambios['resumenes'])
+        self.assertEqual(self.contadores(cambios), (0, 0, 0))
+        self.comprobar(pedido_id, ("Pistacho", 2), ("Rocher", 1))
+
+    def test_solo_cantidad_actualiza_la_fila(self):
+        pedido_id = self.agregar(("Pistacho", 2), ("Rocher", 1))
+        antes = self.guardados(pedido_id)
+        cambios = self.actualizar(pedido_id, ("Pistacho", 2), ("Rocher", 4))
+        self.assertEqual(self.contadores(cambios), (1, 0, 0))
+        self.assertEqual(cambios['campos'], [])
+        self.assertTrue(cambios['resumenes'])
+        self.assertEqual(self.guardados(pedido_id), [antes[0], (antes[1][0], "Rocher", 4)])
+        self.comprobar(pedido_id, ("Pistacho", 2), ("Rocher", 4))
+
+    def test_reordenados_quedan_en_el_orden_nuevo(self):
+        pedido_id = self.agregar(("Pistacho", 2), ("Rocher", 1), ("Coco", 3))
+        cambios = self.actualizar(pedido_id, ("Coco", 3), ("Pistacho", 2), ("Rocher", 1))
+        self.assertTrue(cambios['modificado'])
+        self.comprobar(pedido_id, ("Coco", 3), ("Pistacho", 2), ("Rocher", 1))
+
+    def test_agregado_en_el_medio(self):
+        pedido_id = self.agregar(("Pistacho", 2), ("Rocher", 1))
+        cambios = self.actualizar(pedido_id, ("Pistacho", 2), ("Kinder", 5), ("Rocher", 1))
+        self.assertEqual(self.contadores(cambios), (1, 1, 0))
+        self.comprobar(pedido_id, ("Pistacho", 2), ("Kinder", 5), ("Rocher", 1))
+
+    def test_sabores_repetidos(self):
+        pedido_id = self.agregar(("Pistacho", 2), ("Rocher", 1), ("Pistacho", 3))
+        self.comprobar(pedido_id, ("Pistacho", 2), ("Rocher", 1), ("Pistacho", 3))
+
+        cambios = self.actualizar(pedido_id, ("Pistacho", 2), ("Rocher", 1), ("Pistacho", 7))
+        self.assertEqual(self.contadores(cambios), (1, 0, 0))
+        self.comprobar(pedido_id, ("Pistacho", 2), ("Rocher", 1), ("Pistacho", 7))
+
+        cambios = self.actualizar(pedido_id, ("Pistacho", 2), ("Rocher", 1))
+        self.assertEqual(self.contadores(cambios), (0, 0, 1))
+        self.comprobar(pedido_id, ("Pistacho", 2), ("Rocher", 1))
+
+        cambios = self.actualizar(pedido_id, ("Pistacho", 2), ("Pistacho", 2), ("Rocher", 1))
+        self.comprobar(pedido_id, ("Pistacho", 2), ("Pistacho", 2), ("Rocher", 1))
+
+    def test_cambio_de_dia_y_de_items(self):
+        pedido_id = self.agregar(("Pistacho", 2), ("Rocher", 1))
+        cambios = self.actualizar(pedido_id, ("Rocher", 1), ("Velvet", 2), dia='Martes')
+        self.assertEqual(cambios['campos'], ['dia'])
+        self.comprobar(pedido_id, ("Rocher", 1), ("Velvet", 2))
+
+    def test_registra_el_cambio_de_items(self):
+        pedido_id = self.agregar(("Pistacho", 2))
+        ultimo = self.db.ultimo_cambio()
+        self.actualizar(pedido_id, ("Pistacho", 3))
+        self.assertGreater(self.db.ultimo_cambio(), ultimo)
+
+    def test_pedido_inexistente(self):
+        with self.assertRaises(Exception):
+            self.actualizar(999, ("Pistacho", 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
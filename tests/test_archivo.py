@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from database.db_manager import DatabaseManager
+
+ITEMS = [{'sabor': 'Pistacho', 'cantidad': 2}]
+
+
+class ArchivarPedidosTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+
+    def abrir(self, nombre='pedidos.db'):
+        """DatabaseManager sobre una base del directorio; todas comparten el archivo."""
+        db = DatabaseManager(os.path.join(self.directorio, nombre), cache=False, instrumentar=False)
+        self.addCleanup(db.close)
+        return db
+
+    def archivados(self, db):
+        with db.con_archivo():
+            return [tuple(fila) for fila in db.conn.execute(
+                "SELECT p.id, p.nombre, i.cantidad FROM archivo.pedidos p "
+                "JOIN archivo.pedido_items i ON i.pedido_id = p.id ORDER BY p.id, i.item_id")]
+
+    def test_base_recreada_no_pisa_el_archivo(self):
+        db = self.abrir()
+        db.agregar_pedido('Lunes', 'Ana', 3000, 0, '', '', ITEMS)
+        self.assertEqual(db.archivar_pedidos(['Lunes'], compactar=False)['archivados'], 1)
+        db.close()
+        os.remove(os.path.join(self.directorio, 'pedidos.db'))
+
+        # Base nueva: los ids vuelven a empezar y chocan con los archivados
+        db = self.abrir()
+        pedido_id = db.agregar_pedido('Lunes', 'Beto', 1000, 0, '', '', [{'sabor': 'Rocher', 'cantidad': 5}])
+        db.conn.execute("UPDATE pedidos SET fecha_registro = '2030-01-01 10:00:00' WHERE id = ?", (pedido_id,))
+        with self.assertRaises(Exception) as contexto:
+            db.archivar_pedidos(['Lunes'], compactar=False)
+        self.assertIn(str(pedido_id), str(contexto.exception))
+        self.assertEqual(self.archivados(db), [(1, 'Ana', 2)])
+        self.assertEqual([pedido.nombre for pedido in db.cargar_pedidos()], ['Beto'])
+
+    def test_archivado_cortado_se_reemplaza(self):
+        db = self.abrir()
+        pedido_id = db.agregar_pedido('Lunes', 'Ana', 3000, 0, '', '', ITEMS)
+        # Un corte entre la copia y el borrado deja el pedido en las dos bases
+        with db.con_archivo():
+            db.conn.execute("""
+                INSERT INTO archivo.pedidos (id, dia, nombre, precio_pedido, fecha_registro)
+                SELECT id, dia, nombre, precio_pedido, fecha_registro FROM vista_pedidos""")
+            db.conn.execute("""
+                INSERT INTO archivo.pedido_items (item_id, pedido_id, sabor, cantidad)
+                SELECT item_id, pedido_id, sabor, cantidad FROM vista_items""")
+        db.actualizar_pedido(pedido_id, 'Lunes', 'Ana', 3000, 0, '', '', [{'sabor': 'Pistacho', 'cantidad': 7}])
+
+        self.assertEqual(db.archivar_pedidos(['Lunes'], compactar=False)['archivados'], 1)
+        self.assertEqual(self.archivados(db), [(pedido_id, 'Ana', 7)])
+        self.assertEqual(db.cargar_pedidos(), [])
+        self.assertEqual(db.verificar_resumenes(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
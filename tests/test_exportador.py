@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from database.db_manager import DatabaseManager
+from database.exportador import exportar
+
+
+class BaseQueFalla:
+    """Devuelve un pedido y después falla, como una lectura que se corta a mitad."""
+
+    def iterar_pedidos(self, dia=None, historico=False):
+        yield {'id': 1, 'dia': 'Lunes', 'nombre': 'Ana', 'items': [{'sabor': 'Pistacho', 'cantidad': 2}]}
+        raise Exception("No se pudieron leer los pedidos: disk I/O error")
+
+
+class ExportarTest(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+
+    def previo(self, nombre):
+        """Ruta de un archivo que ya tiene contenido."""
+        ruta = os.path.join(self.directorio, nombre)
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write("previo\n")
+        return ruta
+
+    def contenido(self, ruta):
+        with open(ruta, encoding='utf-8') as archivo:
+            return archivo.read()
+
+    def test_error_a_mitad_deja_el_archivo_anterior(self):
+        for nombre in ('pedidos.csv', 'pedidos.jsonl'):
+            with self.subTest(nombre):
+                ruta = self.previo(nombre)
+                with self.assertRaises(Exception):
+                    exportar(BaseQueFalla(), 'pedidos', ruta)
+                self.assertEqual(self.contenido(ruta), "previo\n")
+        self.assertEqual(sorted(os.listdir(self.directorio)), ['pedidos.csv', 'pedidos.jsonl'])
+
+    def test_argumentos_invalidos_dejan_el_archivo_anterior(self):
+        for tipo, nombre, dia in (('entregas', 'entregas.csv', None), ('otro', 'otro.csv', None),
+                                  ('pedidos', 'pedidos.txt', None)):
+            with self.subTest(tipo=tipo, nombre=nombre):
+                ruta = self.previo(nombre)
+                with self.assertRaises(Exception):
+                    exportar(BaseQueFalla(), tipo, ruta, dia)
+                self.assertEqual(self.contenido(ruta), "previo\n")
+
+    def test_exportacion_completa_reemplaza_el_archivo(self):
+        db = DatabaseManager(':memory:', instrumentar=False)
+        self.addCleanup(db.close)
+        db.agregar_pedido('Lunes', 'Ana', 3000, 500, 'Calle 1', '10-12', [{'sabor': 'Pistacho', 'cantidad': 2}])
+        ruta = self.previo('pedidos.csv')
+        self.assertEqual(exportar(db, 'pedidos', ruta), 1)
+        lineas = self.contenido(ruta).splitlines()
+        self.assertEqual(lineas[0].split(',')[:3], ['id', 'dia', 'nombre'])
+        self.assertIn('Pistacho:2', lineas[1])
+        self.assertEqual(os.listdir(self.directorio), ['pedidos.csv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
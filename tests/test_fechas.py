@@ -0,0 +1,133 @@
+import sqlite3
+import unittest
+from datetime import date, datetime
+
+from database.migraciones import esquema_inicial, registro_cambios, fecha_entrega_iso, registrar_fecha_entrega
+from utils.fechas import parsear_fecha, fecha_entrega, proximos_dias, esta_semana
+
+# Jueves 15/10/2026, como la fecha de registro de un pedido
+REFERENCIA = '2026-10-15 09:30:00'
+
+# (texto del día, referencia, fecha ISO esperada)
+CASOS = [
+    # Días de la semana: el primero desde la referencia, inclusive
+    ("Lunes", REFERENCIA, '2026-10-19'),
+    ("lun", REFERENCIA, '2026-10-19'),
+    ("Jueves", REFERENCIA, '2026-10-15'),
+    ("viernes", REFERENCIA, '2026-10-16'),
+    ("Miércoles", REFERENCIA, '2026-10-21'),
+    ("MIÉRCOLES", REFERENCIA, '2026-10-21'),
+    ("miercoles", REFERENCIA, '2026-10-21'),
+    ("Sábado", REFERENCIA, '2026-10-17'),
+    ("sáb", REFERENCIA, '2026-10-17'),
+    ("dom", REFERENCIA, '2026-10-18'),
+    ("  Martes  ", REFERENCIA, '2026-10-20'),
+    ("Viernes o sábado", REFERENCIA, '2026-10-16'),
+    # Días relativos
+    ("hoy", REFERENCIA, '2026-10-15'),
+    ("mañana", REFERENCIA, '2026-10-16'),
+    ("Mañana", REFERENCIA, '2026-10-16'),
+    ("pasado mañana", REFERENCIA, '2026-10-17'),
+    # Fechas completas
+    ("2026-10-20", REFERENCIA, '2026-10-20'),
+    ("2026-1-5", REFERENCIA, '2026-01-05'),
+    ("20/10/2026", REFERENCIA, '2026-10-20'),
+    ("20-10-26", REFERENCIA, '2026-10-20'),
+    ("20.10.2026", REFERENCIA, '2026-10-20'),
+    # Fechas sin año: el año más cercano a la referencia
+    ("20/10", REFERENCIA, '2026-10-20'),
+    ("1/9", REFERENCIA, '2026-09-01'),
+    ("Viernes 14/3", REFERENCIA, '2027-03-14'),
+    ("2/1", '2026-12-30', '2027-01-02'),
+    ("30/12", '2026-01-02', '2025-12-30'),
+    ("29/2", '2028-02-10', '2028-02-29'),
+    # Días de la semana que cruzan el año
+    ("lunes", '2026-12-30', '2027-01-04'),
+    # Referencias como date o datetime
+    ("Lunes", date(2026, 10, 15), '2026-10-19'),
+    ("Lunes", datetime(2026, 10, 15, 23, 59), '2026-10-19'),
+]
+
+# Textos que no son una fecha: quedan sin fecha de entrega
+SIN_FECHA = [
+    None,
+    "",
+    "   ",
+    "a confirmar",
+    "lunesito",
+    "31/2/2026",
+    "2026-13-01",
+    "29/2",
+    "32/10",
+]
+
+
+class ParsearFechaTest(unittest.TestCase):
+
+    def test_formatos(self):
+        for texto, referencia, esperada in CASOS:
+            with self.subTest(texto=texto, referencia=referencia):
+                self.assertEqual(parsear_fecha(texto, referencia), date.fromisoformat(esperada))
+                self.assertEqual(fecha_entrega(texto, referencia), esperada)
+
+    def test_sin_fecha(self):
+        for texto in SIN_FECHA:
+            with self.subTest(texto=texto):
+                self.assertIsNone(parsear_fecha(texto, REFERENCIA))
+                self.assertEqual(fecha_entrega(texto, REFERENCIA), '')
+
+    def test_referencia_por_defecto_es_hoy(self):
+        self.assertEqual(parsear_fecha("hoy"), date.today())
+        self.assertEqual(parsear_fecha("hoy", "no es una fecha"), date.today())
+
+    def test_periodos(self):
+        self.assertEqual(proximos_dias(3, '2026-10-30'), ('2026-10-30', '2026-11-01'))
+        self.assertEqual(proximos_dias(0, '2026-10-30'), ('2026-10-30', '2026-10-30'))
+        self.assertEqual(esta_semana('2026-10-15'), ('2026-10-12', '2026-10-18'))
+        self.assertEqual(esta_semana('2026-12-31'), ('2026-12-28', '2027-01-03'))
+
+
+class MigracionFechaEntregaTest(unittest.TestCase):
+    """La migración 3 calcula fecha_entrega de los pedidos existentes desde su fecha de registro."""
+
+    def setUp(self):
+        self.conexion = sqlite3.connect(':memory:')
+        self.addCleanup(self.conexion.close)
+        self.cursor = self.conexion.cursor()
+        esquema_inicial(self.cursor)
+        registro_cambios(self.cursor)
+        self.cursor.execute("INSERT INTO clientes (id, nombre) VALUES (1, 'Ana')")
+
+    def migrar(self, filas):
+        """Carga pedidos (dia, fecha_registro) en la versión 2, migra y devuelve fecha_entrega por id."""
+        self.cursor.executemany(
+            "INSERT INTO pedidos (dia, cliente_id, precio_pedido, fecha_registro) VALUES (?, 1, 100, ?)", filas)
+        fecha_entrega_iso(self.cursor)
+        return [fecha for fecha, in self.cursor.execute("SELECT fecha_entrega FROM vista_pedidos ORDER BY id")]
+
+    def test_formatos(self):
+        casos = [(texto, referencia, esperada) for texto, referencia, esperada in CASOS
+                 if isinstance(referencia, str)]
+        fechas = self.migrar([(texto, referencia) for texto, referencia, _ in casos])
+        for (texto, referencia, esperada), fecha in zip(casos, fechas):
+            with self.subTest(texto=texto, referencia=referencia):
+                self.assertEqual(fecha, esperada)
+
+    def test_sin_fecha(self):
+        textos = [texto for texto in SIN_FECHA if texto is not None]
+        fechas = self.migrar([(texto, REFERENCIA) for texto in textos])
+        # La columna es NOT NULL: '' es "sin fecha" y ordena antes que las fechas
+        self.assertEqual(fechas, [''] * len(textos))
+
+    def test_funcion_sql(self):
+        registrar_fecha_entrega(self.conexion)
+        for texto, referencia, esperada in CASOS[:5] + [("a confirmar", REFERENCIA, '')]:
+            with self.subTest(texto=texto):
+                fecha, = self.conexion.execute("SELECT fecha_entrega(?, ?)", (texto, referencia)).fetchone()
+                self.assertEqual(fecha, esperada)
+        fecha, = self.conexion.execute("SELECT fecha_entrega(NULL, ?)", (REFERENCIA,)).fetchone()
+        self.assertEqual(fecha, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
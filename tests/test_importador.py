@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from database.db_manager import DatabaseManager
+from database.importador import validar_pedido, importar_archivo
+from servidor import ErrorHTTP, _validar
+
+ITEMS = "Pistacho:2;Rocher:1"
+
+
+def fila(**cambios):
+    """Fila válida de importación con los campos de `cambios` reemplazados."""
+    base = {'dia': 'Lunes', 'nombre': 'Ana', 'precio_pedido': '3000', 'precio_envio': '500',
+            'direccion': 'Calle 1', 'horario': '10-12', 'pago': '', 'items': ITEMS}
+    base.update(cambios)
+    return base
+
+
+class ValidarPedidoTest(unittest.TestCase):
+
+    # (campo, valor, precio esperado o None si la fila es inválida)
+    PRECIOS = [
+        ('precio_pedido', '3000', 3000.0),
+        ('precio_pedido', ' 12.5 ', 12.5),
+        ('precio_pedido', 3000, 3000.0),
+        ('precio_pedido', '0', None),
+        ('precio_pedido', '-50', None),
+        ('precio_pedido', 'nan', None),
+        ('precio_pedido', 'NaN', None),
+        ('precio_pedido', float('nan'), None),
+        ('precio_pedido', 'inf', None),
+        ('precio_pedido', '-inf', None),
+        ('precio_pedido', '1e400', None),
+        ('precio_pedido', '', None),
+        ('precio_pedido', 'abc', None),
+        ('precio_envio', '', 0.0),
+        ('precio_envio', '0', 0.0),
+        ('precio_envio', '500', 500.0),
+        ('precio_envio', '-1', None),
+        ('precio_envio', 'nan', None),
+        ('precio_envio', 'inf', None),
+        ('precio_envio', '1e400', None),
+    ]
+
+    def test_precios(self):
+        for campo, valor, esperado in self.PRECIOS:
+            with self.subTest(campo=campo, valor=valor):
+                pedido, error = validar_pedido(fila(**{campo: valor}))
+                if esperado is None:
+                    self.assertIsNone(pedido)
+                    self.assertIn(campo, error)
+                else:
+                    self.assertIsNone(error)
+                    self.assertEqual(pedido[campo], esperado)
+
+    def test_servidor_responde_400(self):
+        for valor in ('nan', 'inf', '-50'):
+            with self.subTest(valor=valor):
+                with self.assertRaises(ErrorHTTP) as contexto:
+                    _validar(fila(precio_pedido=valor))
+                self.assertEqual(contexto.exception.estado, 400)
+
+
+class ImportarArchivoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DatabaseManager(':memory:', instrumentar=False)
+        self.addCleanup(self.db.close)
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, 'pedidos.csv')
+
+    def test_precios_invalidos_no_rechazan_el_lote(self):
+        with open(self.ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write("dia,nombre,precio_pedido,precio_envio,items\n"
+                          f"Lunes,Ana,3000,500,{ITEMS}\n"
+                          f"Lunes,Beto,nan,0,{ITEMS}\n"
+                          f"Lunes,Carla,-50,0,{ITEMS}\n"
+                          f"Lunes,Dani,1e400,0,{ITEMS}\n"
+                          f"Lunes,Eva,2000,inf,{ITEMS}\n"
+                          f"Martes,Fede,1000,0,{ITEMS}\n")
+        resultado = importar_archivo(self.db, self.ruta, tamano_lote=100)
+        self.assertEqual(resultado['importados'], 2)
+        self.assertEqual([linea for linea, _ in resultado['errores']], [3, 4, 5, 6])
+        self.assertEqual(sorted(pedido.nombre for pedido in self.db.cargar_pedidos()), ['Ana', 'Fede'])
+        self.assertEqual(self.db.verificar_resumenes(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
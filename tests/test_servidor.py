@@ -0,0 +1,41 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from servidor import ServidorPedidos
+
+PEDIDO = {'dia': 'Lunes', 'nombre': 'Ana', 'precio_pedido': 3000, 'items': [{'sabor': 'Pistacho', 'cantidad': 2}]}
+
+
+class CambiarPagoTest(unittest.TestCase):
+    """POST /pedidos/<id>/pago con {"pago": ...}: solo 0 o 1 enteros."""
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.servidor = ServidorPedidos(os.path.join(directorio.name, 'servidor.db'))
+        self.addCleanup(self.servidor.close)
+        estado, datos = self.despachar('POST', '/pedidos', PEDIDO)
+        self.assertEqual(estado, 201)
+        self.ruta = f"/pedidos/{datos['id']}/pago"
+
+    def despachar(self, metodo, ruta, cuerpo=None):
+        return asyncio.run(self.servidor._despachar(metodo, ruta, {}, cuerpo))
+
+    def test_valores_invalidos(self):
+        for pago in (True, False, 1.0, 0.0, 2, -1, '1', [1]):
+            with self.subTest(pago=pago):
+                estado, datos = self.despachar('POST', self.ruta, {'pago': pago})
+                self.assertEqual(estado, 400)
+                self.assertIn('pago', datos['error'])
+
+    def test_valores_validos(self):
+        for pago in (1, 0):
+            with self.subTest(pago=pago):
+                self.assertEqual(self.despachar('POST', self.ruta, {'pago': pago})[1]['pago'], pago)
+        self.assertEqual(self.despachar('POST', self.ruta)[1]['pago'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import re
+import unicodedata
+from datetime import date, datetime, timedelta
+
+# Fecha de entrega a partir del texto libre del día.
+#
+# El personal escribe el día de entrega como le sale: "Lunes", "lun",
+# "12/3", "12-03-26", "2026-10-20", "mañana", "Viernes 14/3". Estas
+# funciones lo pasan a una fecha ISO (AAAA-MM-DD) que ordena bien y se
+# puede indexar; el texto original se guarda tal cual para mostrarlo. Los
+# días de la semana y las fechas sin año se resuelven respecto de una fecha
+# de referencia (la de registro del pedido).
+
+DIAS_SEMANA = {
+    'lunes': 0, 'lun': 0, 'martes': 1, 'mar': 1, 'miercoles': 2, 'mie': 2, 'jueves': 3, 'jue': 3,
+    'viernes': 4, 'vie': 4, 'sabado': 5, 'sab': 5, 'domingo': 6, 'dom': 6,
+}
+# Nombres para mostrar, por date.weekday()
+NOMBRES_DIAS = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+# Días desde la referencia
+DIAS_RELATIVOS = {'hoy': 0, 'manana': 1, 'pasado manana': 2}
+
+_ISO = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+# Día primero, con año opcional de 2 o 4 cifras
+_DIA_MES = re.compile(r'\b(\d{1,2})[/.-](\d{1,2})(?:[/.-](\d{4}|\d{2}))?\b')
+
+
+def _normalizar(texto):
+    """Minúsculas, sin acentos y con los espacios colapsados."""
+    sin_acentos = ''.join(
+        caracter for caracter in unicodedata.normalize('NFKD', str(texto or ''))
+        if not unicodedata.combining(caracter)
+    )
+    return ' '.join(sin_acentos.lower().split())
+
+
+def _como_fecha(referencia):
+    """Convierte la referencia (date, datetime, 'AAAA-MM-DD[ HH:MM:SS]' o None: hoy) en date."""
+    if referencia is None or referencia == '':
+        return date.today()
+    if isinstance(referencia, datetime):
+        return referencia.date()
+    if isinstance(referencia, date):
+        return referencia
+    try:
+        return date.fromisoformat(str(referencia)[:10])
+    except ValueError:
+        return date.today()
+
+
+def _fecha_o_none(anio, mes, dia):
+    try:
+        return date(anio, mes, dia)
+    except ValueError:
+        return None
+
+
+def parsear_fecha(texto, referencia=None):
+    """Devuelve la fecha (date) que indica el texto del día de entrega, o None si no se entiende.
+
+    Una fecha escrita en el texto gana sobre el nombre del día. A una
+    fecha sin año se le pone el año que la deja más cerca de la
+    referencia; un día de la semana es el primero desde la referencia
+    inclusive.
+    """
+    normalizado = _normalizar(texto)
+    if not normalizado:
+        return None
+    base = _como_fecha(referencia)
+
+    coincidencia = _ISO.search(normalizado)
+    if coincidencia:
+        return _fecha_o_none(*(int(parte) for parte in coincidencia.groups()))
+
+    coincidencia = _DIA_MES.search(normalizado)
+    if coincidencia:
+        dia, mes, anio = coincidencia.groups()
+        if anio is not None:
+            anio = int(anio) + (2000 if len(anio) == 2 else 0)
+            return _fecha_o_none(anio, int(mes), int(dia))
+        candidatas = [fecha for fecha in (_fecha_o_none(base.year + delta, int(mes), int(dia)) for delta in (-1, 0, 1))
+                      if fecha is not None]
+        return min(candidatas, key=lambda fecha: abs((fecha - base).days)) if candidatas else None
+
+    if normalizado in DIAS_RELATIVOS:
+        return base + timedelta(days=DIAS_RELATIVOS[normalizado])
+    for palabra in re.findall(r'[a-z]+', normalizado):
+        if palabra in DIAS_SEMANA:
+            return base + timedelta(days=(DIAS_SEMANA[palabra] - base.weekday()) % 7)
+    return None
+
+
+def fecha_entrega(texto, referencia=None):
+    """Fecha ISO 'AAAA-MM-DD' del texto del día, o '' si no se entiende (ordena primero)."""
+    fecha = parsear_fecha(texto, referencia)
+    return fecha.isoformat() if fecha else ''
+
+
+def proximos_dias(cantidad, hoy=None):
+    """(desde, hasta) ISO de los próximos `cantidad` días, hoy incluido."""
+    inicio = _como_fecha(hoy)
+    return inicio.isoformat(), (inicio + timedelta(days=max(1, cantidad) - 1)).isoformat()
+
+
+def esta_semana(hoy=None):
+    """(desde, hasta) ISO de la semana de lunes a domingo que incluye `hoy`."""
+    lunes = _como_fecha(hoy) - timedelta(days=_como_fecha(hoy).weekday())
+    return lunes.isoformat(), (lunes + timedelta(days=6)).isoformat()